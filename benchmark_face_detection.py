@@ -0,0 +1,109 @@
+"""
+Benchmark: face detector backends for privacy blurring
+Runs the Haar cascade backend (per-cascade, shared-pyramid and downscaled
+shared-pyramid modes) and the YuNet DNN backend over the sample images,
+reporting frames/sec, faces found and, given hand-labelled boxes, recall.
+
+The YuNet rows need models/face_detection_yunet_2023mar.onnx (OpenCV model
+zoo); without it they are reported as unavailable.
+
+Usage:
+    python benchmark_face_detection.py [data_dir] [annotations.json]
+
+annotations.json maps image file names to face boxes:
+    {"classroom1.jfif": [[x, y, w, h], ...], ...}
+"""
+
+import json
+import os
+import sys
+import time
+import cv2
+import numpy as np
+from utils.face_blur import FaceBlurrer
+from utils.geometry import pairwise_iou
+
+BACKENDS = {
+    'cascade': dict(backend='cascade'),
+    'cascade (shared pyramid)': dict(backend='cascade', shared_pyramid=True),
+    'cascade (shared, 1920px)': dict(backend='cascade', shared_pyramid=True, max_dimension=1920),
+    'yunet': dict(backend='yunet', dnn_input_size=1920),
+    'yunet (640px)': dict(backend='yunet', dnn_input_size=640),
+}
+
+def load_images(data_dir):
+    """(file name, BGR image) for every image OpenCV can read in data_dir"""
+    images = []
+    for name in sorted(os.listdir(data_dir)):
+        image = cv2.imread(os.path.join(data_dir, name))
+        if image is not None:
+            images.append((name, image))
+    return images
+
+def to_corners(faces):
+    """[(x, y, w, h), ...] -> float32 array (N, 4) of [x1, y1, x2, y2]"""
+    boxes = np.asarray(faces, dtype=np.float32).reshape(-1, 4)
+    return np.concatenate([boxes[:, :2], boxes[:, :2] + boxes[:, 2:]], axis=1)
+
+def count_found(truth, faces, iou_threshold=0.3):
+    """Number of labelled faces overlapped by a detection"""
+    if not len(truth) or not len(faces):
+        return 0
+    iou = pairwise_iou(to_corners(truth), to_corners(faces))
+    return int(np.count_nonzero(iou.max(axis=1) >= iou_threshold))
+
+def benchmark(name, blurrer, images, annotations, repeats=3):
+    """Time one backend over all images"""
+    blurrer.detect_faces(images[0][1])  # Warm-up (model load, thread pool)
+    
+    faces_found = 0
+    labelled = found = 0
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for file_name, image in images:
+            faces = blurrer.detect_faces(image)
+            faces_found += len(faces)
+            if file_name in annotations:
+                labelled += len(annotations[file_name])
+                found += count_found(annotations[file_name], faces)
+    elapsed = time.perf_counter() - start
+    
+    frames = repeats * len(images)
+    recall = f"{found / labelled:.0%}" if labelled else "n/a"
+    print(f"{name:<28}{frames / elapsed:>9.2f}{faces_found / frames:>12.1f}{recall:>9}")
+
+def main():
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else 'data'
+    annotations = {}
+    if len(sys.argv) > 2:
+        with open(sys.argv[2]) as f:
+            annotations = json.load(f)
+    
+    images = load_images(data_dir)
+    if not images:
+        print(f"No readable images in {data_dir}")
+        return
+    
+    print(f"{len(images)} image(s): " + ", ".join(
+        f"{name} {image.shape[1]}x{image.shape[0]}" for name, image in images
+    ))
+    if not annotations:
+        print("No annotations given: recall is not reported")
+    
+    blurrers = {}
+    for name, kwargs in BACKENDS.items():
+        try:
+            blurrers[name] = FaceBlurrer(**kwargs)
+        except (cv2.error, OSError, AttributeError) as e:
+            blurrers[name] = e
+    
+    print(f"\n{'Backend':<28}{'Frames/s':>9}{'Faces/frame':>12}{'Recall':>9}")
+    print("-" * 58)
+    for name, blurrer in blurrers.items():
+        if isinstance(blurrer, Exception):
+            print(f"{name:<28}unavailable ({blurrer})")
+            continue
+        benchmark(name, blurrer, images, annotations)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Compare fp32 and int8-quantized OWL-ViT on the sample images
+Reports per-image latency and how closely the int8 detections match fp32
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import config
+from models.owlvit_detector import OWLViTDetector
+from utils.image_processor import ImageProcessor
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.jfif', '.bmp', '.webp', '.avif')
+
+def box_iou(box1, box2):
+    """IoU of two [x1, y1, x2, y2] boxes"""
+    x_left = max(box1[0], box2[0])
+    y_top = max(box1[1], box2[1])
+    x_right = min(box1[2], box2[2])
+    y_bottom = min(box1[3], box2[3])
+    
+    if x_right <= x_left or y_bottom <= y_top:
+        return 0.0
+    
+    intersection = (x_right - x_left) * (y_bottom - y_top)
+    area1 = (box1[2] - box1[0]) * (box1[3] - box1[1])
+    area2 = (box2[2] - box2[0]) * (box2[3] - box2[1])
+    return intersection / (area1 + area2 - intersection)
+
+def match_detections(reference, candidate, iou_threshold=0.5):
+    """Count reference detections found again (same class, IoU >= threshold)"""
+    matched = 0
+    score_diffs = []
+    used = set()
+    
+    for ref in reference:
+        best_idx, best_iou = None, iou_threshold
+        for idx, det in enumerate(candidate):
+            if idx in used or det['class'] != ref['class']:
+                continue
+            iou = box_iou(ref['bbox'], det['bbox'])
+            if iou >= best_iou:
+                best_idx, best_iou = idx, iou
+        
+        if best_idx is not None:
+            used.add(best_idx)
+            matched += 1
+            score_diffs.append(abs(ref['confidence'] - candidate[best_idx]['confidence']))
+    
+    return matched, score_diffs
+
+def time_detection(detector, image, runs):
+    """Run detection several times and return (detections, mean seconds)"""
+    # Warm-up run also fills the text embedding cache
+    detections = detector.detect_objects(image, config.CLASSROOM_OBJECTS,
+                                         confidence=config.OWLVIT_CONFIDENCE)
+    
+    start = time.perf_counter()
+    for _ in range(runs):
+        detections = detector.detect_objects(image, config.CLASSROOM_OBJECTS,
+                                             confidence=config.OWLVIT_CONFIDENCE)
+    return detections, (time.perf_counter() - start) / runs
+
+def compare_quantization(data_dir='data', runs=3):
+    """Compare fp32 and int8 OWL-ViT on every readable image in data_dir"""
+    processor = ImageProcessor(target_size=config.IMAGE_SIZE)
+    
+    images = []
+    for name in sorted(os.listdir(data_dir)):
+        path = os.path.join(data_dir, name)
+        if not os.path.isfile(path) or not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        image = processor.load_image(path)
+        if image is None:
+            print(f"⚠️  Skipping {name} (could not decode)")
+            continue
+        resized = processor.preprocess(image)
+        images.append((name, resized))
+    
+    if not images:
+        print(f"❌ No readable images in {data_dir}")
+        return
+    
+    print("\n1. Loading fp32 model...")
+    fp32_detector = OWLViTDetector(quantize=False)
+    print("\n2. Loading int8 model...")
+    int8_detector = OWLViTDetector(quantize=True)
+    
+    if fp32_detector.model is None or int8_detector.model is None:
+        print("❌ Failed to load OWL-ViT models")
+        return
+    
+    print("\n" + "="*78)
+    print(f"{'Image':<24} {'fp32 ms':>9} {'int8 ms':>9} {'speedup':>8} "
+          f"{'fp32 det':>9} {'int8 det':>9} {'recall':>8}")
+    print("-"*78)
+    
+    fp32_times, int8_times = [], []
+    total_ref, total_matched, all_diffs = 0, 0, []
+    
+    for name, image in images:
+        fp32_dets, fp32_time = time_detection(fp32_detector, image, runs)
+        int8_dets, int8_time = time_detection(int8_detector, image, runs)
+        matched, diffs = match_detections(fp32_dets, int8_dets)
+        
+        fp32_times.append(fp32_time)
+        int8_times.append(int8_time)
+        total_ref += len(fp32_dets)
+        total_matched += matched
+        all_diffs.extend(diffs)
+        
+        recall = matched / len(fp32_dets) if fp32_dets else 1.0
+        print(f"{name[:24]:<24} {fp32_time*1000:>9.1f} {int8_time*1000:>9.1f} "
+              f"{fp32_time/int8_time:>7.2f}x {len(fp32_dets):>9} {len(int8_dets):>9} "
+              f"{recall:>8.0%}")
+    
+    print("-"*78)
+    mean_fp32 = np.mean(fp32_times)
+    mean_int8 = np.mean(int8_times)
+    print(f"Mean latency: fp32 {mean_fp32*1000:.1f} ms, int8 {mean_int8*1000:.1f} ms "
+          f"({mean_fp32/mean_int8:.2f}x faster)")
+    if total_ref:
+        print(f"fp32 detections recovered by int8: {total_matched}/{total_ref} "
+              f"({total_matched/total_ref:.0%})")
+    if all_diffs:
+        print(f"Mean confidence difference on matched boxes: {np.mean(all_diffs):.4f}")
+    print("="*78)
+
+
+if __name__ == '__main__':
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else 'data'
+    compare_quantization(data_dir)
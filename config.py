@@ -1,5 +1,7 @@
 # Configuration file for classroom cleanliness system
 
+import os
+
 # Scoring weights (out of 10 each)
 FLOOR_WEIGHT = 10
 FURNITURE_WEIGHT = 10
@@ -15,6 +17,11 @@ RATING_FAIR = 25
 # Object detection settings
 CONFIDENCE_THRESHOLD = 0.5
 IOU_THRESHOLD = 0.4
+DETECTION_BATCH_SIZE = 8  # Images per YOLO forward pass in batch analysis
+
+# YOLO backend: 'torch' (ultralytics) or 'onnx' (onnxruntime on CPU)
+# The ONNX model is exported once and cached next to the .pt weights
+DETECTOR_BACKEND = 'torch'
 
 # Detected object classes
 # Note: YOLO detects 80 COCO objects. Some classroom items map to similar objects:
@@ -22,23 +29,124 @@ IOU_THRESHOLD = 0.4
 # - Jacket → detected as "handbag" or "tie"
 # - Ballpen → detected as "scissors" (sometimes)
 
+# Items counted as clutter by the floor, furniture and clutter scorers
 CLUTTER_OBJECTS = [
-    'bags',
+    'bags', 'paper', 'bag',
     'backpack', 'handbag', 'bottle', 'book', 'cell phone',
     'umbrella', 'tie', 'suitcase', 'scissors', 'cup',
     'laptop', 'keyboard', 'mouse', 'remote', 'sports ball', 'teddy bear'
 ]
 
-FURNITURE_OBJECTS = ['chair', 'couch', 'dining table', 'bed', 'bench']
+# Scoring categories (single source of truth for the scorers)
+# A class belongs to a category if its name is listed in 'names' or contains one
+# of the 'keywords'. OWL-ViT queries also inherit the categories of their YOLO
+# synonyms in FUSION_SYNONYMS (e.g. "bottle on desk" -> bottle -> clutter).
+CLASS_CATEGORIES = {
+    'clutter': {'names': CLUTTER_OBJECTS},
+    'trash': {'keywords': ['bottle', 'cup', 'paper', 'plastic', 'bag']},
+    'chair': {'names': ['chair']},
+    'table': {'names': ['dining table', 'desk', 'table']},
+    'bin': {'names': ['trash bin', 'trash can', 'garbage bin', 'garbage can', 'waste basket']},
+}
+
+# YOLO + OWL-ViT fusion
+# OWL-ViT query -> YOLO class(es) describing the same kind of object. An OWL-ViT
+# box matching a YOLO box of a synonym class is merged into it instead of
+# being counted twice.
+FUSION_SYNONYMS = {
+    'chair': 'chair',
+    'desk': 'dining table',
+    'table': 'dining table',
+    'bottle on desk': 'bottle',
+    'water bottle': 'bottle',
+    'backpack on floor': 'backpack',
+    'bags on floor': ['backpack', 'handbag', 'suitcase'],
+    'bag on desk': ['backpack', 'handbag'],
+    'notebook on desk': 'book',
+    'papers on desk': 'book',
+    'folder on desk': 'book',
+    'umbrella': 'umbrella',
+}
+FUSION_IOU_THRESHOLD = 0.5  # Minimum IoU for a YOLO/OWL-ViT pair to be the same object
 
-TRASH_OBJECTS = ['bottle', 'cup', 'bowl']  # Items that should be in trash
+# Scoring pipeline: name -> 'module:Class'. Scorers run concurrently on a
+# thread pool; add an entry here to register a new scorer.
+SCORERS = {
+    'floor': 'scoring.floor_score:FloorScorer',
+    'furniture': 'scoring.furniture_score:FurnitureScorer',
+    'trash': 'scoring.trash_score:TrashScorer',
+    'wall': 'scoring.wall_score:WallScorer',
+    'clutter': 'scoring.clutter_score:ClutterScorer',
+}
+SCORING_WORKERS = 4  # Threads running independent scorers
+
+# Scorer thresholds. These act on per-frame statistics stored with each
+# leaderboard entry, so history can be re-scored under new values
+# (rescore_history.py) without re-running detection.
+FLOOR_CLUTTER_PENALTY = 1.5  # Points per clutter object on the floor (max 5)
+FLOOR_DEBRIS_LIMIT = 50  # Debris blobs that drop the debris score to 0
+FLOOR_STD_LIMIT = 50  # Floor LAB lightness std that drops the uniformity score to 0
+CHAIR_TABLE_MARGIN = 100  # Max distance (px) from a chair center to a table box
+ARRANGEMENT_VARIANCE_LIMIT = 10000  # Row/column center variance that drops the arrangement score to 0
+SURFACE_CLUTTER_PENALTY = 0.5  # Points per clutter object on a table (max 3)
+TRASH_BIN_MARGIN = 80  # Max distance (px) from a trash item center to a bin box
+BIN_OVERFLOW_VARIANCE = 1000  # Color variance above a bin that counts as overflow
+WALL_EDGE_PENALTY = 40  # Points per unit of wall edge density (max 4)
+BOARD_VARIANCE_LIMIT = 1000  # Board V-channel variance that drops the cleanliness score to 0
+CLUTTER_PENALTY = 1.5  # Points per clutter object anywhere (max 10)
+LEADERBOARD_MAX_FRAMES = 5000  # Newest entries whose re-scoring inputs are kept (data/frames); None keeps all
 
 # Image processing
 IMAGE_SIZE = (640, 640)
+DECODE_AT_TARGET_SIZE = True  # Decode large JPEGs at 1/2-1/8 scale; False always decodes at native resolution
+
+# Tiled high-resolution inference (small debris in full-size camera frames)
+TILED_INFERENCE = False
+TILE_SIZE = 640  # Tile edge in native-resolution pixels
+TILE_OVERLAP = 0.2  # Fraction of a tile shared with its neighbour
+TILE_REGION = 'floor'  # Region band to tile ('floor', 'wall', ...), None for the full frame
+TILE_NMS_IOU = 0.5  # Merges boxes found in several tiles
 
 # OWL-ViT Configuration
 USE_OWLVIT = False  # Set to True to use OWL-ViT detector
 OWLVIT_CONFIDENCE = 0.1  # Lower threshold for OWL-ViT (more sensitive)
+OWLVIT_QUANTIZE = False  # Dynamic int8 quantization of the OWL-ViT transformers (CPU only)
+
+# Cascaded detection: YOLO always runs, OWL-ViT only when cheap signals call for it
+OWLVIT_CASCADE = True  # False runs OWL-ViT on every frame
+CASCADE_DEBRIS_THRESHOLD = 0.7  # Run OWL-ViT when the floor debris score is below this
+CASCADE_UNIFORMITY_THRESHOLD = 0.5  # ... or the floor uniformity score is below this
+CASCADE_RATING_MARGIN = 2.5  # ... or the provisional total is within this many points of a rating threshold
+CASCADE_MISSING_BIN = False  # ... or YOLO found no trash bin; only applies to weights with a bin class (stock COCO has none)
+
+# On-disk cache for derived model artifacts (text embeddings, exports)
+MODEL_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'cache')
+
+# Analysis result cache for the web API (keyed by image content + config)
+RESULT_CACHE_ENTRIES = 128  # In-memory LRU entries
+RESULT_CACHE_DIR = os.path.join(MODEL_CACHE_DIR, 'results')  # None disables the disk tier
+RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Oldest disk entries are evicted beyond this
+
+# Face blurring (privacy) in the web API
+# Backend: 'cascade' (Haar cascades) or 'yunet' (OpenCV DNN, single pass). Only
+# switch to 'yunet' once benchmark_face_detection.py shows at least the cascade
+# recall on labelled classroom frames.
+FACE_DETECTOR_BACKEND = 'cascade'
+FACE_DNN_MODEL = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'face_detection_yunet_2023mar.onnx')  # Deployed with the code, never downloaded
+FACE_DNN_INPUT_SIZE = 1920  # Longer side frames are downscaled to for the DNN detector (small faces at the back need the resolution)
+FACE_DNN_CONFIDENCE = 0.6
+FACE_SHARED_PYRAMID = True  # Cascade backend: scan one shared image pyramid with all cascades in parallel threads (same faces as separate scans; faster only on large frames)
+FACE_MAX_DIMENSION = None  # Cascade backend: detect on frames downscaled to this longer side (misses small faces; set only after measuring recall on labelled frames)
+FACE_DETECTION_WORKERS = 3  # Cascade backend: threads scanning the pyramid (one per cascade)
+FACE_DUPLICATE_KEEP = 'first'  # Cascade backend: of overlapping hits keep the 'first' (baseline) or the 'largest' (widest blur)
+FACE_ANONYMIZATION = 'gaussian'  # 'gaussian' (per-face 99x99 blur), or 'pixelate', 'box' (stacked box blurs), 'fill' (solid)
+FACE_ANONYMIZATION_LEVEL = 8  # 'pixelate'/'box': max blocks/blur widths across the largest face (lower = less recognizable; 8 is weaker than 'gaussian' on classroom-sized faces)
+
+# Privacy stage in the analysis: faces are searched around YOLO 'person' boxes
+PRIVACY_PERSON_ROI = True  # False always searches the full frame
+PRIVACY_HEAD_FRACTION = 0.5  # Upper share of each person box searched for faces
+PRIVACY_ROI_MARGIN = 0.15  # Person box grown by this fraction of its size before cropping
+PRIVACY_FULL_FRAME_FALLBACK = True  # Search the full frame when YOLO finds no person; False skips empty classrooms
 
 # Classroom-specific objects for OWL-ViT detection
 CLASSROOM_OBJECTS = [
@@ -1,116 +1,288 @@
 import argparse
 import cv2
+import numpy as np
 from models.detector import ObjectDetector
+from models.detections import Detections
+from models.class_registry import REGISTRY
+from models.tiling import merge_detections
+from models.fusion import fuse_detections
 from utils.image_processor import ImageProcessor
+from utils.image_features import ImageFeatures
 from utils.leaderboard import Leaderboard
-from scoring.floor_score import FloorScorer
-from scoring.furniture_score import FurnitureScorer
-from scoring.trash_score import TrashScorer
-from scoring.wall_score import WallScorer
-from scoring.clutter_score import ClutterScorer
+from scoring.pipeline import ScoringPipeline
+from scoring.batch import frame_statistics
 import config
 
-# Try to import OWL-ViT (optional)
-try:
-    from models.owlvit_detector import OWLViTDetector
-    OWLVIT_AVAILABLE = True
-except ImportError:
-    OWLVIT_AVAILABLE = False
-    print("⚠️  OWL-ViT not available. Install with: pip install transformers torch")
+# Heavy dependencies (ultralytics, torch, transformers, pandas) are imported
+# by the code paths that need them, so short CLI runs start quickly.
+
+def _load_owlvit_detector():
+    """Import and create the optional OWL-ViT detector (None if not installed)"""
+    try:
+        from models.owlvit_detector import OWLViTDetector
+    except ImportError:
+        print("⚠️  OWL-ViT not available. Install with: pip install transformers torch")
+        return None
+    
+    print("\n🦉 Initializing OWL-ViT detector...")
+    return OWLViTDetector()
 
 class ClassroomCleanliness:
     """Main class for classroom cleanliness assessment"""
     
-    def __init__(self, use_owlvit=False):
-        self.detector = ObjectDetector()
+    SCORE_LABELS = {
+        'floor': 'Floor Cleanliness',
+        'furniture': 'Furniture Orderliness',
+        'trash': 'Trash Bin Condition',
+        'wall': 'Wall/Board Cleanliness',
+        'clutter': 'Clutter Detection',
+    }
+    
+    def __init__(self, use_owlvit=False, face_blurrer=None):
+        """
+        Args:
+            use_owlvit: Also run the OWL-ViT detector when YOLO is not conclusive
+            face_blurrer: Optional utils.face_blur.FaceBlurrer; when set, every
+                analysis also returns the frame with faces anonymized
+        """
+        if config.DETECTOR_BACKEND == 'onnx':
+            from models.onnx_detector import ONNXObjectDetector
+            self.detector = ONNXObjectDetector()
+        else:
+            self.detector = ObjectDetector()
         self.processor = ImageProcessor()
-        self.leaderboard = Leaderboard()
+        self.leaderboard = Leaderboard(max_frames=config.LEADERBOARD_MAX_FRAMES)
         
         # Initialize OWL-ViT if requested and available
-        self.use_owlvit = use_owlvit and OWLVIT_AVAILABLE
-        if self.use_owlvit:
-            print("\n🦉 Initializing OWL-ViT detector...")
-            self.owlvit_detector = OWLViTDetector()
-        else:
-            self.owlvit_detector = None
+        self.owlvit_detector = _load_owlvit_detector() if use_owlvit else None
+        self.use_owlvit = self.owlvit_detector is not None
         
-        # Initialize scorers
-        self.floor_scorer = FloorScorer()
-        self.furniture_scorer = FurnitureScorer()
-        self.trash_scorer = TrashScorer()
-        self.wall_scorer = WallScorer()
-        self.clutter_scorer = ClutterScorer()
+        # Initialize scorers (config.SCORERS), run concurrently per frame
+        self.scoring = ScoringPipeline.from_config()
+        
+        # Privacy stage (face anonymization), may also be attached later
+        self.face_blurrer = face_blurrer
+    
+    def warm_up(self):
+        """Run the detectors once on a blank frame to trigger lazy allocations"""
+        dummy = np.zeros((config.IMAGE_SIZE[1], config.IMAGE_SIZE[0], 3), dtype=np.uint8)
+        
+        self.detector.detect_objects(dummy)
+        if self.use_owlvit and self.owlvit_detector:
+            # Also fills the OWL-ViT text embedding cache
+            self.owlvit_detector.detect_objects(
+                dummy,
+                config.CLASSROOM_OBJECTS,
+                confidence=config.OWLVIT_CONFIDENCE
+            )
     
     def analyze_classroom(self, image_path, classroom_id):
         """Analyze classroom image and calculate scores"""
         print(f"\nAnalyzing classroom: {classroom_id}")
         print("-" * 50)
         
-        # Load image
-        image = self.processor.load_image(image_path)
-        if image is None:
+        # One frame at a time, so the resize can reuse this thread's buffer
+        frame = self._load_and_preprocess(image_path, reuse_buffer=True)
+        if frame is None:
             print("Failed to load image")
             return None
-        
-        # Preprocess
-        resized, normalized = self.processor.preprocess(image)
-        
-        # Extract regions
-        regions = self.processor.extract_regions(resized)
+        image, resized = frame
         
         # Detect objects with YOLO
         print("Detecting objects with YOLOv8...")
         yolo_detections = self.detector.detect_objects(resized)
+        
+        return self._score_classroom(image, resized, yolo_detections, classroom_id)
+    
+    def analyze_classrooms(self, images, batch_size=config.DETECTION_BATCH_SIZE):
+        """
+        Analyze several classroom images with batched YOLO inference
+        
+        Args:
+            images: list of (image_path, classroom_id) tuples
+            batch_size: number of images per YOLO forward pass
+        
+        Returns:
+            list of result dicts in input order; None where an image could not
+            be loaded and the exception where its analysis raised, so one bad
+            image does not fail the others
+        """
+        results = []
+        
+        # Work chunk by chunk so only one batch of frames is held in memory
+        for start in range(0, len(images), batch_size):
+            chunk = images[start:start + batch_size]
+            frames = [self._try_load(image_path) for image_path, _ in chunk]
+            loaded = [frame[1] for frame in frames if isinstance(frame, tuple)]
+            
+            print(f"\nDetecting objects in {len(loaded)} image(s) with YOLOv8 (batched)...")
+            try:
+                batch_detections = self.detector.detect_objects_batch(loaded, batch_size=batch_size)
+            except Exception as e:
+                # Find the frame that breaks the batch by detecting one at a time
+                print(f"Batched detection failed ({e}), detecting images one by one")
+                batch_detections = [self._try_detect(resized) for resized in loaded]
+            batch_detections = iter(batch_detections)
+            
+            for (image_path, classroom_id), frame in zip(chunk, frames):
+                print(f"\nAnalyzing classroom: {classroom_id}")
+                print("-" * 50)
+                
+                if not isinstance(frame, tuple):
+                    print("Failed to load image")
+                    results.append(frame)
+                    continue
+                
+                image, resized = frame
+                detections = next(batch_detections)
+                if isinstance(detections, Exception):
+                    results.append(detections)
+                    continue
+                
+                try:
+                    results.append(self._score_classroom(image, resized, detections, classroom_id))
+                except Exception as e:
+                    print(f"Analysis failed: {e}")
+                    results.append(e)
+        
+        return results
+    
+    def _try_load(self, image_path):
+        """_load_and_preprocess, returning the exception instead of raising"""
+        try:
+            return self._load_and_preprocess(image_path)
+        except Exception as e:
+            print(f"Failed to load {image_path}: {e}")
+            return e
+    
+    def _try_detect(self, resized):
+        """YOLO detection of one frame, returning the exception instead of raising"""
+        try:
+            return self.detector.detect_objects(resized)
+        except Exception as e:
+            print(f"Detection failed: {e}")
+            return e
+    
+    def _load_and_preprocess(self, image_path, reuse_buffer=False):
+        """Load an image; returns (loaded image, resized image) or None"""
+        image = self.processor.load_image(image_path, target_size=self._decode_size())
+        if image is None:
+            return None
+        
+        resized = self.processor.preprocess(image, reuse_buffer=reuse_buffer)
+        return image, resized
+    
+    def _decode_size(self):
+        """Size to decode images at, or None when native resolution is needed"""
+        native = (
+            not config.DECODE_AT_TARGET_SIZE or
+            config.TILED_INFERENCE or
+            self.scoring.needs_input('image') or
+            self.face_blurrer is not None  # The anonymized frame is saved at full size
+        )
+        return None if native else self.processor.target_size
+    
+    def _detect_tiled(self, detect_tiled, image, resized, **kwargs):
+        """Run a detector over native-resolution tiles, mapped to analysis coordinates"""
+        y_range = None
+        if config.TILE_REGION:
+            y_range = self.processor.region_bounds(image.shape[0], config.TILE_REGION)
+        
+        detections = detect_tiled(
+            image,
+            tile_size=config.TILE_SIZE,
+            overlap=config.TILE_OVERLAP,
+            y_range=y_range,
+            **kwargs
+        )
+        return detections.scale(resized.shape[1] / image.shape[1], resized.shape[0] / image.shape[0])
+    
+    def _score_classroom(self, image, resized, yolo_detections, classroom_id):
+        """Run OWL-ViT and all scorers on a preprocessed image"""
+        # Color conversions, edges and region statistics shared by all scorers
+        features = ImageFeatures(resized)
+        
+        # Add small objects found at native resolution
+        if config.TILED_INFERENCE:
+            print("Running tiled high-resolution YOLOv8 detection...")
+            tiled = self._detect_tiled(self.detector.detect_objects_tiled, image, resized)
+            yolo_detections = merge_detections([yolo_detections, tiled], config.TILE_NMS_IOU)
+        
         print(f"YOLOv8 found {len(yolo_detections)} objects")
         
-        # Detect classroom-specific objects with OWL-ViT if enabled
-        owlvit_detections = []
+        # Anonymize faces, searching around the people YOLO found
+        privacy = self._privacy_stage(image, resized, yolo_detections)
+        
+        # Score with YOLO alone first; OWL-ViT only runs when this is not enough
+        scores, details, timings = self._calculate_scores(image, features, yolo_detections)
+        detections = yolo_detections
+        
+        owlvit_detections = Detections()
+        cascade_reasons = []
         if self.use_owlvit and self.owlvit_detector:
-            print("\n🦉 Detecting classroom-specific objects with OWL-ViT...")
+            cascade_reasons = self._owlvit_reasons(details, sum(scores.values()))
+        
+        if cascade_reasons:
+            print(f"\n🦉 Detecting classroom-specific objects with OWL-ViT ({', '.join(cascade_reasons)})...")
             owlvit_detections = self.owlvit_detector.detect_objects(
                 resized, 
                 config.CLASSROOM_OBJECTS,
                 confidence=config.OWLVIT_CONFIDENCE
             )
+            
+            if config.TILED_INFERENCE:
+                tiled = self._detect_tiled(
+                    self.owlvit_detector.detect_objects_tiled, image, resized,
+                    text_queries=config.CLASSROOM_OBJECTS,
+                    confidence=config.OWLVIT_CONFIDENCE
+                )
+                owlvit_detections = merge_detections([owlvit_detections, tiled], config.TILE_NMS_IOU)
+            
             print(f"OWL-ViT found {len(owlvit_detections)} additional objects")
+            
+            # Merge objects both detectors found, then combine detections
+            if len(owlvit_detections):
+                owlvit_count = len(owlvit_detections)
+                yolo_detections, owlvit_detections = fuse_detections(
+                    yolo_detections,
+                    owlvit_detections,
+                    config.FUSION_SYNONYMS,
+                    config.FUSION_IOU_THRESHOLD
+                )
+                print(f"Fused {owlvit_count - len(owlvit_detections)} OWL-ViT detections into YOLOv8 boxes")
+            
+            detections = Detections.concatenate([yolo_detections, owlvit_detections])
+            
+            # Re-score with the combined detections
+            scores, details, timings = self._calculate_scores(image, features, detections)
+        elif self.use_owlvit:
+            print("\n⏭️  Skipping OWL-ViT: YOLOv8 result is conclusive")
         
-        # Combine detections
-        detections = yolo_detections + owlvit_detections
+        detection_path = 'yolo+owlvit' if cascade_reasons else 'yolo'
         print(f"\nTotal objects detected: {len(detections)}")
         
-        # Calculate individual scores
-        print("\nCalculating scores...")
-        
-        floor_score = self.floor_scorer.calculate_score(regions['floor'], detections)
-        furniture_score = self.furniture_scorer.calculate_score(resized, detections)
-        trash_score = self.trash_scorer.calculate_score(resized, detections)
-        wall_score = self.wall_scorer.calculate_score(regions['wall'], detections)
-        clutter_score = self.clutter_scorer.calculate_score(detections)
-        
         # Calculate total score
-        total_score = (floor_score + furniture_score + trash_score + 
-                      wall_score + clutter_score)
+        total_score = sum(scores.values())
         
         # Determine rating
         rating = self._get_rating(total_score)
         
         # Prepare results
-        scores = {
-            'floor': round(floor_score, 2),
-            'furniture': round(furniture_score, 2),
-            'trash': round(trash_score, 2),
-            'wall': round(wall_score, 2),
-            'clutter': round(clutter_score, 2)
-        }
+        scores = {name: round(score, 2) for name, score in scores.items()}
         
         # Display results
         self._display_results(classroom_id, scores, total_score, rating)
         
-        # Save to leaderboard
-        self.leaderboard.add_score(classroom_id, scores, total_score, rating)
+        # Save to leaderboard, with what is needed to re-score it later
+        statistics = frame_statistics(features, details)
+        self.leaderboard.add_score(
+            classroom_id, scores, total_score, rating,
+            detections=detections.to_dicts(),
+            statistics=statistics
+        )
         
-        # Draw detections
-        annotated = self.detector.draw_detections(resized, yolo_detections)
+        # Draw detections (on the anonymized frame when faces were found)
+        annotated = self.detector.draw_detections(privacy['annotation_base'], yolo_detections)
         
         # Draw OWL-ViT detections if available
         if owlvit_detections and self.owlvit_detector:
@@ -118,10 +290,7 @@ class ClassroomCleanliness:
         
         # Print detection summary
         print("\n📋 Detected Objects:")
-        object_counts = {}
-        for det in detections:
-            obj_class = det['class']
-            object_counts[obj_class] = object_counts.get(obj_class, 0) + 1
+        object_counts = detections.count_by_class()
         
         for obj_class, count in sorted(object_counts.items()):
             print(f"   • {obj_class}: {count}")
@@ -131,9 +300,155 @@ class ClassroomCleanliness:
             'total_score': total_score,
             'rating': rating,
             'annotated_image': annotated,
-            'detections': detections
+            'detections': detections,
+            'details': details,
+            'scorer_timings_ms': timings,
+            'detection_path': detection_path,
+            'cascade_reasons': cascade_reasons,
+            'statistics': statistics,
+            'blurred_image': privacy['blurred_image'],
+            'face_locations': privacy['face_locations'],
+            'face_search': privacy['face_search']
+        }
+    
+    def _privacy_stage(self, image, resized, detections):
+        """
+        Find and anonymize faces
+        
+        Faces are only searched in the upper part of each YOLO person box;
+        frames without people fall back to a full-frame search (or skip it,
+        see config.PRIVACY_FULL_FRAME_FALLBACK).
+        
+        Args:
+            image: loaded frame (native resolution)
+            resized: analysis-size frame the detections refer to
+            detections: YOLO Detections of the frame
+        
+        Returns:
+            dict with 'blurred_image' (anonymized copy of image, or None
+            without a face blurrer), 'face_locations' (list of dicts in image
+            coordinates), 'face_search' ('person regions', 'full frame',
+            'skipped' or None) and 'annotation_base' (resized frame to draw on)
+        """
+        if self.face_blurrer is None:
+            return {'blurred_image': None, 'face_locations': [], 'face_search': None, 'annotation_base': resized}
+        
+        persons = detections[detections.class_mask(['person'])]
+        
+        if config.PRIVACY_PERSON_ROI and len(persons):
+            regions = self._face_search_regions(persons, image.shape, resized.shape)
+            faces = self.face_blurrer.detect_faces_in_regions(image, regions)
+            face_search = 'person regions'
+        elif not config.PRIVACY_PERSON_ROI or config.PRIVACY_FULL_FRAME_FALLBACK:
+            faces = self.face_blurrer.detect_faces(image)
+            face_search = 'full frame'
+        else:
+            faces = []
+            face_search = 'skipped'
+        
+        print(f"🔒 {len(faces)} face(s) anonymized (searched: {face_search}"
+              f"{f', {len(persons)} person(s)' if len(persons) else ''})")
+        
+        blurred = self.face_blurrer.anonymize(image.copy(), faces)
+        annotation_base = resized
+        if faces:
+            # Same faces on the analysis-size frame used for the annotated output
+            sx = resized.shape[1] / image.shape[1]
+            sy = resized.shape[0] / image.shape[0]
+            scaled = [
+                (int(x * sx), int(y * sy), max(1, int(round(w * sx))), max(1, int(round(h * sy))))
+                for x, y, w, h in faces
+            ]
+            annotation_base = self.face_blurrer.anonymize(resized.copy(), scaled)
+        
+        return {
+            'blurred_image': blurred,
+            'face_locations': [
+                {'x': int(x), 'y': int(y), 'width': int(w), 'height': int(h)}
+                for x, y, w, h in faces
+            ],
+            'face_search': face_search,
+            'annotation_base': annotation_base
         }
     
+    def _face_search_regions(self, persons, image_shape, resized_shape):
+        """
+        Head regions of person boxes in loaded-image coordinates
+        
+        Returns:
+            list of (x1, y1, x2, y2) int tuples
+        """
+        scale = np.array([
+            image_shape[1] / resized_shape[1], image_shape[0] / resized_shape[0]
+        ] * 2, dtype=np.float32)
+        boxes = persons.boxes * scale
+        
+        widths = boxes[:, 2] - boxes[:, 0]
+        heights = boxes[:, 3] - boxes[:, 1]
+        x1 = boxes[:, 0] - widths * config.PRIVACY_ROI_MARGIN
+        x2 = boxes[:, 2] + widths * config.PRIVACY_ROI_MARGIN
+        y1 = boxes[:, 1] - heights * config.PRIVACY_ROI_MARGIN
+        y2 = boxes[:, 1] + heights * config.PRIVACY_HEAD_FRACTION
+        
+        regions = np.stack([x1, y1, x2, y2], axis=1)
+        regions = np.clip(regions, 0, [image_shape[1], image_shape[0]] * 2).astype(int)
+        return [tuple(region) for region in regions.tolist()]
+    
+    def _calculate_scores(self, image, features, detections):
+        """
+        Run every scorer once
+        
+        Scorers get the analysis-size frame through `features`; a scorer that
+        declares the 'image' input also receives the loaded frame, which is
+        then decoded at native resolution.
+        
+        Returns:
+            (unrounded {category: score}, {category: details dict},
+             {category: wall time in ms})
+        """
+        print("\nCalculating scores...")
+        
+        evaluations, timings = self.scoring.run(image=image, features=features, detections=detections)
+        print("   " + ", ".join(f"{name} {ms:.1f}ms" for name, ms in timings.items()))
+        
+        scores = {name: score for name, (score, _) in evaluations.items()}
+        details = {name: detail for name, (_, detail) in evaluations.items()}
+        return scores, details, timings
+    
+    def _owlvit_reasons(self, details, provisional_total):
+        """
+        Decide whether the YOLO-only result needs OWL-ViT
+        
+        Args:
+            details: scorer details from the YOLO-only evaluation
+            provisional_total: YOLO-only total score
+        
+        Returns:
+            list of reasons to run OWL-ViT (empty when YOLO is enough)
+        """
+        if not config.OWLVIT_CASCADE:
+            return ['cascade disabled']
+        
+        reasons = []
+        
+        floor = details['floor']
+        if floor['debris_score'] < config.CASCADE_DEBRIS_THRESHOLD:
+            reasons.append('floor debris')
+        if floor['uniformity_score'] < config.CASCADE_UNIFORMITY_THRESHOLD:
+            reasons.append('uneven floor')
+        
+        thresholds = [config.RATING_EXCELLENT, config.RATING_GOOD, config.RATING_FAIR]
+        if any(abs(provisional_total - t) <= config.CASCADE_RATING_MARGIN for t in thresholds):
+            reasons.append('near rating boundary')
+        
+        # Only meaningful when YOLO can detect bins at all (stock COCO weights
+        # cannot, which would send every frame to OWL-ViT)
+        if (config.CASCADE_MISSING_BIN and not details['trash']['bin_present'] and
+                REGISTRY.has_category(self.detector.class_names, 'bin')):
+            reasons.append('no trash bin')
+        
+        return reasons
+    
     def _get_rating(self, total_score):
         """Determine rating based on total score"""
         if total_score >= config.RATING_EXCELLENT:
@@ -150,20 +465,18 @@ class ClassroomCleanliness:
         print("\n" + "="*50)
         print(f"RESULTS FOR: {classroom_id}")
         print("="*50)
-        print(f"Floor Cleanliness:      {scores['floor']}/10")
-        print(f"Furniture Orderliness:  {scores['furniture']}/10")
-        print(f"Trash Bin Condition:    {scores['trash']}/10")
-        print(f"Wall/Board Cleanliness: {scores['wall']}/10")
-        print(f"Clutter Detection:      {scores['clutter']}/10")
+        for name, score in scores.items():
+            label = self.SCORE_LABELS.get(name, name.replace('_', ' ').title())
+            print(f"{label + ':':<24}{score}/10")
         print("-"*50)
-        print(f"TOTAL SCORE:            {total_score:.1f}/50")
+        print(f"TOTAL SCORE:            {total_score:.1f}/{10 * len(scores)}")
         print(f"RATING:                 {rating}")
         print("="*50 + "\n")
 
 def main():
     parser = argparse.ArgumentParser(description='Classroom Cleanliness Assessment')
-    parser.add_argument('--image', type=str, required=True, help='Path to classroom image')
-    parser.add_argument('--classroom', type=str, required=True, help='Classroom ID')
+    parser.add_argument('--image', type=str, help='Path to classroom image')
+    parser.add_argument('--classroom', type=str, help='Classroom ID')
     parser.add_argument('--show-leaderboard', action='store_true', help='Show leaderboard')
     parser.add_argument('--save-output', type=str, help='Save annotated image')
     parser.add_argument('--show-image', action='store_true', help='Display annotated image in window')
@@ -173,6 +486,14 @@ def main():
     
     args = parser.parse_args()
     
+    # Leaderboard-only runs never load the detection models
+    if args.show_leaderboard and not args.image and not args.classroom:
+        Leaderboard().display_leaderboard()
+        return
+    
+    if not args.image or not args.classroom:
+        parser.error('--image and --classroom are required (unless only --show-leaderboard is given)')
+    
     # Initialize system
     system = ClassroomCleanliness(use_owlvit=args.use_owlvit)
     
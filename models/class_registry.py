@@ -0,0 +1,82 @@
+"""
+Central class registry for scoring
+Maps YOLO class names and OWL-ViT query strings to integer ids and category
+bitmasks once, so scorers filter detections with array masks instead of
+matching strings per detection
+"""
+
+import threading
+import numpy as np
+from config import CLASS_CATEGORIES, FUSION_SYNONYMS
+
+class ClassRegistry:
+    """Global class vocabulary with a category bitmask per class"""
+    
+    def __init__(self, categories=CLASS_CATEGORIES, synonyms=FUSION_SYNONYMS):
+        """
+        Args:
+            categories: {category: {'names': [...], 'keywords': [...]}}
+            synonyms: {query: YOLO class or list of classes}; a query also gets
+                the categories of its synonyms
+        """
+        self.categories = categories
+        self.synonyms = synonyms
+        
+        # One bit per category, in declaration order
+        self.flags = {name: 1 << bit for bit, name in enumerate(categories)}
+        
+        self.names = []
+        self.ids = {}
+        self._bits = []
+        self._lock = threading.Lock()
+    
+    def flag(self, category):
+        """Bit flag of a category name (e.g. registry.flag('clutter'))"""
+        return self.flags[category]
+    
+    def register(self, name):
+        """Integer id of a class name, assigning one (and its bitmask) if new"""
+        class_id = self.ids.get(name)
+        if class_id is not None:
+            return class_id
+        
+        bits = self._match(name)
+        targets = self.synonyms.get(name, [])
+        for target in [targets] if isinstance(targets, str) else targets:
+            bits |= self._match(target)
+        
+        with self._lock:
+            if name not in self.ids:
+                self.ids[name] = len(self.names)
+                self.names.append(name)
+                self._bits.append(bits)
+            return self.ids[name]
+    
+    def register_all(self, names):
+        """Register a whole vocabulary (e.g. at detector startup)"""
+        return [self.register(name) for name in names]
+    
+    def bits(self, name):
+        """Category bitmask of a class name"""
+        return self._bits[self.register(name)]
+    
+    def vocab_bits(self, class_names):
+        """Bitmask per entry of a detection vocabulary, int64 array"""
+        return np.array([self.bits(name) for name in class_names], dtype=np.int64)
+    
+    def has_category(self, class_names, category):
+        """True if any class of a vocabulary belongs to category"""
+        return bool(np.any(self.vocab_bits(class_names) & self.flag(category)))
+    
+    def _match(self, name):
+        """Category bitmask from the name/keyword rules (string work, run once per class)"""
+        lowered = name.lower()
+        bits = 0
+        for category, rule in self.categories.items():
+            if (lowered in rule.get('names', ()) or
+                    any(keyword in lowered for keyword in rule.get('keywords', ()))):
+                bits |= self.flags[category]
+        return bits
+
+# Shared by the detectors (which register their vocabularies) and the scorers
+REGISTRY = ClassRegistry()
@@ -0,0 +1,191 @@
+"""
+Columnar detection container
+Stores boxes, scores and class ids in NumPy arrays instead of one dict per box
+"""
+
+import numpy as np
+from models.class_registry import REGISTRY
+
+class Detections:
+    """
+    Array-backed set of detections
+    
+    Attributes:
+        boxes: float32 array (N, 4) of [x1, y1, x2, y2]
+        scores: float32 array (N,) of confidences
+        class_ids: int array (N,) indexing into class_names
+        class_names: vocabulary list, class_names[id] -> class name
+    """
+    
+    def __init__(self, boxes=None, scores=None, class_ids=None, class_names=()):
+        self.boxes = np.asarray(boxes if boxes is not None else [], dtype=np.float32).reshape(-1, 4)
+        self.scores = np.asarray(scores if scores is not None else [], dtype=np.float32).reshape(-1)
+        self.class_ids = np.asarray(class_ids if class_ids is not None else [], dtype=np.int64).reshape(-1)
+        self.class_names = list(class_names)
+    
+    @classmethod
+    def from_dicts(cls, detections):
+        """Build from the legacy list-of-dicts format"""
+        class_names = []
+        name_to_id = {}
+        class_ids = []
+        for det in detections:
+            name = det['class']
+            if name not in name_to_id:
+                name_to_id[name] = len(class_names)
+                class_names.append(name)
+            class_ids.append(name_to_id[name])
+        
+        return cls(
+            boxes=[det['bbox'] for det in detections],
+            scores=[det['confidence'] for det in detections],
+            class_ids=class_ids,
+            class_names=class_names
+        )
+    
+    @classmethod
+    def concatenate(cls, detection_sets):
+        """Merge several Detections, unifying their class vocabularies"""
+        class_names = []
+        name_to_id = {}
+        boxes, scores, class_ids = [], [], []
+        
+        for dets in detection_sets:
+            # Lookup table from this set's ids to ids in the merged vocabulary
+            remap = np.empty(len(dets.class_names), dtype=np.int64)
+            for idx, name in enumerate(dets.class_names):
+                if name not in name_to_id:
+                    name_to_id[name] = len(class_names)
+                    class_names.append(name)
+                remap[idx] = name_to_id[name]
+            
+            boxes.append(dets.boxes)
+            scores.append(dets.scores)
+            class_ids.append(remap[dets.class_ids])
+        
+        if not boxes:
+            return cls()
+        
+        return cls(
+            boxes=np.concatenate(boxes),
+            scores=np.concatenate(scores),
+            class_ids=np.concatenate(class_ids),
+            class_names=class_names
+        )
+    
+    def __len__(self):
+        return len(self.scores)
+    
+    def __add__(self, other):
+        return Detections.concatenate([self, as_detections(other)])
+    
+    def __getitem__(self, index):
+        """Integer index -> dict view; mask, slice or index array -> Detections"""
+        if isinstance(index, (int, np.integer)):
+            return self._to_dict(int(index))
+        
+        return Detections(
+            boxes=self.boxes[index],
+            scores=self.scores[index],
+            class_ids=self.class_ids[index],
+            class_names=self.class_names
+        )
+    
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self._to_dict(idx)
+    
+    def offset(self, dx, dy):
+        """Copy with boxes shifted by (dx, dy), e.g. from tile to frame coordinates"""
+        return Detections(
+            boxes=self.boxes + np.array([dx, dy, dx, dy], dtype=np.float32),
+            scores=self.scores,
+            class_ids=self.class_ids,
+            class_names=self.class_names
+        )
+    
+    def scale(self, sx, sy):
+        """Copy with boxes scaled by (sx, sy), e.g. from native to analysis resolution"""
+        return Detections(
+            boxes=self.boxes * np.array([sx, sy, sx, sy], dtype=np.float32),
+            scores=self.scores,
+            class_ids=self.class_ids,
+            class_names=self.class_names
+        )
+    
+    @property
+    def centers(self):
+        """Box centers as a float32 array (N, 2)"""
+        return (self.boxes[:, :2] + self.boxes[:, 2:]) / 2
+    
+    @property
+    def classes(self):
+        """Class name of every detection as an object array (N,)"""
+        return np.array(self.class_names, dtype=object)[self.class_ids]
+    
+    def class_mask(self, names):
+        """Boolean mask of detections whose class is exactly one of names"""
+        names = set(names)
+        vocab_mask = np.array([name in names for name in self.class_names], dtype=bool)
+        return self._vocab_to_detection_mask(vocab_mask)
+    
+    def class_contains(self, keywords):
+        """Boolean mask of detections whose lowercased class contains any keyword"""
+        if isinstance(keywords, str):
+            keywords = [keywords]
+        
+        # String matching runs once per vocabulary entry, not once per detection
+        vocab_mask = np.array(
+            [any(keyword in name.lower() for keyword in keywords) for name in self.class_names],
+            dtype=bool
+        )
+        return self._vocab_to_detection_mask(vocab_mask)
+    
+    def category_mask(self, categories):
+        """Boolean mask of detections in any of the class registry categories"""
+        if isinstance(categories, str):
+            categories = [categories]
+        
+        flags = 0
+        for category in categories:
+            flags |= REGISTRY.flag(category)
+        
+        # Bitmasks were resolved once per class name by the registry
+        vocab_mask = (REGISTRY.vocab_bits(self.class_names) & flags) != 0
+        return self._vocab_to_detection_mask(vocab_mask)
+    
+    def _vocab_to_detection_mask(self, vocab_mask):
+        if len(vocab_mask) == 0:
+            return np.zeros(len(self), dtype=bool)
+        return vocab_mask[self.class_ids]
+    
+    def count_by_class(self):
+        """Number of detections per class name"""
+        counts = np.bincount(self.class_ids, minlength=len(self.class_names))
+        
+        # Vocabularies may repeat a name (e.g. duplicated OWL-ViT queries)
+        by_class = {}
+        for name, count in zip(self.class_names, counts):
+            if count:
+                by_class[name] = by_class.get(name, 0) + int(count)
+        return by_class
+    
+    def _to_dict(self, idx):
+        x1, y1, x2, y2 = self.boxes[idx].tolist()
+        return {
+            'class': self.class_names[self.class_ids[idx]],
+            'confidence': float(self.scores[idx]),
+            'bbox': [x1, y1, x2, y2],
+            'center': [(x1 + x2) / 2, (y1 + y2) / 2]
+        }
+    
+    def to_dicts(self):
+        """Legacy list-of-dicts view (JSON serializable)"""
+        return list(self)
+
+
+def as_detections(detections):
+    """Accept a Detections object or a legacy list of detection dicts"""
+    if isinstance(detections, Detections):
+        return detections
+    return Detections.from_dicts(detections)
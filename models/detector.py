@@ -1,7 +1,10 @@
-from ultralytics import YOLO
 import cv2
 import numpy as np
-from config import CONFIDENCE_THRESHOLD, CLUTTER_OBJECTS, FURNITURE_OBJECTS
+from models.detections import Detections, as_detections
+from models.class_registry import REGISTRY
+from models.tiling import detect_tiled
+from config import (CONFIDENCE_THRESHOLD, DETECTION_BATCH_SIZE, TILE_SIZE,
+                    TILE_OVERLAP, TILE_NMS_IOU)
 
 class ObjectDetector:
     """Handles object detection using YOLO"""
@@ -9,32 +12,91 @@ class ObjectDetector:
     def __init__(self, model_name='yolov8n.pt'):
         """Initialize YOLO model"""
         try:
+            # Imported here so torch is only loaded when a detector is built
+            from ultralytics import YOLO
             self.model = YOLO(model_name)
             print(f"Loaded model: {model_name}")
+            
+            # Resolve scoring categories for every class once, up front
+            REGISTRY.register_all(self.model.names.values())
         except Exception as e:
             print(f"Error loading model: {e}")
             self.model = None
     
+    @property
+    def class_names(self):
+        """Class vocabulary of the loaded model (empty if it failed to load)"""
+        if self.model is None:
+            return []
+        return list(self.model.names.values())
+    
     def detect_objects(self, image, confidence=CONFIDENCE_THRESHOLD):
         """Detect objects in image"""
         if self.model is None:
-            return []
+            return Detections()
         
         results = self.model(image, conf=confidence, verbose=False)
         
-        detections = []
-        for result in results:
-            boxes = result.boxes
-            for box in boxes:
-                detection = {
-                    'class': result.names[int(box.cls[0])],
-                    'confidence': float(box.conf[0]),
-                    'bbox': box.xyxy[0].cpu().numpy().tolist(),
-                    'center': self._get_center(box.xyxy[0].cpu().numpy())
-                }
-                detections.append(detection)
+        return Detections.concatenate([self._parse_result(result) for result in results])
+    
+    def detect_objects_batch(self, images, batch_size=DETECTION_BATCH_SIZE,
+                             confidence=CONFIDENCE_THRESHOLD):
+        """
+        Detect objects in several images with batched forward passes
+        
+        Args:
+            images: list of numpy arrays (BGR format from OpenCV)
+            batch_size: number of images stacked into one forward pass
+            confidence: detection threshold (0.0-1.0)
         
-        return detections
+        Returns:
+            list with one Detections per input image, in input order
+        """
+        if self.model is None:
+            return [Detections() for _ in images]
+        
+        all_detections = []
+        for start in range(0, len(images), batch_size):
+            chunk = list(images[start:start + batch_size])
+            results = self.model(chunk, conf=confidence, verbose=False)
+            
+            # Ultralytics returns one Results object per input image
+            for result in results:
+                all_detections.append(self._parse_result(result))
+        
+        return all_detections
+    
+    def detect_objects_tiled(self, image, tile_size=TILE_SIZE, overlap=TILE_OVERLAP,
+                             y_range=None, confidence=CONFIDENCE_THRESHOLD):
+        """
+        Detect small objects at native resolution with overlapping tiles
+        
+        Args:
+            image: full-resolution frame (BGR)
+            tile_size: tile edge length in pixels
+            overlap: fraction of a tile shared with its neighbour
+            y_range: optional (y_start, y_end) band to tile, e.g. the floor
+            confidence: detection threshold (0.0-1.0)
+        
+        Returns:
+            Detections in the coordinates of image
+        """
+        return detect_tiled(
+            lambda tiles: self.detect_objects_batch(tiles, confidence=confidence),
+            image, tile_size, overlap, y_range, iou_threshold=TILE_NMS_IOU
+        )
+    
+    def _parse_result(self, result):
+        """Convert one ultralytics Results object to Detections in bulk"""
+        boxes = result.boxes
+        class_names = [result.names[idx] for idx in range(len(result.names))]
+        
+        return Detections(
+            boxes=boxes.xyxy.cpu().numpy(),
+            scores=boxes.conf.cpu().numpy(),
+            class_ids=boxes.cls.cpu().numpy().astype(np.int64),
+            class_names=class_names
+        )
     
     def _get_center(self, bbox):
         """Calculate center point of bounding box"""
@@ -43,11 +105,12 @@ class ObjectDetector:
     
     def filter_by_class(self, detections, class_list):
         """Filter detections by class names"""
-        return [d for d in detections if d['class'] in class_list]
+        detections = as_detections(detections)
+        return detections[detections.class_mask(class_list)]
     
     def count_objects(self, detections, class_name):
         """Count objects of a specific class"""
-        return sum(1 for d in detections if d['class'] == class_name)
+        return int(np.count_nonzero(as_detections(detections).class_mask([class_name])))
     
     def draw_detections(self, image, detections):
         """Draw bounding boxes on image with color coding"""
@@ -66,12 +129,16 @@ class ObjectDetector:
             'cell phone': (255, 0, 255),  # Magenta
         }
         
-        for det in detections:
-            x1, y1, x2, y2 = map(int, det['bbox'])
-            label = f"{det['class']}: {det['confidence']:.2f}"
-            
-            # Get color based on object class
-            color = color_map.get(det['class'], (0, 255, 0))  # Default green
+        detections = as_detections(detections)
+        
+        # Resolve colors once per class instead of once per box
+        class_colors = [color_map.get(name, (0, 255, 0)) for name in detections.class_names]  # Default green
+        
+        for (x1, y1, x2, y2), score, class_id in zip(detections.boxes.astype(int).tolist(),
+                                                     detections.scores.tolist(),
+                                                     detections.class_ids.tolist()):
+            label = f"{detections.class_names[class_id]}: {score:.2f}"
+            color = class_colors[class_id]
             
             # Draw box with thicker line
             cv2.rectangle(img_copy, (x1, y1), (x2, y2), color, 3)
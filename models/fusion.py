@@ -0,0 +1,83 @@
+"""
+Cross-detector fusion of YOLO and OWL-ViT detections
+Merges boxes that both detectors report for the same object so scorers
+count each object once
+"""
+
+import numpy as np
+from models.detections import Detections
+from utils.geometry import pairwise_iou
+
+def synonym_matrix(yolo_names, owlvit_names, synonyms):
+    """
+    Boolean (len(yolo_names), len(owlvit_names)) table of compatible classes
+    
+    Built per vocabulary entry, so no string work happens per detection.
+    """
+    matrix = np.zeros((len(yolo_names), len(owlvit_names)), dtype=bool)
+    yolo_index = {}
+    for idx, name in enumerate(yolo_names):
+        yolo_index.setdefault(name, []).append(idx)
+    
+    for col, query in enumerate(owlvit_names):
+        targets = synonyms.get(query, [])
+        if isinstance(targets, str):
+            targets = [targets]
+        for target in targets:
+            matrix[yolo_index.get(target, []), col] = True
+    
+    return matrix
+
+def fuse_detections(yolo, owlvit, synonyms, iou_threshold):
+    """
+    Merge OWL-ViT boxes into the YOLO boxes they duplicate
+    
+    A YOLO and an OWL-ViT detection are the same object when their classes
+    are synonyms and each is the other's best IoU match above iou_threshold.
+    Matched pairs become one box: coordinates are the score-weighted mean of
+    both boxes, the class is the YOLO class and the confidence is the higher
+    of the two.
+    
+    Returns:
+        (fused YOLO Detections, OWL-ViT Detections that matched nothing)
+    """
+    if len(yolo) == 0 or len(owlvit) == 0:
+        return yolo, owlvit
+    
+    compatible = synonym_matrix(yolo.class_names, owlvit.class_names, synonyms)
+    compatible = compatible[yolo.class_ids][:, owlvit.class_ids]
+    
+    iou = pairwise_iou(yolo.boxes, owlvit.boxes)
+    iou = np.where(compatible & (iou >= iou_threshold), iou, 0)
+    
+    # Mutual best matches give a one-to-one assignment without a Python loop
+    best_owlvit = iou.argmax(axis=1)
+    best_yolo = iou.argmax(axis=0)
+    yolo_idx = np.arange(len(yolo))
+    matched = (iou[yolo_idx, best_owlvit] > 0) & (best_yolo[best_owlvit] == yolo_idx)
+    
+    yolo_matched = yolo_idx[matched]
+    owlvit_matched = best_owlvit[matched]
+    
+    # Weighted box fusion of each matched pair
+    yolo_scores = yolo.scores[yolo_matched, None]
+    owlvit_scores = owlvit.scores[owlvit_matched, None]
+    fused_boxes = yolo.boxes.copy()
+    fused_boxes[yolo_matched] = (
+        yolo.boxes[yolo_matched] * yolo_scores + owlvit.boxes[owlvit_matched] * owlvit_scores
+    ) / (yolo_scores + owlvit_scores)
+    
+    fused_scores = yolo.scores.copy()
+    fused_scores[yolo_matched] = np.maximum(yolo.scores[yolo_matched], owlvit.scores[owlvit_matched])
+    
+    fused = Detections(
+        boxes=fused_boxes,
+        scores=fused_scores,
+        class_ids=yolo.class_ids,
+        class_names=yolo.class_names
+    )
+    
+    unmatched = np.ones(len(owlvit), dtype=bool)
+    unmatched[owlvit_matched] = False
+    
+    return fused, owlvit[unmatched]
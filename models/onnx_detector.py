@@ -0,0 +1,201 @@
+"""
+ONNX Runtime YOLO Detector - CPU inference without the torch stack
+Exports the YOLO weights to ONNX once and runs them through onnxruntime
+"""
+
+import ast
+import os
+import cv2
+import numpy as np
+import onnxruntime as ort
+from models.detector import ObjectDetector
+from models.detections import Detections
+from models.class_registry import REGISTRY
+from utils.geometry import nms
+from config import CONFIDENCE_THRESHOLD, DETECTION_BATCH_SIZE
+
+# Ultralytics predict() defaults, so results match the torch backend
+NMS_IOU_THRESHOLD = 0.7
+MAX_DETECTIONS = 300
+MAX_NMS_CANDIDATES = 30000
+MAX_BOX_WH = 7680  # Class offset used to run NMS per class in one pass
+LETTERBOX_COLOR = (114, 114, 114)
+DEFAULT_STRIDE = 32  # Largest YOLOv8 stride; inputs are padded to a multiple of it
+
+
+class ONNXObjectDetector(ObjectDetector):
+    """YOLO object detector running an exported ONNX model on CPU"""
+    
+    def __init__(self, model_name='yolov8n.pt', imgsz=640):
+        """Load (exporting on first use) the ONNX version of a YOLO model"""
+        self.imgsz = imgsz
+        self.stride = DEFAULT_STRIDE
+        self.dynamic = False
+        self.names = {}
+        self.model = None
+        
+        try:
+            onnx_path = self._get_onnx_path(model_name)
+            
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            self.session = ort.InferenceSession(
+                onnx_path, sess_options=options, providers=['CPUExecutionProvider']
+            )
+            model_input = self.session.get_inputs()[0]
+            self.input_name = model_input.name
+            
+            # A static export only accepts the full imgsz x imgsz square
+            self.dynamic = not all(isinstance(dim, int) for dim in model_input.shape[2:])
+            
+            # Ultralytics stores the class names dict (and stride) in the model metadata
+            metadata = self.session.get_modelmeta().custom_metadata_map
+            self.names = ast.literal_eval(metadata['names'])
+            self.stride = int(ast.literal_eval(metadata.get('stride', str(DEFAULT_STRIDE))))
+            REGISTRY.register_all(self.names.values())
+            
+            self.model = self.session
+            print(f"Loaded ONNX model: {onnx_path}")
+        except Exception as e:
+            print(f"Error loading ONNX model: {e}")
+            self.model = None
+    
+    @property
+    def class_names(self):
+        """Class vocabulary from the ONNX metadata (empty if it failed to load)"""
+        return list(self.names.values())
+    
+    def _get_onnx_path(self, model_name):
+        """Return the cached ONNX file next to the weights, exporting it if missing"""
+        onnx_path = os.path.splitext(model_name)[0] + '.onnx'
+        if os.path.exists(onnx_path):
+            return onnx_path
+        
+        # Export needs ultralytics only once; later runs just load the .onnx file
+        print(f"Exporting {model_name} to ONNX (first run only)...")
+        from ultralytics import YOLO
+        exported = YOLO(model_name).export(format='onnx', imgsz=self.imgsz, dynamic=True)
+        return str(exported)
+    
+    def detect_objects(self, image, confidence=CONFIDENCE_THRESHOLD):
+        """Detect objects in image"""
+        if self.model is None:
+            return Detections()
+        
+        return self._run([image], confidence)[0]
+    
+    def detect_objects_batch(self, images, batch_size=DETECTION_BATCH_SIZE,
+                             confidence=CONFIDENCE_THRESHOLD):
+        """Detect objects in several images with batched forward passes"""
+        if self.model is None:
+            return [Detections() for _ in images]
+        
+        all_detections = []
+        for start in range(0, len(images), batch_size):
+            all_detections.extend(self._run(images[start:start + batch_size], confidence))
+        
+        return all_detections
+    
+    def _run(self, images, confidence):
+        """Letterbox, infer and post-process a list of images"""
+        # Like ultralytics: minimal padding when all images share a shape
+        # (one input size for the batch), the full square otherwise
+        auto = self.dynamic and len({image.shape for image in images}) == 1
+        
+        blobs = []
+        letterbox_params = []
+        for image in images:
+            blob, gain, pad = self._letterbox(image, auto=auto)
+            blobs.append(blob)
+            letterbox_params.append((gain, pad))
+        
+        batch = np.stack(blobs)
+        
+        # Output shape: (batch, 4 + num_classes, num_anchors)
+        predictions = self.session.run(None, {self.input_name: batch})[0]
+        
+        return [
+            self._postprocess(prediction, image.shape, gain, pad, confidence)
+            for prediction, image, (gain, pad) in zip(predictions, images, letterbox_params)
+        ]
+    
+    def _letterbox(self, image, auto=True):
+        """
+        Resize with unchanged aspect ratio and pad, as ultralytics' LetterBox
+        
+        Args:
+            image: BGR image
+            auto: pad only up to the next multiple of the model stride
+                (ultralytics' minimal padding) instead of the full
+                imgsz x imgsz square
+        """
+        height, width = image.shape[:2]
+        gain = min(self.imgsz / height, self.imgsz / width)
+        new_w, new_h = int(round(width * gain)), int(round(height * gain))
+        
+        if (new_w, new_h) != (width, height):
+            image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+        
+        dw = self.imgsz - new_w
+        dh = self.imgsz - new_h
+        if auto:
+            dw, dh = dw % self.stride, dh % self.stride
+        dw /= 2
+        dh /= 2
+        top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+        left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+        image = cv2.copyMakeBorder(image, top, bottom, left, right,
+                                   cv2.BORDER_CONSTANT, value=LETTERBOX_COLOR)
+        
+        # BGR HWC uint8 -> RGB CHW float32 in [0, 1]
+        blob = image[:, :, ::-1].transpose(2, 0, 1)
+        blob = np.ascontiguousarray(blob, dtype=np.float32) / 255.0
+        
+        return blob, gain, (left, top)
+    
+    def _postprocess(self, prediction, image_shape, gain, pad, confidence):
+        """Confidence filter, per-class NMS and box rescaling for one image"""
+        prediction = prediction.T  # (num_anchors, 4 + num_classes)
+        class_scores = prediction[:, 4:]
+        
+        class_ids = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(class_ids)), class_ids]
+        
+        keep = scores > confidence
+        boxes = self._xywh_to_xyxy(prediction[keep, :4])
+        scores = scores[keep]
+        class_ids = class_ids[keep]
+        
+        class_names = [self.names[idx] for idx in range(len(self.names))]
+        if len(scores) == 0:
+            return Detections(class_names=class_names)
+        
+        # Keep only the strongest candidates before NMS
+        order = scores.argsort()[::-1][:MAX_NMS_CANDIDATES]
+        boxes, scores, class_ids = boxes[order], scores[order], class_ids[order]
+        
+        # Offset boxes by class so one NMS pass never merges different classes
+        offset_boxes = boxes + class_ids[:, None] * MAX_BOX_WH
+        keep = nms(offset_boxes, scores, NMS_IOU_THRESHOLD)[:MAX_DETECTIONS]
+        boxes, scores, class_ids = boxes[keep], scores[keep], class_ids[keep]
+        
+        # Map boxes back to the original image coordinates
+        boxes[:, [0, 2]] -= pad[0]
+        boxes[:, [1, 3]] -= pad[1]
+        boxes /= gain
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, image_shape[1])
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, image_shape[0])
+        
+        return Detections(boxes=boxes, scores=scores, class_ids=class_ids, class_names=class_names)
+    
+    @staticmethod
+    def _xywh_to_xyxy(boxes):
+        """Convert center/size boxes to corner coordinates"""
+        xyxy = np.empty_like(boxes)
+        half_w = boxes[:, 2] / 2
+        half_h = boxes[:, 3] / 2
+        xyxy[:, 0] = boxes[:, 0] - half_w
+        xyxy[:, 1] = boxes[:, 1] - half_h
+        xyxy[:, 2] = boxes[:, 0] + half_w
+        xyxy[:, 3] = boxes[:, 1] + half_h
+        return xyxy
@@ -7,30 +7,111 @@ import os
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'  # Suppress TensorFlow warnings
 os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
 
-from transformers import OwlViTProcessor, OwlViTForObjectDetection
+import hashlib
+from transformers import OwlViTConfig, OwlViTProcessor, OwlViTForObjectDetection
+from transformers.models.owlvit.modeling_owlvit import OwlViTObjectDetectionOutput
 import torch
 from PIL import Image
 import cv2
 import numpy as np
+from models.detections import Detections, as_detections
+from models.class_registry import REGISTRY
+from models.tiling import detect_tiled
+from config import (MODEL_CACHE_DIR, OWLVIT_QUANTIZE, DETECTION_BATCH_SIZE,
+                    TILE_SIZE, TILE_OVERLAP, TILE_NMS_IOU, CLASSROOM_OBJECTS)
 
 class OWLViTDetector:
     """Open-vocabulary object detector using OWL-ViT"""
     
-    def __init__(self, model_name="google/owlvit-base-patch32"):
-        """Initialize OWL-ViT model"""
+    def __init__(self, model_name="google/owlvit-base-patch32", cache_dir=MODEL_CACHE_DIR,
+                 quantize=OWLVIT_QUANTIZE):
+        """
+        Initialize OWL-ViT model
+        
+        Args:
+            model_name: Hugging Face model id
+            cache_dir: directory for cached text embeddings and quantized models
+            quantize: apply dynamic int8 quantization to the transformer
+                Linear layers (faster on CPU, slightly different scores)
+        """
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.quantize = quantize
+        
+        # Text embeddings per query tuple (queries rarely change between frames)
+        self._text_cache = {}
+        
         print(f"Loading OWL-ViT model: {model_name}")
         print("This may take a minute on first run...")
         
         try:
             self.processor = OwlViTProcessor.from_pretrained(model_name)
-            self.model = OwlViTForObjectDetection.from_pretrained(model_name)
+            if quantize:
+                self.model = self._load_quantized_model(model_name)
+            else:
+                self.model = OwlViTForObjectDetection.from_pretrained(model_name)
             self.model.eval()
             print("✓ OWL-ViT model loaded successfully!")
+            
+            # Resolve scoring categories for the default queries once, up front
+            REGISTRY.register_all(CLASSROOM_OBJECTS)
         except Exception as e:
             print(f"Error loading OWL-ViT: {e}")
             self.processor = None
             self.model = None
     
+    def _load_quantized_model(self, model_name):
+        """Load the int8 model from the disk cache, building it on first use"""
+        cache_path = self._quantized_cache_path()
+        if cache_path and os.path.exists(cache_path):
+            try:
+                # Rebuild the quantized structure without the fp32 weights and
+                # load tensors only: nothing in the cache is unpickled as code
+                model = self._quantize(OwlViTForObjectDetection(OwlViTConfig.from_pretrained(model_name)))
+                model.load_state_dict(torch.load(cache_path, map_location='cpu', weights_only=True))
+                print(f"✓ Loaded int8 OWL-ViT from cache: {cache_path}")
+                return model
+            except Exception as e:
+                print(f"Ignoring unreadable quantized model cache {cache_path}: {e}")
+        
+        print("Quantizing OWL-ViT to int8 (first run only)...")
+        model = self._quantize(OwlViTForObjectDetection.from_pretrained(model_name))
+        
+        if cache_path:
+            try:
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                torch.save(model.state_dict(), cache_path)
+            except OSError as e:
+                print(f"Could not save quantized model cache: {e}")
+        
+        return model
+    
+    @staticmethod
+    def _quantize(model):
+        """Dynamic int8 quantization of the vision and text transformers"""
+        model.eval()
+        
+        # Only the transformers; the small box/class heads stay fp32
+        owlvit = model.owlvit
+        owlvit.vision_model = torch.quantization.quantize_dynamic(
+            owlvit.vision_model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        owlvit.text_model = torch.quantization.quantize_dynamic(
+            owlvit.text_model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        return model
+    
+    def _quantized_cache_path(self):
+        """Disk cache file for the quantized weights (None when disk caching is off)"""
+        if not self.cache_dir:
+            return None
+        
+        # Packed int8 weights are tied to the torch version that wrote them
+        digest = hashlib.sha1(
+            f"{self.model_name}\n{torch.__version__}".encode("utf-8")
+        ).hexdigest()
+        return os.path.join(self.cache_dir, f"owlvit_int8_state_{digest}.pt")
+    
     def detect_objects(self, image, text_queries, confidence=0.1):
         """
         Detect objects by text description
@@ -42,55 +123,151 @@ class OWLViTDetector:
             confidence: detection threshold (0.0-1.0)
         
         Returns:
-            list of detections with format:
-            {
-                'class': object name,
-                'confidence': confidence score,
-                'bbox': [x1, y1, x2, y2],
-                'center': [cx, cy]
-            }
+            Detections whose class vocabulary is text_queries
+        """
+        return self.detect_objects_batch([image], text_queries, confidence)[0]
+    
+    def detect_objects_batch(self, images, text_queries, confidence=0.1,
+                             batch_size=DETECTION_BATCH_SIZE):
+        """
+        Detect objects by text description in several images
+        
+        Args:
+            images: list of numpy arrays (BGR format from OpenCV)
+            text_queries: list of object names to detect
+            confidence: detection threshold (0.0-1.0)
+            batch_size: number of images per vision tower forward pass
+        
+        Returns:
+            list with one Detections per input image, in input order
         """
         if self.model is None:
             print("OWL-ViT model not loaded!")
-            return []
-        
-        # Convert BGR to RGB
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        pil_image = Image.fromarray(image_rgb)
-        
-        # Prepare text queries
-        texts = [text_queries]
-        
-        # Process inputs
-        inputs = self.processor(text=texts, images=pil_image, return_tensors="pt")
-        
-        # Get predictions
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-        
-        # Post-process results
-        target_sizes = torch.Tensor([pil_image.size[::-1]])
-        results = self.processor.post_process_object_detection(
-            outputs=outputs,
-            threshold=confidence,
-            target_sizes=target_sizes
-        )[0]
-        
-        # Format detections
-        detections = []
-        for score, label, box in zip(results["scores"], results["labels"], results["boxes"]):
-            box = box.cpu().numpy()
-            x1, y1, x2, y2 = box
+            return [Detections(class_names=text_queries) for _ in images]
+        
+        # Text embeddings come from the cache; only the vision tower runs per frame
+        query_embeds = self.get_text_embeddings(text_queries)
+        
+        all_detections = []
+        for start in range(0, len(images), batch_size):
+            # Convert BGR to RGB
+            pil_images = [
+                Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+                for image in images[start:start + batch_size]
+            ]
+            pixel_values = self.processor(images=pil_images, return_tensors="pt").pixel_values
+            
+            # Get predictions
+            with torch.no_grad():
+                outputs = self._predict(pixel_values, query_embeds)
+            
+            # Post-process results
+            target_sizes = torch.Tensor([pil_image.size[::-1] for pil_image in pil_images])
+            results = self.processor.post_process_object_detection(
+                outputs=outputs,
+                threshold=confidence,
+                target_sizes=target_sizes
+            )
+            
+            # Labels index straight into the query list, so fill the arrays in bulk
+            for result in results:
+                all_detections.append(Detections(
+                    boxes=result["boxes"].cpu().numpy(),
+                    scores=result["scores"].cpu().numpy(),
+                    class_ids=result["labels"].cpu().numpy(),
+                    class_names=text_queries
+                ))
+        
+        return all_detections
+    
+    def detect_objects_tiled(self, image, text_queries, confidence=0.1, tile_size=TILE_SIZE,
+                             overlap=TILE_OVERLAP, y_range=None):
+        """
+        Detect small objects at native resolution with overlapping tiles
+        
+        Args:
+            image: full-resolution frame (BGR)
+            text_queries: list of object names to detect
+            confidence: detection threshold (0.0-1.0)
+            tile_size: tile edge length in pixels
+            overlap: fraction of a tile shared with its neighbour
+            y_range: optional (y_start, y_end) band to tile, e.g. the floor
+        
+        Returns:
+            Detections in the coordinates of image
+        """
+        return detect_tiled(
+            lambda tiles: self.detect_objects_batch(tiles, text_queries, confidence),
+            image, tile_size, overlap, y_range, iou_threshold=TILE_NMS_IOU
+        )
+    
+    def get_text_embeddings(self, text_queries):
+        """
+        Get text tower embeddings for a list of queries
+        
+        Embeddings are computed once per query tuple and kept in memory and
+        on disk, so the text transformer is skipped on every later frame.
+        
+        Returns:
+            tensor of shape (num_queries, embed_dim)
+        """
+        key = tuple(text_queries)
+        query_embeds = self._text_cache.get(key)
+        if query_embeds is not None:
+            return query_embeds
+        
+        cache_path = self._text_cache_path(key)
+        if cache_path and os.path.exists(cache_path):
+            try:
+                # Tensors only: nothing in the cache is unpickled as code
+                query_embeds = torch.load(cache_path, map_location='cpu', weights_only=True)
+            except Exception as e:
+                print(f"Ignoring unreadable text embedding cache {cache_path}: {e}")
+        
+        if query_embeds is None:
+            text_inputs = self.processor(text=[list(key)], return_tensors="pt")
+            with torch.no_grad():
+                query_embeds = self.model.owlvit.get_text_features(
+                    input_ids=text_inputs.input_ids,
+                    attention_mask=text_inputs.attention_mask
+                )
             
-            detection = {
-                'class': text_queries[label],
-                'confidence': float(score),
-                'bbox': [float(x1), float(y1), float(x2), float(y2)],
-                'center': [float((x1 + x2) / 2), float((y1 + y2) / 2)]
-            }
-            detections.append(detection)
-        
-        return detections
+            if cache_path:
+                try:
+                    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                    torch.save(query_embeds, cache_path)
+                except OSError as e:
+                    print(f"Could not save text embedding cache: {e}")
+        
+        self._text_cache[key] = query_embeds
+        return query_embeds
+    
+    def _text_cache_path(self, key):
+        """Disk cache file for a query tuple (None when disk caching is off)"""
+        if not self.cache_dir:
+            return None
+        
+        # Quantized text towers produce slightly different embeddings
+        model_key = f"{self.model_name}:int8" if self.quantize else self.model_name
+        digest = hashlib.sha1(
+            "\n".join((model_key,) + key).encode("utf-8")
+        ).hexdigest()
+        return os.path.join(self.cache_dir, f"owlvit_text_{digest}.pt")
+    
+    def _predict(self, pixel_values, query_embeds):
+        """Run the vision tower and box/class heads against cached text embeddings"""
+        feature_map = self.model.image_embedder(pixel_values=pixel_values)[0]
+        
+        batch_size, num_patches_h, num_patches_w, hidden_dim = feature_map.shape
+        image_feats = feature_map.reshape(batch_size, num_patches_h * num_patches_w, hidden_dim)
+        
+        # Same text queries for every image in the batch
+        batch_query_embeds = query_embeds.unsqueeze(0).expand(batch_size, -1, -1)
+        
+        pred_logits, _ = self.model.class_predictor(image_feats, batch_query_embeds)
+        pred_boxes = self.model.box_predictor(image_feats, feature_map)
+        
+        return OwlViTObjectDetectionOutput(logits=pred_logits, pred_boxes=pred_boxes)
     
     def draw_detections(self, image, detections):
         """Draw bounding boxes on image"""
@@ -106,16 +283,23 @@ class OWLViTDetector:
             'ballpen': (0, 255, 255),   # Yellow
         }
         
-        for det in detections:
-            x1, y1, x2, y2 = map(int, det['bbox'])
-            label = f"{det['class']}: {det['confidence']:.2f}"
-            
-            # Get color based on object class
+        detections = as_detections(detections)
+        
+        # Get color based on object class, once per query instead of once per box
+        class_colors = []
+        for name in detections.class_names:
             color = (0, 255, 0)  # Default green
             for key in color_map:
-                if key in det['class'].lower():
+                if key in name.lower():
                     color = color_map[key]
                     break
+            class_colors.append(color)
+        
+        for (x1, y1, x2, y2), score, class_id in zip(detections.boxes.astype(int).tolist(),
+                                                     detections.scores.tolist(),
+                                                     detections.class_ids.tolist()):
+            label = f"{detections.class_names[class_id]}: {score:.2f}"
+            color = class_colors[class_id]
             
             # Draw box
             cv2.rectangle(img_copy, (x1, y1), (x2, y2), color, 3)
@@ -0,0 +1,72 @@
+"""
+Tiled high-resolution inference helpers
+Cuts a native-resolution frame into overlapping tiles, runs a batched detector
+over them and merges the boxes back into frame coordinates
+"""
+
+from models.detections import Detections
+from utils.geometry import batched_nms
+
+def tile_grid(height, width, tile_size, overlap, y_range=None):
+    """
+    Corners of overlapping tiles covering a frame (or a horizontal band of it)
+    
+    Args:
+        height, width: frame size in pixels
+        tile_size: tile edge length in pixels
+        overlap: fraction of a tile shared with its neighbour (0.0-0.9)
+        y_range: optional (y_start, y_end) band to tile, e.g. the floor region
+    
+    Returns:
+        list of (x1, y1, x2, y2) tiles
+    """
+    y_start, y_end = y_range if y_range else (0, height)
+    stride = max(1, int(tile_size * (1 - overlap)))
+    
+    def starts(low, high):
+        if high - low <= tile_size:
+            return [low]
+        # Last tile is pinned to the far edge so nothing is left uncovered
+        return list(range(low, high - tile_size, stride)) + [high - tile_size]
+    
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, y_end))
+        for y in starts(y_start, y_end)
+        for x in starts(0, width)
+    ]
+
+def merge_detections(detection_sets, iou_threshold):
+    """Concatenate detection sets and drop per-class duplicates with NMS"""
+    merged = Detections.concatenate(detection_sets)
+    if len(merged) == 0:
+        return merged
+    
+    keep = batched_nms(merged.boxes, merged.scores, merged.class_ids, iou_threshold)
+    return merged[keep]
+
+def detect_tiled(detect_batch, image, tile_size, overlap, y_range=None, iou_threshold=0.5):
+    """
+    Run a batched detector over overlapping tiles of a frame
+    
+    Args:
+        detect_batch: callable taking a list of images and returning one
+            Detections per image
+        image: native-resolution frame (BGR)
+        tile_size, overlap, y_range: see tile_grid
+        iou_threshold: NMS threshold for boxes found in several tiles
+    
+    Returns:
+        Detections in frame coordinates
+    """
+    height, width = image.shape[:2]
+    tiles = tile_grid(height, width, tile_size, overlap, y_range)
+    
+    # Crops are views into the frame, no pixel copies
+    crops = [image[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles]
+    tile_detections = detect_batch(crops)
+    
+    shifted = [
+        detections.offset(x1, y1)
+        for detections, (x1, y1, _, _) in zip(tile_detections, tiles)
+    ]
+    return merge_detections(shifted, iou_threshold)
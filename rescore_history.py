@@ -0,0 +1,113 @@
+"""
+Re-score the stored score history under a candidate configuration
+Loads every leaderboard entry that was saved with its detections and frame
+statistics (stored per entry next to the history file), scores them all in
+one vectorized pass with the candidate settings, and prints how scores and
+ratings would change.
+
+Usage:
+    python rescore_history.py --config candidate_config.py
+    python rescore_history.py --config candidate_config.py --history data/scores.json --all
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import numpy as np
+import config
+from scoring.batch import DetectionBatch, score_batch
+from utils.leaderboard import Leaderboard
+
+def load_settings(path):
+    """Load a candidate config file; settings it does not define fall back to config.py"""
+    spec = importlib.util.spec_from_file_location('candidate_config', path)
+    candidate = importlib.util.module_from_spec(spec)
+    
+    # Start from the current settings so a candidate only lists what it changes
+    candidate.__dict__.update({name: getattr(config, name) for name in dir(config) if name.isupper()})
+    spec.loader.exec_module(candidate)
+    return candidate
+
+def load_history(history_file):
+    """
+    Leaderboard entries that can be re-scored, and how many could not
+    
+    Each returned entry carries its 'detections' and 'statistics'.
+    """
+    leaderboard = Leaderboard(history_file)
+    with open(history_file, 'r') as f:
+        data = json.load(f)
+    
+    entries = []
+    for entry in data:
+        frame = leaderboard.get_frame(entry)
+        if frame is not None:
+            entries.append(dict(entry, **frame))
+    return entries, len(data) - len(entries)
+
+def rescore(entries, settings):
+    """Scores of the entries under settings (see scoring.batch.score_batch)"""
+    batch = DetectionBatch.from_records(
+        (entry['detections'], entry['statistics']) for entry in entries
+    )
+    return score_batch(batch, settings)
+
+def print_deltas(entries, result, show_all=False):
+    """Print per-entry total/rating changes and a summary"""
+    old_totals = np.array([entry['total_score'] for entry in entries], dtype=np.float64)
+    new_totals = result['total_score']
+    deltas = new_totals - old_totals
+    rating_changed = np.array([
+        entry['rating'] != rating for entry, rating in zip(entries, result['rating'])
+    ], dtype=bool)
+    
+    print(f"\n{'Classroom':<20}{'Timestamp':<21}{'Old':>7}{'New':>7}{'Delta':>8}  Rating")
+    print("-" * 80)
+    for idx, entry in enumerate(entries):
+        if not (show_all or rating_changed[idx] or abs(deltas[idx]) >= 0.05):
+            continue
+        
+        rating = entry['rating']
+        if rating_changed[idx]:
+            rating = f"{entry['rating']} → {result['rating'][idx]}"
+        print(
+            f"{str(entry['classroom_id'])[:19]:<20}{entry['timestamp'][:19]:<21}"
+            f"{old_totals[idx]:>7.1f}{new_totals[idx]:>7.1f}{deltas[idx]:>+8.2f}  {rating}"
+        )
+    
+    print("-" * 80)
+    print(f"Entries re-scored:      {len(entries)}")
+    print(f"Mean total delta:       {deltas.mean():+.2f}")
+    print(f"Largest drop / rise:    {deltas.min():+.2f} / {deltas.max():+.2f}")
+    print(f"Rating changes:         {int(rating_changed.sum())}")
+    
+    for name, scores in result['scores'].items():
+        old = np.array([entry['scores'].get(name, np.nan) for entry in entries], dtype=np.float64)
+        print(f"   {name:<12} mean {np.nanmean(old):5.2f} → {scores.mean():5.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-score stored results under a candidate config')
+    parser.add_argument('--config', type=str, help='Candidate config file (default: current config.py)')
+    parser.add_argument('--history', type=str, default='data/scores.json', help='Leaderboard data file')
+    parser.add_argument('--all', action='store_true', help='List every entry, not only changed ones')
+    
+    args = parser.parse_args()
+    
+    if not os.path.exists(args.history):
+        parser.error(f"history file not found: {args.history}")
+    
+    settings = load_settings(args.config) if args.config else config
+    entries, skipped = load_history(args.history)
+    
+    print(f"📂 {args.history}: {len(entries)} entries with stored detections")
+    if skipped:
+        print(f"⚠️  Skipped {skipped} older entries saved without detections/statistics")
+    if not entries:
+        return
+    
+    result = rescore(entries, settings)
+    print_deltas(entries, result, show_all=args.all)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Vectorized batch scoring
+Re-computes the five built-in category scores for many stored frames at once
+from their detections and a few per-frame image statistics, without decoding
+images or re-running detection. Used to evaluate candidate thresholds and
+category definitions against the score history.
+"""
+
+import numpy as np
+import config
+from models.class_registry import ClassRegistry
+from models.detections import as_detections
+
+# Per-frame image statistics needed to re-score a frame
+FRAME_STATISTICS = (
+    'floor_height',
+    'floor_debris',
+    'floor_lightness_std',
+    'wall_edge_density',
+    'wall_board_variance',
+    'wall_patches',
+)
+
+def frame_statistics(features, details):
+    """
+    Image statistics the scorers' thresholds act on, for storage with a result
+    
+    The scorers measure them while evaluating the frame; they are only
+    collected here, not recomputed.
+    
+    Args:
+        features: ImageFeatures of the analyzed frame
+        details: {category: details dict} of the frame's final scoring,
+            with the built-in 'floor', 'wall' and 'trash' scorers
+    
+    Returns:
+        JSON-serializable dict; 'overflow_variances' holds one entry per
+        detection (None where the strip above the box is empty), so changing
+        which classes count as bins does not need the image
+    """
+    floor, wall = details['floor'], details['wall']
+    return {
+        'floor_height': int(features.region('floor').shape[0]),
+        'floor_debris': floor['debris_count'],
+        'floor_lightness_std': floor['lightness_std'],
+        'wall_edge_density': wall['edge_density'],
+        'wall_board_variance': wall['board_variance'],
+        'wall_patches': wall['patch_count'],
+        'overflow_variances': details['trash']['overflow_variances'],
+    }
+
+class DetectionBatch:
+    """
+    Detections of many frames flattened into shared arrays
+    
+    Attributes:
+        frame: int64 array (N,), frame index of every detection
+        boxes: float32 array (N, 4)
+        class_ids: int64 array (N,) indexing into class_names
+        class_names: vocabulary shared by all frames
+        overflow: float64 array (N,), variance above each box (NaN if empty)
+        statistics: {name: float64 array (F,)} for FRAME_STATISTICS
+    """
+    
+    def __init__(self, frame, boxes, class_ids, class_names, overflow, statistics):
+        self.frame = frame
+        self.boxes = boxes
+        self.class_ids = class_ids
+        self.class_names = class_names
+        self.overflow = overflow
+        self.statistics = statistics
+    
+    @classmethod
+    def from_records(cls, records):
+        """
+        Build from stored results
+        
+        Args:
+            records: iterable of (detections, statistics) pairs, detections as
+                Detections or a list of detection dicts and statistics as
+                returned by frame_statistics
+        """
+        class_names = []
+        name_to_id = {}
+        frame, boxes, class_ids, overflow = [], [], [], []
+        statistics = {name: [] for name in FRAME_STATISTICS}
+        
+        for index, (detections, stats) in enumerate(records):
+            detections = as_detections(detections)
+            
+            remap = np.empty(len(detections.class_names), dtype=np.int64)
+            for idx, name in enumerate(detections.class_names):
+                if name not in name_to_id:
+                    name_to_id[name] = len(class_names)
+                    class_names.append(name)
+                remap[idx] = name_to_id[name]
+            
+            frame.append(np.full(len(detections), index, dtype=np.int64))
+            boxes.append(detections.boxes)
+            class_ids.append(remap[detections.class_ids])
+            overflow.append(np.array(
+                [np.nan if v is None else v for v in stats['overflow_variances']],
+                dtype=np.float64
+            ).reshape(-1))
+            
+            for name in FRAME_STATISTICS:
+                statistics[name].append(stats[name])
+        
+        return cls(
+            frame=np.concatenate(frame) if frame else np.zeros(0, dtype=np.int64),
+            boxes=np.concatenate(boxes) if boxes else np.zeros((0, 4), dtype=np.float32),
+            class_ids=np.concatenate(class_ids) if class_ids else np.zeros(0, dtype=np.int64),
+            class_names=class_names,
+            overflow=np.concatenate(overflow) if overflow else np.zeros(0),
+            statistics={name: np.asarray(values, dtype=np.float64) for name, values in statistics.items()}
+        )
+    
+    def __len__(self):
+        return len(self.statistics['floor_height'])
+    
+    @property
+    def centers(self):
+        """Box centers as a float32 array (N, 2)"""
+        return (self.boxes[:, :2] + self.boxes[:, 2:]) / 2
+
+def score_batch(batch, settings=config):
+    """
+    Score every frame of a DetectionBatch in one pass
+    
+    Mirrors the built-in floor, furniture, trash, wall and clutter scorers;
+    per-frame loops become bincounts over the frame index and the
+    frame-local box tests run on all same-frame pairs at once.
+    
+    Args:
+        batch: DetectionBatch
+        settings: module or object with the config.py scoring settings
+            (categories, thresholds, rating cut-offs), e.g. a candidate config
+    
+    Returns:
+        dict with 'scores' ({category: float64 array (F,)}), 'total_score'
+        (float64 array (F,)) and 'rating' (object array (F,))
+    """
+    registry = ClassRegistry(settings.CLASS_CATEGORIES, settings.FUSION_SYNONYMS)
+    bits = registry.vocab_bits(batch.class_names)[batch.class_ids]
+    
+    def category(name):
+        return (bits & registry.flag(name)) != 0
+    
+    clutter, trash, bins = category('clutter'), category('trash'), category('bin')
+    chairs, tables = category('chair'), category('table')
+    
+    scores = {
+        'floor': _floor_scores(batch, clutter, settings),
+        'furniture': _furniture_scores(batch, chairs, tables, clutter, settings),
+        'trash': _trash_scores(batch, trash, bins, settings),
+        'wall': _wall_scores(batch, settings),
+        'clutter': _clutter_scores(batch, clutter, settings),
+    }
+    total = sum(scores.values())
+    
+    rating = np.select(
+        [total >= settings.RATING_EXCELLENT, total >= settings.RATING_GOOD, total >= settings.RATING_FAIR],
+        ['Excellent', 'Good', 'Fair'],
+        default='Poor'
+    ).astype(object)
+    
+    return {'scores': scores, 'total_score': total, 'rating': rating}
+
+def _count(batch, mask):
+    """Number of masked detections per frame"""
+    return np.bincount(batch.frame[mask], minlength=len(batch)).astype(np.float64)
+
+def _frame_pairs(batch, a_mask, b_mask):
+    """
+    Every (a, b) pair of detection indices from the same frame
+    
+    Detections are stored frame by frame, so each frame's b detections form
+    one contiguous run of np.flatnonzero(b_mask).
+    """
+    a_idx = np.flatnonzero(a_mask)
+    b_idx = np.flatnonzero(b_mask)
+    
+    b_counts = np.bincount(batch.frame[b_idx], minlength=len(batch))
+    b_starts = np.cumsum(b_counts) - b_counts
+    
+    reps = b_counts[batch.frame[a_idx]]
+    pair_a = np.repeat(a_idx, reps)
+    offsets = np.arange(reps.sum()) - np.repeat(np.cumsum(reps) - reps, reps)
+    pair_b = b_idx[np.repeat(b_starts[batch.frame[a_idx]], reps) + offsets]
+    return pair_a, pair_b
+
+def _inside_any(batch, a_mask, b_mask, margin=0):
+    """Per detection: its center is inside some same-frame b box (grown by margin)"""
+    pair_a, pair_b = _frame_pairs(batch, a_mask, b_mask)
+    centers = batch.centers[pair_a]
+    boxes = batch.boxes[pair_b]
+    
+    inside = (
+        (boxes[:, 0] - margin <= centers[:, 0]) & (centers[:, 0] <= boxes[:, 2] + margin) &
+        (boxes[:, 1] - margin <= centers[:, 1]) & (centers[:, 1] <= boxes[:, 3] + margin)
+    )
+    hit = np.zeros(len(batch.frame), dtype=bool)
+    hit[pair_a[inside]] = True
+    return hit
+
+def _floor_scores(batch, clutter, settings):
+    """FloorScorer.evaluate for every frame"""
+    stats = batch.statistics
+    floor_y_start = stats['floor_height'] * 0.6
+    on_floor = clutter & (batch.centers[:, 1] > floor_y_start[batch.frame])
+    
+    debris_score = np.maximum(0, 1 - stats['floor_debris'] / settings.FLOOR_DEBRIS_LIMIT)
+    uniformity = np.maximum(0, 1 - stats['floor_lightness_std'] / settings.FLOOR_STD_LIMIT)
+    
+    score = 10.0 - np.minimum(5, _count(batch, on_floor) * settings.FLOOR_CLUTTER_PENALTY)
+    score -= (1 - debris_score) * 3
+    score -= (1 - uniformity) * 2
+    return np.clip(score, 0, 10)
+
+def _furniture_scores(batch, chairs, tables, clutter, settings):
+    """FurnitureScorer.evaluate for every frame"""
+    n_chairs = _count(batch, chairs)
+    n_tables = _count(batch, tables)
+    score = np.full(len(batch), 10.0)
+    
+    # 1. Share of chairs near a table, only if the frame has both
+    near = _inside_any(batch, chairs, tables, settings.CHAIR_TABLE_MARGIN)
+    both = (n_chairs > 0) & (n_tables > 0)
+    alignment = np.divide(_count(batch, chairs & near), n_chairs, out=np.zeros(len(batch)), where=both)
+    score -= np.where(both, (1 - alignment) * 4, 0)
+    
+    # 2. Center variance of chairs and tables (a box in both counts twice)
+    members = np.concatenate([np.flatnonzero(chairs), np.flatnonzero(tables)])
+    frame = batch.frame[members]
+    centers = batch.centers[members].astype(np.float64)
+    n_furniture = np.bincount(frame, minlength=len(batch)).astype(np.float64)
+    safe_n = np.maximum(n_furniture, 1)
+    
+    variances = []
+    for axis in (1, 0):
+        mean = np.bincount(frame, centers[:, axis], minlength=len(batch)) / safe_n
+        variances.append(np.bincount(frame, (centers[:, axis] - mean[frame]) ** 2, minlength=len(batch)) / safe_n)
+    arrangement = np.where(
+        n_furniture > 2,
+        np.maximum(0, 1 - np.minimum(*variances) / settings.ARRANGEMENT_VARIANCE_LIMIT),
+        0
+    )
+    score -= np.where((n_chairs > 2) | (n_tables > 2), (1 - arrangement) * 3, 0)
+    
+    # 3. Clutter on table surfaces
+    on_table = _inside_any(batch, clutter, tables)
+    score -= np.minimum(3, _count(batch, clutter & on_table) * settings.SURFACE_CLUTTER_PENALTY)
+    
+    return np.clip(score, 0, 10)
+
+def _trash_scores(batch, trash, bins, settings):
+    """TrashScorer.evaluate for every frame"""
+    n_bins = _count(batch, bins)
+    
+    near_bin = _inside_any(batch, trash, bins, settings.TRASH_BIN_MARGIN)
+    trash_outside = np.minimum(2, _count(batch, trash & ~near_bin))
+    
+    overflowing = bins & (batch.overflow > settings.BIN_OVERFLOW_VARIANCE)  # NaN compares False
+    overflow_penalty = np.minimum(3, _count(batch, overflowing) * 1.5)
+    
+    score = 10.0 - trash_outside * 2 - overflow_penalty
+    
+    # No visible bin is a flat 3 point penalty
+    return np.where(n_bins > 0, np.clip(score, 0, 10), 7.0)
+
+def _wall_scores(batch, settings):
+    """WallScorer.evaluate for every frame"""
+    stats = batch.statistics
+    marks_penalty = np.minimum(4, stats['wall_edge_density'] * settings.WALL_EDGE_PENALTY)
+    board = np.maximum(0, 1 - stats['wall_board_variance'] / settings.BOARD_VARIANCE_LIMIT)
+    loose_items = np.minimum(2, stats['wall_patches'])
+    
+    score = 10.0 - marks_penalty - (1 - board) * 3 - loose_items * 1.5
+    return np.clip(score, 0, 10)
+
+def _clutter_scores(batch, clutter, settings):
+    """ClutterScorer.evaluate for every frame"""
+    penalty = np.minimum(10, _count(batch, clutter) * settings.CLUTTER_PENALTY)
+    return np.clip(10.0 - penalty, 0, 10)
@@ -1,42 +1,46 @@
+from models.detections import as_detections
+from config import CLUTTER_PENALTY
+
 class ClutterScorer:
     """Calculates object clutter detection score"""
     
+    inputs = ('detections',)
+    
     def calculate_score(self, detections):
+        """Calculate clutter score (0-10)"""
+        score, _ = self.evaluate(detections)
+        return score
+    
+    def evaluate(self, detections):
         """
-        Calculate clutter score (0-10)
+        Calculate clutter score (0-10) and its breakdown in one pass
         
         Metrics:
         - Bags, bottles, papers left on floor or desks
         - Number of detected clutter objects
+        
+        Returns:
+            (score, details dict)
         """
         score = 10.0
         
-        clutter_classes = ['backpack', 'handbag', 'bottle', 'book', 
-                          'cell phone', 'cup', 'paper', 'bag', 'umbrella']
-        
         # Count clutter objects
-        clutter_count = sum(1 for d in detections if d['class'] in clutter_classes)
+        detections = as_detections(detections)
+        clutter_items = detections[detections.category_mask('clutter')]
+        clutter_count = len(clutter_items)
         
         # Penalty based on clutter count
-        penalty = min(10, clutter_count * 1.5)
+        penalty = min(10, clutter_count * CLUTTER_PENALTY)
         score -= penalty
         
-        return max(0, min(10, score))
+        details = {
+            'total_clutter': clutter_count,
+            'clutter_by_type': clutter_items.count_by_class()
+        }
+        
+        return max(0, min(10, score)), details
     
     def get_details(self, detections):
         """Get detailed clutter analysis"""
-        clutter_classes = ['backpack', 'handbag', 'bottle', 'book', 
-                          'cell phone', 'cup', 'paper', 'bag', 'umbrella']
-        
-        clutter_items = [d for d in detections if d['class'] in clutter_classes]
-        
-        # Count by type
-        clutter_by_type = {}
-        for item in clutter_items:
-            class_name = item['class']
-            clutter_by_type[class_name] = clutter_by_type.get(class_name, 0) + 1
-        
-        return {
-            'total_clutter': len(clutter_items),
-            'clutter_by_type': clutter_by_type
-        }
+        _, details = self.evaluate(detections)
+        return details
@@ -1,91 +1,107 @@
 import cv2
 import numpy as np
+from models.detections import as_detections
+from utils.image_features import as_features, contour_areas
+from config import FLOOR_CLUTTER_PENALTY, FLOOR_DEBRIS_LIMIT, FLOOR_STD_LIMIT
 
 class FloorScorer:
     """Calculates floor cleanliness score"""
     
+    inputs = ('features', 'detections')
+    
     def calculate_score(self, floor_region, detections):
+        """Calculate floor cleanliness score (0-10)"""
+        score, _ = self.evaluate(floor_region, detections)
+        return score
+    
+    def evaluate(self, floor_region, detections):
         """
-        Calculate floor cleanliness score (0-10)
+        Calculate floor cleanliness score (0-10) and its breakdown in one pass
         
         Metrics:
         - Percentage of visible trash on floor
         - Presence of debris particles
         - Floor area coverage free from debris
+        
+        Args:
+            floor_region: ImageFeatures of the frame, or the floor crop itself
+            detections: Detections or list of detection dicts
+        
+        Returns:
+            (score, details dict)
         """
+        features = as_features(floor_region, 'floor')
         score = 10.0
         
         # 1. Check for clutter objects on floor (bottom region)
-        floor_clutter = self._count_floor_clutter(detections, floor_region.shape)
-        clutter_penalty = min(5, floor_clutter * 1.5)  # Max 5 points penalty
+        floor_clutter = self._count_floor_clutter(detections, features.region('floor').shape)
+        clutter_penalty = min(5, floor_clutter * FLOOR_CLUTTER_PENALTY)  # Max 5 points penalty
         score -= clutter_penalty
         
         # 2. Analyze floor texture for debris
-        debris_score = self._analyze_debris(floor_region)
+        debris_count = self._count_debris(features)
+        debris_score = self._analyze_debris(debris_count)
         score -= (1 - debris_score) * 3  # Max 3 points penalty
         
         # 3. Check floor uniformity (cleaner floors are more uniform)
-        uniformity_score = self._calculate_uniformity(floor_region)
+        lightness_std = self._lightness_std(features)
+        uniformity_score = self._calculate_uniformity(lightness_std)
         score -= (1 - uniformity_score) * 2  # Max 2 points penalty
         
-        return max(0, min(10, score))
+        details = {
+            'floor_clutter_count': floor_clutter,
+            'debris_score': round(debris_score, 2),
+            'uniformity_score': round(uniformity_score, 2),
+            # Unrounded measurements, stored so the frame can be re-scored
+            'debris_count': debris_count,
+            'lightness_std': lightness_std
+        }
+        
+        return max(0, min(10, score)), details
     
     def _count_floor_clutter(self, detections, floor_shape):
         """Count clutter objects in floor region"""
         height = floor_shape[0]
         floor_y_start = height * 0.6  # Floor is bottom 40%
         
-        clutter_classes = ['backpack', 'handbag', 'bottle', 'book', 'cell phone', 
-                          'cup', 'paper', 'bag']
+        detections = as_detections(detections)
         
-        floor_clutter = 0
-        for det in detections:
-            if det['class'] in clutter_classes:
-                # Check if object center is in floor region
-                if det['center'][1] > floor_y_start:
-                    floor_clutter += 1
+        # Clutter objects whose center is in floor region
+        on_floor = detections.category_mask('clutter') & (detections.centers[:, 1] > floor_y_start)
         
-        return floor_clutter
+        return int(np.count_nonzero(on_floor))
     
-    def _analyze_debris(self, floor_region):
-        """Analyze floor for small debris particles"""
-        # Convert to grayscale
-        gray = cv2.cvtColor(floor_region, cv2.COLOR_BGR2GRAY)
-        
-        # Apply threshold to detect dark spots (potential debris)
-        _, thresh = cv2.threshold(gray, 100, 255, cv2.THRESH_BINARY_INV)
-        
-        # Count small contours (debris)
-        contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        small_debris = sum(1 for c in contours if 10 < cv2.contourArea(c) < 500)
-        
+    def _analyze_debris(self, small_debris):
+        """Debris score from the number of small blobs on the floor"""
         # Normalize score (fewer debris = higher score)
-        debris_score = max(0, 1 - (small_debris / 50))
+        debris_score = max(0, 1 - (small_debris / FLOOR_DEBRIS_LIMIT))
         
         return debris_score
     
-    def _calculate_uniformity(self, floor_region):
-        """Calculate floor uniformity (cleaner = more uniform)"""
-        # Convert to LAB color space
-        lab = cv2.cvtColor(floor_region, cv2.COLOR_BGR2LAB)
+    def _count_debris(self, features):
+        """Number of small dark blobs (potential debris) on the floor"""
+        gray = features.gray('floor')
         
-        # Calculate standard deviation of L channel
-        l_channel = lab[:, :, 0]
-        std_dev = np.std(l_channel)
+        # Apply threshold to detect dark spots (potential debris)
+        _, thresh = cv2.threshold(gray, 100, 255, cv2.THRESH_BINARY_INV)
         
+        # Count small blobs (debris)
+        areas = contour_areas(thresh)
+        return int(np.count_nonzero((areas > 10) & (areas < 500)))
+    
+    def _calculate_uniformity(self, std_dev):
+        """Calculate floor uniformity from its lightness std (cleaner = more uniform)"""
         # Normalize (lower std = more uniform = cleaner)
-        uniformity = max(0, 1 - (std_dev / 50))
+        uniformity = max(0, 1 - (std_dev / FLOOR_STD_LIMIT))
         
         return uniformity
     
+    def _lightness_std(self, features):
+        """Standard deviation of the floor's LAB L channel"""
+        _, std = features.mean_std('floor', 'lab')
+        return float(std[0])
+    
     def get_details(self, floor_region, detections):
         """Get detailed floor analysis"""
-        floor_clutter = self._count_floor_clutter(detections, floor_region.shape)
-        debris_score = self._analyze_debris(floor_region)
-        uniformity = self._calculate_uniformity(floor_region)
-        
-        return {
-            'floor_clutter_count': floor_clutter,
-            'debris_score': round(debris_score, 2),
-            'uniformity_score': round(uniformity, 2)
-        }
+        _, details = self.evaluate(floor_region, detections)
+        return details
@@ -1,82 +1,89 @@
 import numpy as np
 import cv2
+from models.detections import Detections, as_detections
+from utils.geometry import points_in_boxes
+from config import CHAIR_TABLE_MARGIN, ARRANGEMENT_VARIANCE_LIMIT, SURFACE_CLUTTER_PENALTY
 
 class FurnitureScorer:
     """Calculates chair and desk orderliness score"""
     
+    inputs = ('features', 'detections')
+    
     def calculate_score(self, image, detections):
+        """Calculate furniture orderliness score (0-10)"""
+        score, _ = self.evaluate(image, detections)
+        return score
+    
+    def evaluate(self, image, detections):
         """
-        Calculate furniture orderliness score (0-10)
+        Calculate furniture orderliness score (0-10) and its breakdown in one pass
         
         Metrics:
         - Chairs aligned under desks
         - Desks placed in rows
         - Absence of clutter on desk surfaces
+        
+        Returns:
+            (score, details dict)
         """
         score = 10.0
         
         # Filter furniture detections
-        chairs = [d for d in detections if 'chair' in d['class'].lower()]
-        tables = [d for d in detections if any(x in d['class'].lower() 
-                  for x in ['table', 'desk', 'dining table'])]
+        detections = as_detections(detections)
+        chairs, tables = self._split_furniture(detections)
+        furniture = Detections.concatenate([chairs, tables])
         
         # 1. Check chair-desk alignment
-        if chairs and tables:
+        alignment_score = 0
+        if len(chairs) and len(tables):
             alignment_score = self._check_alignment(chairs, tables)
             score -= (1 - alignment_score) * 4  # Max 4 points penalty
         
         # 2. Check furniture arrangement (rows/columns)
+        arrangement_score = self._check_arrangement(furniture) if len(furniture) > 2 else 0
         if len(chairs) > 2 or len(tables) > 2:
-            arrangement_score = self._check_arrangement(chairs + tables)
             score -= (1 - arrangement_score) * 3  # Max 3 points penalty
         
         # 3. Check for clutter on furniture surfaces
         clutter_penalty = self._check_surface_clutter(detections, tables)
         score -= clutter_penalty  # Max 3 points penalty
         
-        return max(0, min(10, score))
+        details = {
+            'chairs_detected': len(chairs),
+            'tables_detected': len(tables),
+            'alignment_score': round(alignment_score, 2),
+            'arrangement_score': round(arrangement_score, 2),
+            'surface_clutter_penalty': clutter_penalty
+        }
+        
+        return max(0, min(10, score)), details
+    
+    def _split_furniture(self, detections):
+        """Split detections into chairs and tables/desks"""
+        chairs = detections[detections.category_mask('chair')]
+        tables = detections[detections.category_mask('table')]
+        return chairs, tables
     
     def _check_alignment(self, chairs, tables):
         """Check if chairs are aligned with tables"""
-        aligned_count = 0
-        
-        for chair in chairs:
-            chair_center = chair['center']
-            
-            # Check if chair is near any table
-            for table in tables:
-                table_bbox = table['bbox']
-                
-                # Check if chair is within reasonable distance of table
-                if self._is_near(chair_center, table_bbox, threshold=100):
-                    aligned_count += 1
-                    break
+        # Chairs within reasonable distance of any table
+        near_table = points_in_boxes(chairs.centers, tables.boxes, margin=CHAIR_TABLE_MARGIN).any(axis=1)
+        aligned_count = int(np.count_nonzero(near_table))
         
         # Calculate alignment ratio
-        alignment_ratio = aligned_count / len(chairs) if chairs else 1.0
+        alignment_ratio = aligned_count / len(chairs) if len(chairs) else 1.0
         
         return alignment_ratio
     
-    def _is_near(self, point, bbox, threshold=100):
-        """Check if point is near bounding box"""
-        x1, y1, x2, y2 = bbox
-        px, py = point
-        
-        # Expand bbox by threshold
-        if (x1 - threshold <= px <= x2 + threshold and 
-            y1 - threshold <= py <= y2 + threshold):
-            return True
-        
-        return False
-    
     def _check_arrangement(self, furniture):
         """Check if furniture is arranged in orderly rows/columns"""
         if len(furniture) < 3:
             return 1.0
         
         # Get y-coordinates of furniture centers
-        y_coords = [f['center'][1] for f in furniture]
-        x_coords = [f['center'][0] for f in furniture]
+        centers = furniture.centers.astype(np.float64)
+        y_coords = centers[:, 1]
+        x_coords = centers[:, 0]
         
         # Calculate variance (lower = more aligned)
         y_variance = np.var(y_coords)
@@ -86,56 +93,27 @@ class FurnitureScorer:
         min_variance = min(y_variance, x_variance)
         
         # Normalize score (lower variance = better arrangement)
-        arrangement_score = max(0, 1 - (min_variance / 10000))
+        arrangement_score = max(0, 1 - (min_variance / ARRANGEMENT_VARIANCE_LIMIT))
         
         return arrangement_score
     
     def _check_surface_clutter(self, detections, tables):
         """Check for clutter on table surfaces"""
-        if not tables:
+        if not len(tables):
             return 0
         
-        clutter_classes = ['bottle', 'cup', 'book', 'cell phone', 'backpack', 
-                          'handbag', 'paper']
-        
-        clutter_on_tables = 0
+        clutter = detections[detections.category_mask('clutter')]
         
-        for det in detections:
-            if det['class'] in clutter_classes:
-                # Check if clutter is on any table surface
-                for table in tables:
-                    if self._is_on_surface(det['center'], table['bbox']):
-                        clutter_on_tables += 1
-                        break
+        # Clutter whose center is within any table surface
+        on_table = points_in_boxes(clutter.centers, tables.boxes).any(axis=1)
+        clutter_on_tables = int(np.count_nonzero(on_table))
         
         # Penalty based on clutter count
-        penalty = min(3, clutter_on_tables * 0.5)
+        penalty = min(3, clutter_on_tables * SURFACE_CLUTTER_PENALTY)
         
         return penalty
     
-    def _is_on_surface(self, point, bbox):
-        """Check if point is on table surface"""
-        x1, y1, x2, y2 = bbox
-        px, py = point
-        
-        # Check if point is within table bounds
-        if x1 <= px <= x2 and y1 <= py <= y2:
-            return True
-        
-        return False
-    
     def get_details(self, image, detections):
         """Get detailed furniture analysis"""
-        chairs = [d for d in detections if 'chair' in d['class'].lower()]
-        tables = [d for d in detections if any(x in d['class'].lower() 
-                  for x in ['table', 'desk', 'dining table'])]
-        
-        alignment = self._check_alignment(chairs, tables) if chairs and tables else 0
-        arrangement = self._check_arrangement(chairs + tables) if len(chairs + tables) > 2 else 0
-        
-        return {
-            'chairs_detected': len(chairs),
-            'tables_detected': len(tables),
-            'alignment_score': round(alignment, 2),
-            'arrangement_score': round(arrangement, 2)
-        }
+        _, details = self.evaluate(image, detections)
+        return details
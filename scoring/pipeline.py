@@ -0,0 +1,135 @@
+"""
+DAG-based scorer pipeline
+Each node declares its inputs (context values such as 'features' and
+'detections', or the names of other nodes); nodes whose inputs are ready run
+concurrently on a thread pool. OpenCV releases the GIL, so image-heavy
+scorers run in parallel on multi-core machines.
+"""
+
+import importlib
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from config import SCORERS, SCORING_WORKERS
+
+class ScoringPipeline:
+    """Runs registered scorers as a dependency graph"""
+    
+    def __init__(self, max_workers=SCORING_WORKERS):
+        self.max_workers = max_workers
+        self.nodes = {}
+        self._pool = None
+    
+    @classmethod
+    def from_config(cls, scorers=SCORERS, max_workers=SCORING_WORKERS):
+        """
+        Build a pipeline from {name: 'module.path:ClassName'}
+        
+        New scorers are added by listing them in config.SCORERS; their class
+        declares its inputs in an `inputs` attribute.
+        """
+        pipeline = cls(max_workers=max_workers)
+        for name, path in scorers.items():
+            module_name, class_name = path.split(':')
+            scorer_class = getattr(importlib.import_module(module_name), class_name)
+            pipeline.add(name, scorer_class())
+        return pipeline
+    
+    def add(self, name, scorer, inputs=None):
+        """
+        Register a node
+        
+        Args:
+            name: node name; also the key of its output
+            scorer: object with evaluate(*inputs), or a plain callable
+            inputs: names of context values / other nodes passed positionally
+                (defaults to scorer.inputs)
+        """
+        if inputs is None:
+            inputs = getattr(scorer, 'inputs', ())
+        
+        self.nodes[name] = {
+            'scorer': scorer,
+            'func': getattr(scorer, 'evaluate', scorer),
+            'inputs': tuple(inputs)
+        }
+    
+    def needs_input(self, key):
+        """True if any node reads the given context value"""
+        return any(key in node['inputs'] for node in self.nodes.values())
+    
+    def scorer(self, name):
+        """The object registered under name"""
+        return self.nodes[name]['scorer']
+    
+    def run(self, **context):
+        """
+        Evaluate every node
+        
+        Args:
+            context: values available to nodes by name (e.g. features, detections)
+        
+        Returns:
+            ({node: output}, {node: wall time in ms}) in registration order
+        """
+        dependencies = self._dependencies(context)
+        
+        values = dict(context)
+        outputs = {}
+        timings = {}
+        pending = dict(dependencies)
+        running = {}
+        pool = self._get_pool()
+        
+        while pending or running:
+            # Submit every node whose upstream nodes have finished
+            for name in [n for n, deps in pending.items() if deps.issubset(outputs)]:
+                del pending[name]
+                running[pool.submit(self._run_node, name, values)] = name
+            
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                output, elapsed_ms = future.result()
+                outputs[name] = values[name] = output
+                timings[name] = elapsed_ms
+        
+        return (
+            {name: outputs[name] for name in self.nodes},
+            {name: timings[name] for name in self.nodes}
+        )
+    
+    def _run_node(self, name, values):
+        node = self.nodes[name]
+        args = [values[key] for key in node['inputs']]
+        
+        start = time.perf_counter()
+        output = node['func'](*args)
+        return output, round((time.perf_counter() - start) * 1000, 2)
+    
+    def _dependencies(self, context):
+        """Upstream nodes of every node; rejects unknown inputs and cycles"""
+        dependencies = {}
+        for name, node in self.nodes.items():
+            for key in node['inputs']:
+                if key not in self.nodes and key not in context:
+                    raise ValueError(f"Scorer '{name}' needs unknown input '{key}'")
+            dependencies[name] = {key for key in node['inputs'] if key in self.nodes}
+        
+        # Kahn's algorithm: every node must become ready at some point
+        resolved = set()
+        remaining = dict(dependencies)
+        while remaining:
+            ready = [name for name, deps in remaining.items() if deps.issubset(resolved)]
+            if not ready:
+                raise ValueError(f"Scorer dependency cycle among: {sorted(remaining)}")
+            for name in ready:
+                resolved.add(name)
+                del remaining[name]
+        
+        return dependencies
+    
+    def _get_pool(self):
+        # Created on first use and reused for every frame
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='scorer')
+        return self._pool
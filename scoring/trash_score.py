@@ -1,112 +1,122 @@
 import cv2
 import numpy as np
+from models.detections import as_detections
+from utils.geometry import points_in_boxes
+from utils.image_features import as_features, mean_std, pooled_variance
+from config import TRASH_BIN_MARGIN, BIN_OVERFLOW_VARIANCE
 
 class TrashScorer:
     """Calculates trash bin condition score"""
     
+    inputs = ('features', 'detections')
+    
     def calculate_score(self, image, detections):
+        """Calculate trash bin condition score (0-10)"""
+        score, _ = self.evaluate(image, detections)
+        return score
+    
+    def evaluate(self, image, detections):
         """
-        Calculate trash bin condition score (0-10)
+        Calculate trash bin condition score (0-10) and its breakdown in one pass
         
         Metrics:
         - Trash bin visible
         - Trash inside the bin only
         - No overflowing trash
+        
+        Args:
+            image: ImageFeatures of the frame, or the frame itself
+            detections: Detections or list of detection dicts
+        
+        Returns:
+            (score, details dict)
         """
         score = 10.0
         
         # Find trash bins
-        bins = [d for d in detections if 'bin' in d['class'].lower() or 
-                'trash' in d['class'].lower() or 'garbage' in d['class'].lower()]
+        detections = as_detections(detections)
+        is_bin = detections.category_mask('bin')
+        bins = detections[is_bin]
+        trash_outside = self._check_trash_outside_bins(detections, bins)
+        
+        # Variance above every detection, not only the bins: stored with the
+        # result, it lets the frame be re-scored with other bin classes
+        overflow_variances = self._overflow_variances(as_features(image), detections)
+        
+        details = {
+            'bins_detected': len(bins),
+            'trash_outside_bins': trash_outside,
+            'bin_present': len(bins) > 0,
+            'overflow_penalty': 0,
+            'overflow_variances': overflow_variances
+        }
         
         # 1. Check if trash bin is present
-        if not bins:
+        if not len(bins):
             score -= 3  # Penalty for no visible bin
-            return max(0, score)
+            return max(0, score), details
         
         # 2. Check for trash outside bins
-        trash_outside = self._check_trash_outside_bins(detections, bins)
         score -= trash_outside * 2  # Max 4 points penalty
         
         # 3. Check for overflow
-        overflow_penalty = self._check_overflow(image, bins)
+        overflow_penalty = self._check_overflow(
+            [variance for variance, bin_box in zip(overflow_variances, is_bin) if bin_box]
+        )
         score -= overflow_penalty  # Max 3 points penalty
+        details['overflow_penalty'] = overflow_penalty
         
-        return max(0, min(10, score))
+        return max(0, min(10, score)), details
+    
+    def _find_bins(self, detections):
+        """Detections that look like trash bins"""
+        return detections[detections.category_mask('bin')]
     
     def _check_trash_outside_bins(self, detections, bins):
         """Check for trash items outside bins"""
-        trash_classes = ['bottle', 'cup', 'paper', 'plastic', 'bag']
-        
-        trash_outside = 0
-        
-        for det in detections:
-            if any(trash_class in det['class'].lower() for trash_class in trash_classes):
-                # Check if trash is NOT near any bin
-                is_near_bin = False
-                
-                for bin_det in bins:
-                    if self._is_near(det['center'], bin_det['bbox'], threshold=80):
-                        is_near_bin = True
-                        break
-                
-                if not is_near_bin:
-                    trash_outside += 1
+        trash = detections[detections.category_mask('trash')]
+        
+        # Trash that is NOT near any bin
+        near_bin = points_in_boxes(trash.centers, bins.boxes, margin=TRASH_BIN_MARGIN).any(axis=1)
+        trash_outside = int(np.count_nonzero(~near_bin))
         
         return min(2, trash_outside)  # Cap at 2 items
     
-    def _is_near(self, point, bbox, threshold=80):
-        """Check if point is near bounding box"""
-        x1, y1, x2, y2 = bbox
-        px, py = point
-        
-        # Expand bbox by threshold
-        if (x1 - threshold <= px <= x2 + threshold and 
-            y1 - threshold <= py <= y2 + threshold):
-            return True
+    def _check_overflow(self, variances):
+        """Check if bins are overflowing, from the variance above each bin"""
+        overflow_count = sum(1 for v in variances if v is not None and v > BIN_OVERFLOW_VARIANCE)
         
-        return False
+        penalty = min(3, overflow_count * 1.5)
+        return penalty
     
-    def _check_overflow(self, image, bins):
-        """Check if bins are overflowing"""
-        if not bins:
-            return 0
+    def _overflow_variances(self, features, detections):
+        """
+        Color variance of the strip above each box (high variance = potential overflow)
         
-        overflow_count = 0
+        Returns:
+            list with one variance per box, None where the strip is empty
+        """
+        image = features.image
+        variances = []
         
-        for bin_det in bins:
-            x1, y1, x2, y2 = map(int, bin_det['bbox'])
+        for x1, y1, x2, y2 in detections.boxes.astype(int).tolist():
             
             # Extract bin region
             bin_region = image[max(0, y1):min(image.shape[0], y2), 
                               max(0, x1):min(image.shape[1], x2)]
             
-            if bin_region.size == 0:
-                continue
-            
             # Check region above bin for overflow
             above_y = max(0, y1 - 50)
             above_region = image[above_y:y1, x1:x2]
             
-            if above_region.size > 0:
-                # Analyze color variance (high variance = potential overflow)
-                variance = np.var(above_region)
-                
-                if variance > 1000:  # Threshold for overflow detection
-                    overflow_count += 1
+            if bin_region.size == 0 or above_region.size == 0:
+                variances.append(None)
+            else:
+                variances.append(float(pooled_variance(*mean_std(above_region))))
         
-        penalty = min(3, overflow_count * 1.5)
-        return penalty
+        return variances
     
     def get_details(self, image, detections):
         """Get detailed trash bin analysis"""
-        bins = [d for d in detections if 'bin' in d['class'].lower() or 
-                'trash' in d['class'].lower() or 'garbage' in d['class'].lower()]
-        
-        trash_outside = self._check_trash_outside_bins(detections, bins)
-        
-        return {
-            'bins_detected': len(bins),
-            'trash_outside_bins': trash_outside,
-            'bin_present': len(bins) > 0
-        }
+        _, details = self.evaluate(image, detections)
+        return details
@@ -1,86 +1,105 @@
 import cv2
 import numpy as np
+from utils.image_features import as_features, contour_areas
+from config import WALL_EDGE_PENALTY, BOARD_VARIANCE_LIMIT
 
 class WallScorer:
     """Calculates wall and board cleanliness score"""
     
+    inputs = ('features', 'detections')
+    
     def calculate_score(self, wall_region, detections):
+        """Calculate wall/board cleanliness score (0-10)"""
+        score, _ = self.evaluate(wall_region, detections)
+        return score
+    
+    def evaluate(self, wall_region, detections):
         """
-        Calculate wall/board cleanliness score (0-10)
+        Calculate wall/board cleanliness score (0-10) and its breakdown in one pass
         
         Metrics:
         - No visible vandalism
         - Board is erased (uniform color)
         - No unnecessary posters falling off
+        
+        Args:
+            wall_region: ImageFeatures of the frame, or the wall crop itself
+            detections: Detections or list of detection dicts
+        
+        Returns:
+            (score, details dict)
         """
+        features = as_features(wall_region, 'wall')
         score = 10.0
         
         # 1. Check for marks/vandalism
-        marks_penalty = self._detect_marks(wall_region)
+        edge_density = self._edge_density(features)
+        marks_penalty = self._detect_marks(edge_density)
         score -= marks_penalty  # Max 4 points penalty
         
         # 2. Check board cleanliness (uniformity)
-        board_score = self._check_board_cleanliness(wall_region)
+        board_variance = self._board_variance(features)
+        board_score = self._check_board_cleanliness(board_variance)
         score -= (1 - board_score) * 3  # Max 3 points penalty
         
         # 3. Check for loose items on walls
-        loose_items = self._detect_loose_items(wall_region)
+        patch_count = self._count_patches(features)
+        loose_items = self._detect_loose_items(patch_count)
         score -= loose_items * 1.5  # Max 3 points penalty
         
-        return max(0, min(10, score))
-    
-    def _detect_marks(self, wall_region):
-        """Detect marks or vandalism on walls"""
-        gray = cv2.cvtColor(wall_region, cv2.COLOR_BGR2GRAY)
-        
-        # Apply edge detection
-        edges = cv2.Canny(gray, 50, 150)
-        
-        # Count edge pixels (more edges = more marks)
-        edge_density = np.sum(edges > 0) / edges.size
+        details = {
+            'marks_penalty': round(marks_penalty, 2),
+            'board_cleanliness': round(board_score, 2),
+            'loose_items_count': loose_items,
+            # Unrounded measurements, stored so the frame can be re-scored
+            'edge_density': edge_density,
+            'board_variance': board_variance,
+            'patch_count': patch_count
+        }
         
+        return max(0, min(10, score)), details
+    
+    def _detect_marks(self, edge_density):
+        """Marks/vandalism penalty from the wall's edge density"""
         # Calculate penalty
-        penalty = min(4, edge_density * 40)
+        penalty = min(4, edge_density * WALL_EDGE_PENALTY)
         
         return penalty
     
-    def _check_board_cleanliness(self, wall_region):
-        """Check if board area is clean (erased)"""
-        # Convert to HSV
-        hsv = cv2.cvtColor(wall_region, cv2.COLOR_BGR2HSV)
-        
-        # Calculate color variance (lower = cleaner/more erased)
-        variance = np.var(hsv[:, :, 2])  # V channel variance
-        
+    def _edge_density(self, features):
+        """Fraction of wall pixels on an edge (more edges = more marks)"""
+        edges = features.edges('wall')
+        return float(np.count_nonzero(edges) / edges.size)
+    
+    def _check_board_cleanliness(self, variance):
+        """Check if board area is clean (erased) from its color variance"""
         # Normalize score
-        cleanliness = max(0, 1 - (variance / 1000))
+        cleanliness = max(0, 1 - (variance / BOARD_VARIANCE_LIMIT))
         
         return cleanliness
     
-    def _detect_loose_items(self, wall_region):
-        """Detect loose or falling items on walls"""
+    def _board_variance(self, features):
+        """Color variance of the board (lower = cleaner/more erased)"""
+        _, std = features.mean_std('wall', 'hsv')
+        return float(std[2] ** 2)  # V channel variance
+    
+    def _detect_loose_items(self, patch_count):
+        """Loose or falling items on walls, from the saturated patch count"""
+        return min(2, patch_count)
+    
+    def _count_patches(self, features):
+        """Number of medium-sized saturated patches on the wall"""
         # Use color segmentation to find irregular patches
-        hsv = cv2.cvtColor(wall_region, cv2.COLOR_BGR2HSV)
+        hsv = features.hsv('wall')
         
         # Detect non-uniform color patches
         _, thresh = cv2.threshold(hsv[:, :, 1], 30, 255, cv2.THRESH_BINARY)
         
-        # Find contours
-        contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
         # Count medium-sized irregular patches
-        loose_count = sum(1 for c in contours if 500 < cv2.contourArea(c) < 5000)
-        
-        return min(2, loose_count)
+        areas = contour_areas(thresh)
+        return int(np.count_nonzero((areas > 500) & (areas < 5000)))
     
     def get_details(self, wall_region, detections):
         """Get detailed wall analysis"""
-        marks_penalty = self._detect_marks(wall_region)
-        board_score = self._check_board_cleanliness(wall_region)
-        loose_items = self._detect_loose_items(wall_region)
-        
-        return {
-            'marks_penalty': round(marks_penalty, 2),
-            'board_cleanliness': round(board_score, 2),
-            'loose_items_count': loose_items
-        }
+        _, details = self.evaluate(wall_region, detections)
+        return details
@@ -0,0 +1,134 @@
+"""
+Test script for vectorized batch re-scoring
+"""
+
+import json
+import os
+import tempfile
+import types
+import numpy as np
+import config
+from scoring.pipeline import ScoringPipeline
+from scoring.batch import DetectionBatch, frame_statistics, score_batch
+from utils.image_features import ImageFeatures
+from utils.leaderboard import Leaderboard
+from rescore_history import load_history
+
+CLASSES = ['chair', 'dining table', 'desk', 'bottle', 'cup', 'backpack', 'book',
+           'trash bin', 'garbage can', 'plastic bag', 'person']
+
+def random_frame(rng):
+    """Synthetic frame with random boxes (bins placed so overflow strips exist)"""
+    image = (rng.random_sample((480, 640, 3)) * rng.choice([40, 120, 255])).astype(np.uint8)
+    detections = []
+    for _ in range(rng.randint(0, 25)):
+        x1, y1 = rng.uniform(0, 600), rng.uniform(0, 440)
+        detections.append({
+            'class': CLASSES[rng.randint(len(CLASSES))],
+            'confidence': float(rng.random_sample()),
+            'bbox': [x1, y1, x1 + rng.uniform(5, 250), y1 + rng.uniform(5, 250)]
+        })
+    return image, detections
+
+def make_frames(count=40, seed=0):
+    """Per-frame scorer results alongside the records batch scoring needs"""
+    rng = np.random.RandomState(seed)
+    pipeline = ScoringPipeline.from_config()
+    frames = []
+    for _ in range(count):
+        image, detections = random_frame(rng)
+        features = ImageFeatures(image)
+        outputs, _ = pipeline.run(features=features, detections=detections)
+        scores = {name: score for name, (score, _) in outputs.items()}
+        details = {name: detail for name, (_, detail) in outputs.items()}
+        frames.append((detections, frame_statistics(features, details), scores))
+    return frames
+
+def test_batch_matches_scorers():
+    """One vectorized pass reproduces every per-frame scorer"""
+    print("\n1. Testing batch scores against the scorers...")
+    frames = make_frames()
+    batch = DetectionBatch.from_records((dets, stats) for dets, stats, _ in frames)
+    result = score_batch(batch)
+    
+    assert len(batch) == len(frames)
+    for idx, (_, _, scores) in enumerate(frames):
+        for name, score in scores.items():
+            assert abs(result['scores'][name][idx] - score) < 1e-9, (idx, name, score, result['scores'][name][idx])
+    
+    totals = np.array([sum(scores.values()) for _, _, scores in frames])
+    assert np.allclose(result['total_score'], totals)
+    print(f"   ✓ {len(frames)} frames match (mean total {totals.mean():.1f})")
+
+def test_candidate_settings():
+    """Changed thresholds and categories only move the affected scores"""
+    print("\n2. Testing a candidate config...")
+    frames = make_frames(count=20, seed=1)
+    batch = DetectionBatch.from_records((dets, stats) for dets, stats, _ in frames)
+    baseline = score_batch(batch)
+    
+    settings = types.SimpleNamespace(**{name: getattr(config, name) for name in dir(config) if name.isupper()})
+    settings.CLUTTER_PENALTY = 3.0
+    settings.CLASS_CATEGORIES = dict(config.CLASS_CATEGORIES, bin={'names': []})
+    settings.RATING_EXCELLENT = 0
+    candidate = score_batch(batch, settings)
+    
+    assert np.all(candidate['scores']['clutter'] <= baseline['scores']['clutter'])
+    assert np.all(candidate['scores']['trash'] == 7.0)  # No bins anywhere
+    assert np.array_equal(candidate['scores']['wall'], baseline['scores']['wall'])
+    assert set(candidate['rating']) == {'Excellent'}
+    print("   ✓ Clutter, trash and rating changes applied")
+
+def test_leaderboard_round_trip():
+    """Entries saved with statistics re-score identically from JSON"""
+    print("\n3. Testing history round trip...")
+    frames = make_frames(count=5, seed=2)
+    with tempfile.TemporaryDirectory() as tmp:
+        leaderboard = Leaderboard(os.path.join(tmp, 'scores.json'))
+        for idx, (detections, statistics, scores) in enumerate(frames):
+            leaderboard.add_score(f'room-{idx}', scores, sum(scores.values()), 'Good',
+                                  detections=detections, statistics=statistics)
+        leaderboard.add_score('no-inputs', {}, 30.0, 'Fair')
+        
+        # The score file keeps score rows only; inputs live in one file per entry
+        with open(leaderboard.data_file) as f:
+            rows = json.load(f)
+        assert not any('detections' in row or 'statistics' in row for row in rows)
+        assert len(os.listdir(leaderboard.frames_dir)) == len(frames)
+        
+        entries, skipped = load_history(leaderboard.data_file)
+    
+    assert len(entries) == len(frames) and skipped == 1
+    result = score_batch(DetectionBatch.from_records(
+        (entry['detections'], entry['statistics']) for entry in entries
+    ))
+    assert np.allclose(result['total_score'], [entry['total_score'] for entry in entries])
+    print(f"   ✓ {len(entries)} stored entries re-scored to their saved totals")
+
+def test_frame_retention():
+    """Only the newest max_frames entries keep their re-scoring inputs"""
+    print("\n4. Testing re-scoring input retention...")
+    frames = make_frames(count=6, seed=3)
+    with tempfile.TemporaryDirectory() as tmp:
+        leaderboard = Leaderboard(os.path.join(tmp, 'scores.json'), max_frames=4)
+        entries = [
+            leaderboard.add_score(f'room-{idx}', scores, sum(scores.values()), 'Good',
+                                  detections=detections, statistics=statistics)
+            for idx, (detections, statistics, scores) in enumerate(frames)
+        ]
+        
+        assert sorted(os.listdir(leaderboard.frames_dir)) == sorted(f"{entry['id']}.json" for entry in entries[-4:])
+        assert [leaderboard.get_frame(entry) is None for entry in entries] == [True] * 2 + [False] * 4
+        
+        # Score rows are kept; re-scoring skips the pruned entries
+        history, skipped = load_history(leaderboard.data_file)
+        assert len(history) == 4 and skipped == 2
+    print("   ✓ 2 oldest inputs pruned, all 6 score rows kept")
+
+
+if __name__ == "__main__":
+    test_batch_matches_scorers()
+    test_candidate_settings()
+    test_leaderboard_round_trip()
+    test_frame_retention()
+    print("\n✓ All batch scoring tests passed!")
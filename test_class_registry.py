@@ -0,0 +1,48 @@
+"""
+Test script for the central class registry and category masks
+"""
+
+from models.class_registry import ClassRegistry, REGISTRY
+from models.detections import Detections
+
+def test_categories_resolved_once():
+    """YOLO names and OWL-ViT queries map to ids and category bits"""
+    print("\n1. Testing category resolution...")
+    registry = ClassRegistry()
+    
+    chair_id = registry.register('chair')
+    assert registry.register('chair') == chair_id
+    assert registry.bits('chair') & registry.flag('chair')
+    assert not registry.bits('chair') & registry.flag('table')
+    
+    # OWL-ViT queries inherit the categories of their YOLO synonyms
+    assert registry.bits('bottle on desk') & registry.flag('clutter')
+    assert registry.bits('desk') & registry.flag('table')
+    
+    # Phrases mentioning furniture are not furniture themselves
+    assert not registry.bits('jacket on chair') & registry.flag('chair')
+    assert not registry.bits('bag on desk') & registry.flag('table')
+    assert registry.bits('waste basket') == registry.flag('bin')
+    print("   ✓ Names, keywords and synonyms resolved")
+
+def test_detection_category_masks():
+    """Detections filter by category with array masks"""
+    print("\n2. Testing detection category masks...")
+    detections = Detections(
+        boxes=[[0, 0, 1, 1]] * 4,
+        scores=[0.9] * 4,
+        class_ids=[0, 1, 2, 3],
+        class_names=['chair', 'trash bin', 'plastic wrapper on floor', 'person']
+    )
+    
+    assert detections.category_mask('bin').tolist() == [False, True, False, False]
+    assert detections.category_mask('trash').tolist() == [False, False, True, False]
+    assert detections.category_mask(['chair', 'bin']).tolist() == [True, True, False, False]
+    assert 'person' in REGISTRY.ids
+    print("   ✓ Masks select the right detections")
+
+
+if __name__ == "__main__":
+    test_categories_resolved_once()
+    test_detection_category_masks()
+    print("\n✓ All class registry tests passed!")
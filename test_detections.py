@@ -0,0 +1,64 @@
+"""
+Test script for the columnar Detections container
+"""
+
+import numpy as np
+from models.detections import Detections, as_detections
+
+def create_mock_detections():
+    """Create mock detection data in the legacy dict format"""
+    return [
+        {'class': 'chair', 'confidence': 0.9, 'bbox': [100, 300, 200, 400], 'center': [150, 350]},
+        {'class': 'dining table', 'confidence': 0.92, 'bbox': [120, 250, 320, 350], 'center': [220, 300]},
+        {'class': 'bottle', 'confidence': 0.75, 'bbox': [400, 500, 420, 550], 'center': [410, 525]},
+        {'class': 'chair', 'confidence': 0.85, 'bbox': [250, 300, 350, 400], 'center': [300, 350]},
+    ]
+
+def test_dict_round_trip():
+    """Dict view matches the legacy detection format"""
+    print("\n1. Testing dict round trip...")
+    mock = create_mock_detections()
+    detections = as_detections(mock)
+    
+    assert len(detections) == len(mock)
+    for original, converted in zip(mock, detections.to_dicts()):
+        assert converted['class'] == original['class']
+        assert abs(converted['confidence'] - original['confidence']) < 1e-6
+        assert converted['bbox'] == [float(v) for v in original['bbox']]
+        assert converted['center'] == [float(v) for v in original['center']]
+    print("   ✓ Round trip preserved class, confidence, bbox and center")
+
+def test_class_masks():
+    """Class filtering works on the vocabulary, not per detection"""
+    print("\n2. Testing class masks...")
+    detections = as_detections(create_mock_detections())
+    
+    assert detections.class_mask(['chair']).tolist() == [True, False, False, True]
+    assert detections.class_contains(['table', 'desk']).tolist() == [False, True, False, False]
+    assert detections.count_by_class() == {'chair': 2, 'dining table': 1, 'bottle': 1}
+    
+    chairs = detections[detections.class_mask(['chair'])]
+    assert np.allclose(chairs.centers, [[150, 350], [300, 350]])
+    print("   ✓ Masks, subsets and counts are correct")
+
+def test_concatenate_vocabularies():
+    """Merging YOLO-style and OWL-ViT-style sets unifies class ids"""
+    print("\n3. Testing concatenation...")
+    yolo = Detections(boxes=[[0, 0, 10, 10]], scores=[0.8], class_ids=[1],
+                      class_names=['person', 'bottle'])
+    owlvit = Detections(boxes=[[5, 5, 15, 15], [1, 1, 2, 2]], scores=[0.3, 0.2], class_ids=[0, 2],
+                        class_names=['bottle', 'trash bin', 'bottle'])
+    
+    merged = yolo + owlvit
+    assert len(merged) == 3
+    assert list(merged.classes) == ['bottle', 'bottle', 'bottle']
+    assert merged.count_by_class() == {'bottle': 3}
+    assert len(Detections.concatenate([])) == 0
+    print("   ✓ Vocabularies merged without duplicating class names")
+
+
+if __name__ == "__main__":
+    test_dict_round_trip()
+    test_class_masks()
+    test_concatenate_vocabularies()
+    print("\n✓ All Detections tests passed!")
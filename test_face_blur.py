@@ -6,8 +6,19 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from utils.face_blur import FaceBlurrer
+from utils.face_blur import FaceBlurrer, suppress_duplicates, anonymize_faces, padded_face_rect
 import cv2
+import time
+import numpy as np
+
+class FixedDetector:
+    """Detector backend that always returns the same faces"""
+    
+    def __init__(self, faces):
+        self.faces = faces
+    
+    def detect(self, image):
+        return list(self.faces)
 
 def test_face_blur():
     """Test face blurring with a sample image"""
@@ -55,5 +66,213 @@ def test_face_blur():
     print("="*60)
     print("\nCheck the output files (*_blurred.*) to verify face blurring")
 
+def test_shared_pyramid_matches():
+    """Shared-pyramid detection finds the same faces as per-cascade detection"""
+    print("\n3. Comparing shared-pyramid and per-cascade detection...")
+    image_path = 'data/classroom1.jfif'
+    image = cv2.imread(image_path)
+    if image is None:
+        print(f"⚠️  Skipping ({image_path} not found)")
+        return
+    
+    independent = FaceBlurrer().detect_faces(image)
+    shared = FaceBlurrer(shared_pyramid=True).detect_faces(image)
+    assert sorted(map(tuple, independent)) == sorted(map(tuple, shared))
+    print(f"   ✓ Same {len(shared)} face(s)")
+    
+    # Capped resolution still returns boxes in input coordinates
+    capped = FaceBlurrer(shared_pyramid=True, max_dimension=image.shape[1] // 2).detect_faces(image)
+    for x, y, w, h in capped:
+        assert 0 <= x and x + w <= image.shape[1] + 2 and 0 <= y and y + h <= image.shape[0] + 2
+    print(f"   ✓ {len(capped)} face(s) at half resolution")
+
+def test_custom_backend():
+    """Any object with detect(image) can replace the cascades"""
+    print("\n4. Testing a pluggable detector backend...")
+    
+    blurrer = FaceBlurrer(backend=FixedDetector([(40, 30, 50, 60)]))
+    image = np.random.randint(0, 255, (200, 200, 3), dtype=np.uint8)
+    blurred, face_count, locations = blurrer.blur_faces(image)
+    
+    assert blurrer.backend == 'FixedDetector' and face_count == 1
+    assert locations == [{'x': 40, 'y': 30, 'width': 50, 'height': 60}]
+    assert not np.array_equal(blurred[30:90, 40:90], image[30:90, 40:90])
+    assert np.array_equal(blurred[150:, 150:], image[150:, 150:])
+    print("   ✓ Faces from the custom backend were blurred")
+
+def test_detect_in_regions():
+    """Faces found in region crops are offset to image coordinates and merged"""
+    print("\n5. Testing region-restricted face search...")
+    
+    blurrer = FaceBlurrer(backend=FixedDetector([(5, 5, 20, 20)]))
+    image = np.zeros((200, 300, 3), dtype=np.uint8)
+    regions = [
+        (100, 50, 200, 150),
+        (102, 52, 220, 160),  # Overlaps the first: finds the same face
+        (0, 0, 60, 60),
+        (250, 120, 250, 180),  # Empty
+    ]
+    faces = blurrer.detect_faces_in_regions(image, regions)
+    
+    assert sorted(faces) == [(5, 5, 20, 20), (105, 55, 20, 20)], faces
+    assert blurrer.detect_faces_in_regions(image, []) == []
+    print(f"   ✓ {len(faces)} faces from {len(regions)} regions")
+
+def legacy_remove_duplicates(faces, overlap_threshold=0.3):
+    """The original list-based suppression, as the reference for 'first' mode"""
+    def overlap(face1, face2):
+        x1, y1, w1, h1 = face1
+        x2, y2, w2, h2 = face2
+        x_left, y_top = max(x1, x2), max(y1, y2)
+        x_right, y_bottom = min(x1 + w1, x2 + w2), min(y1 + h1, y2 + h2)
+        if x_right < x_left or y_bottom < y_top:
+            return 0.0
+        return (x_right - x_left) * (y_bottom - y_top) / min(w1 * h1, w2 * h2)
+    
+    faces_list = list(faces)
+    unique_faces = []
+    while faces_list:
+        face = faces_list.pop(0)
+        unique_faces.append(face)
+        faces_list = [f for f in faces_list if overlap(face, f) < overlap_threshold]
+    return unique_faces
+
+def random_faces(rng, count):
+    """Clustered rectangles like raw cascade hits in a crowded classroom"""
+    centers = rng.randint(0, 1000, (max(1, count // 6), 2))
+    faces = []
+    for _ in range(count):
+        cx, cy = centers[rng.randint(len(centers))] + rng.randint(-15, 16, 2)
+        size = int(rng.randint(15, 80))
+        faces.append((int(cx), int(cy), size, size))
+    return faces
+
+def test_duplicate_suppression_matches_legacy():
+    """Vectorized 'first' mode keeps exactly what the list-based version kept"""
+    print("\n6. Testing vectorized duplicate suppression...")
+    rng = np.random.RandomState(0)
+    for trial in range(200):
+        faces = random_faces(rng, int(rng.randint(0, 120)))
+        threshold = float(rng.choice([0.1, 0.3, 0.5, 0.9]))
+        expected = legacy_remove_duplicates(faces, threshold)
+        assert suppress_duplicates(faces, threshold) == expected, trial
+    
+    # Cascade output is a NumPy array; the same rows come back
+    faces = np.array(random_faces(rng, 50), dtype=np.int32)
+    kept = suppress_duplicates(faces)
+    assert [tuple(f) for f in kept] == [tuple(f) for f in legacy_remove_duplicates(faces)]
+    print("   ✓ Same faces as the list-based suppression")
+    
+    # 'largest' keeps the biggest box of each duplicate group
+    faces = [(100, 100, 20, 20), (95, 95, 40, 40), (400, 100, 30, 30)]
+    assert suppress_duplicates(faces, keep='largest') == [(95, 95, 40, 40), (400, 100, 30, 30)]
+    assert suppress_duplicates(faces, keep='first') == [(100, 100, 20, 20), (400, 100, 30, 30)]
+    
+    faces = random_faces(rng, 400)
+    start = time.perf_counter()
+    legacy_remove_duplicates(faces)
+    legacy_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    suppress_duplicates(faces)
+    vectorized_ms = (time.perf_counter() - start) * 1000
+    print(f"   ✓ 400 raw hits: {legacy_ms:.1f}ms list-based, {vectorized_ms:.1f}ms vectorized")
+
+def test_anonymization_modes():
+    """Every mode changes only the padded face rectangles, in one pass"""
+    print("\n7. Testing anonymization modes...")
+    rng = np.random.RandomState(0)
+    image = rng.randint(0, 255, (480, 640, 3)).astype(np.uint8)
+    faces = [(50, 60, 40, 40), (300, 200, 80, 80), (560, 400, 60, 60)]
+    
+    mask = np.zeros(image.shape[:2], dtype=bool)
+    for x, y, w, h in faces:
+        x1, y1, x2, y2 = padded_face_rect(image.shape, x, y, w, h)
+        mask[y1:y2, x1:x2] = True
+    
+    for mode in ('pixelate', 'box', 'fill'):
+        result = anonymize_faces(image.copy(), faces, mode=mode, level=8)
+        assert np.array_equal(result[~mask], image[~mask]), mode
+        
+        # Face detail is gone: much lower variance than the noise it replaced
+        x, y, w, h = faces[1]
+        face = result[y:y + h, x:x + w].astype(np.float32)
+        assert face.std() < image[y:y + h, x:x + w].std() / 3, mode
+        print(f"   ✓ {mode}: face std {face.std():.1f}")
+    
+    # Pixelation leaves about `level` blocks across the largest face
+    result = anonymize_faces(image.copy(), faces, mode='pixelate', level=8)
+    x, y, w, h = faces[1]
+    row = result[y + h // 2, x:x + w, 0]
+    blocks = 1 + np.count_nonzero(np.diff(row.astype(np.int16)))
+    assert blocks <= 9, blocks
+    
+    # Solid fill uses the fill color
+    result = anonymize_faces(image.copy(), faces, mode='fill', fill_color=(0, 0, 255))
+    assert np.all(result[mask] == (0, 0, 255))
+    
+    # One pass over the mask stays cheap for a full class
+    crowd = [(int(x), int(y), 40, 40) for x, y in rng.randint(0, 560, (35, 2))]
+    blurrer = FaceBlurrer(backend=FixedDetector(crowd))
+    start = time.perf_counter()
+    for (x, y, w, h) in crowd:
+        blurrer.blur_face_region(image.copy(), x, y, w, h)
+    gaussian_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    anonymize_faces(image.copy(), crowd, mode='box')
+    box_ms = (time.perf_counter() - start) * 1000
+    print(f"   ✓ 35 faces: {gaussian_ms:.1f}ms per-face Gaussian, {box_ms:.1f}ms single-pass box blur")
+
+def face_texture(rng, size):
+    """Frame with smooth random texture at facial-feature scale and one face in the middle"""
+    noise = rng.randn(size * 3, size * 3).astype(np.float32)
+    texture = cv2.GaussianBlur(noise, (0, 0), size / 16)
+    texture = np.clip((texture - texture.mean()) / texture.std() * 40 + 128, 0, 255).astype(np.uint8)
+    return cv2.merge([texture] * 3), (size, size, size, size)
+
+def retained_detail(image, result, face):
+    """Correlation between the original and anonymized padded face (1 = untouched, 0 = nothing left)"""
+    x1, y1, x2, y2 = padded_face_rect(image.shape, *face)
+    original = image[y1:y2, x1:x2].astype(np.float64)
+    anonymized = result[y1:y2, x1:x2].astype(np.float64)
+    original -= original.mean()
+    anonymized -= anonymized.mean()
+    return float((original * anonymized).sum() / np.sqrt((original ** 2).sum() * (anonymized ** 2).sum() + 1e-9))
+
+def test_anonymization_strength():
+    """The default is the baseline 99x99 Gaussian; lower levels remove more detail"""
+    print("\n8. Testing anonymization strength...")
+    rng = np.random.RandomState(0)
+    
+    for size in (40, 80, 160):
+        image, face = face_texture(rng, size)
+        
+        # Default strategy: exactly the per-face 99x99, sigma 30 blur
+        blurrer = FaceBlurrer(backend=FixedDetector([face]))
+        assert blurrer.anonymization == 'gaussian'
+        x1, y1, x2, y2 = padded_face_rect(image.shape, *face)
+        expected = image.copy()
+        expected[y1:y2, x1:x2] = cv2.GaussianBlur(image[y1:y2, x1:x2], (99, 99), 30)
+        result = blurrer.anonymize(image.copy(), [face])
+        assert np.array_equal(result, expected), size
+        baseline = retained_detail(image, result, face)
+        
+        level_8 = {}
+        for mode in ('pixelate', 'box'):
+            detail = [retained_detail(image, anonymize_faces(image.copy(), [face], mode=mode, level=level), face)
+                      for level in (8, 4, 2)]
+            assert detail[0] > detail[1] > detail[2], (mode, size, detail)
+            level_8[mode] = detail[0]
+            # Level 8 leaves face-scale detail the baseline blur removes on classroom-sized faces
+            if size <= 80:
+                assert detail[0] > baseline + 0.3, (mode, size, detail, baseline)
+        print(f"   ✓ {size}px face: detail kept by gaussian {baseline:.2f}, "
+              f"pixelate level 8 {level_8['pixelate']:.2f}, box level 8 {level_8['box']:.2f}")
+
 if __name__ == '__main__':
     test_face_blur()
+    test_shared_pyramid_matches()
+    test_custom_backend()
+    test_detect_in_regions()
+    test_duplicate_suppression_matches_legacy()
+    test_anonymization_modes()
+    test_anonymization_strength()
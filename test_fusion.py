@@ -0,0 +1,61 @@
+"""
+Test script for YOLO + OWL-ViT detection fusion
+"""
+
+import numpy as np
+from models.detections import Detections
+from models.fusion import fuse_detections
+from utils.geometry import pairwise_iou
+
+SYNONYMS = {'bottle on desk': 'bottle', 'desk': 'dining table'}
+
+def test_pairwise_iou():
+    """Vectorized IoU matches hand-computed values"""
+    print("\n1. Testing pairwise IoU...")
+    iou = pairwise_iou([[0, 0, 10, 10], [20, 20, 30, 30]], [[5, 0, 15, 10]])
+    assert iou.shape == (2, 1)
+    assert np.isclose(iou[0, 0], 50 / 150)
+    assert iou[1, 0] == 0
+    print("   ✓ IoU matrix correct")
+
+def test_fuse_synonym_duplicates():
+    """Same bottle from both detectors becomes one detection"""
+    print("\n2. Testing fusion of duplicates...")
+    yolo = Detections(
+        boxes=[[100, 100, 120, 150], [300, 300, 400, 400]],
+        scores=[0.8, 0.9],
+        class_ids=[0, 1],
+        class_names=['bottle', 'chair']
+    )
+    owlvit = Detections(
+        boxes=[[102, 100, 122, 150], [300, 300, 400, 400], [500, 500, 510, 510]],
+        scores=[0.2, 0.3, 0.15],
+        class_ids=[0, 1, 2],
+        class_names=['bottle on desk', 'desk', 'papers on floor']
+    )
+    
+    fused, remaining = fuse_detections(yolo, owlvit, SYNONYMS, iou_threshold=0.5)
+    
+    # Bottle pair fused; chair/desk are not synonyms; papers have no YOLO match
+    assert len(fused) == 2
+    assert list(remaining.classes) == ['desk', 'papers on floor']
+    assert np.isclose(fused.boxes[0, 0], (100 * 0.8 + 102 * 0.2) / 1.0)
+    assert np.isclose(fused.scores[0], 0.8)
+    print("   ✓ Duplicates fused, other detections kept")
+
+def test_fuse_one_to_one():
+    """Each YOLO box absorbs at most one OWL-ViT box"""
+    print("\n3. Testing one-to-one matching...")
+    yolo = Detections([[0, 0, 10, 10]], [0.9], [0], ['bottle'])
+    owlvit = Detections([[0, 0, 10, 10], [1, 0, 11, 10]], [0.3, 0.4], [0, 0], ['bottle on desk'])
+    
+    fused, remaining = fuse_detections(yolo, owlvit, SYNONYMS, iou_threshold=0.5)
+    assert len(fused) == 1 and len(remaining) == 1
+    print("   ✓ Second OWL-ViT box kept as separate detection")
+
+
+if __name__ == "__main__":
+    test_pairwise_iou()
+    test_fuse_synonym_duplicates()
+    test_fuse_one_to_one()
+    print("\n✓ All fusion tests passed!")
@@ -0,0 +1,87 @@
+"""
+Test script for the vectorized geometry helpers used by the scorers
+Compares them with the per-pair loops the scorers used before
+"""
+
+import numpy as np
+from models.detections import Detections
+from scoring.furniture_score import FurnitureScorer
+from scoring.trash_score import TrashScorer
+from utils.geometry import points_in_boxes, nearest_box
+
+def is_near(point, bbox, threshold):
+    """Reference per-pair check (previous FurnitureScorer/TrashScorer._is_near)"""
+    x1, y1, x2, y2 = bbox
+    px, py = point
+    return (x1 - threshold <= px <= x2 + threshold and
+            y1 - threshold <= py <= y2 + threshold)
+
+def create_random_detections(rng, count, class_names):
+    """Random boxes with classes drawn from class_names"""
+    x1y1 = rng.uniform(0, 600, (count, 2))
+    wh = rng.uniform(1, 200, (count, 2))
+    return Detections(
+        boxes=np.hstack([x1y1, x1y1 + wh]),
+        scores=rng.uniform(0.1, 1.0, count),
+        class_ids=rng.randint(0, len(class_names), count),
+        class_names=class_names
+    )
+
+def test_points_in_boxes_matches_loop():
+    """Broadcast predicate equals the pairwise Python check"""
+    print("\n1. Testing point-in-expanded-box...")
+    rng = np.random.RandomState(0)
+    points = rng.uniform(0, 640, (50, 2)).astype(np.float32)
+    boxes = create_random_detections(rng, 20, ['box']).boxes
+    
+    for margin in (0, 80, 100):
+        expected = [[is_near(p, b, margin) for b in boxes] for p in points]
+        assert points_in_boxes(points, boxes, margin).tolist() == expected
+    
+    assert points_in_boxes(points, np.zeros((0, 4))).shape == (50, 0)
+    print("   ✓ Matches per-pair loop for all margins")
+
+def test_nearest_box():
+    """Nearest box index and distance"""
+    print("\n2. Testing nearest box...")
+    index, distance = nearest_box([[5, 5], [30, 5]], [[0, 0, 10, 10], [20, 0, 25, 10]])
+    assert index.tolist() == [0, 1]
+    assert np.allclose(distance, [0, 5])
+    
+    index, distance = nearest_box([[5, 5]], np.zeros((0, 4)))
+    assert index.tolist() == [-1] and np.isinf(distance[0])
+    print("   ✓ Indices and distances correct")
+
+def test_scorers_match_loops():
+    """Vectorized scorer checks give the same counts as the old loops"""
+    print("\n3. Testing scorer equivalence...")
+    rng = np.random.RandomState(1)
+    names = ['chair', 'dining table', 'bottle', 'cup', 'book', 'trash bin', 'bag']
+    furniture = FurnitureScorer()
+    trash = TrashScorer()
+    
+    for _ in range(200):
+        detections = create_random_detections(rng, rng.randint(0, 30), names)
+        chairs, tables = furniture._split_furniture(detections)
+        bins = trash._find_bins(detections)
+        
+        if len(chairs):
+            aligned = sum(any(is_near(c, t, 100) for t in tables.boxes) for c in chairs.centers)
+            assert furniture._check_alignment(chairs, tables) == aligned / len(chairs)
+        
+        clutter = detections[detections.category_mask('clutter')]
+        on_tables = sum(any(is_near(c, t, 0) for t in tables.boxes) for c in clutter.centers)
+        expected_penalty = min(3, on_tables * 0.5) if len(tables) else 0
+        assert furniture._check_surface_clutter(detections, tables) == expected_penalty
+        
+        litter = detections[detections.class_contains(['bottle', 'cup', 'paper', 'plastic', 'bag'])]
+        outside = sum(not any(is_near(c, b, 80) for b in bins.boxes) for c in litter.centers)
+        assert trash._check_trash_outside_bins(detections, bins) == min(2, outside)
+    print("   ✓ Alignment, surface clutter and trash-outside-bin counts unchanged")
+
+
+if __name__ == "__main__":
+    test_points_in_boxes_matches_loop()
+    test_nearest_box()
+    test_scorers_match_loops()
+    print("\n✓ All geometry tests passed!")
@@ -0,0 +1,117 @@
+"""
+Test script for the shared per-frame ImageFeatures cache
+"""
+
+import os
+import cv2
+import numpy as np
+import config
+from scoring.floor_score import FloorScorer
+from scoring.wall_score import WallScorer
+from utils.image_features import ImageFeatures, as_features, mean_std, pooled_variance, contour_areas
+
+SAMPLE_IMAGES = ['data/classroom1.jfif', 'data/classroom3.avif', 'data/classroom7.jfif']
+
+def create_test_frame():
+    """Create a noisy synthetic classroom frame"""
+    rng = np.random.RandomState(0)
+    noise = rng.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+    return cv2.GaussianBlur(noise, (0, 0), 2)
+
+def test_region_views_match_direct_conversion():
+    """Region slices of full-frame conversions equal converting the crop"""
+    print("\n1. Testing region color conversions...")
+    frame = create_test_frame()
+    features = ImageFeatures(frame)
+    y_start, y_end = features.region_bounds['floor']
+    floor = frame[y_start:y_end]
+    
+    assert np.array_equal(features.gray('floor'), cv2.cvtColor(floor, cv2.COLOR_BGR2GRAY))
+    assert np.array_equal(features.hsv('floor'), cv2.cvtColor(floor, cv2.COLOR_BGR2HSV))
+    assert np.array_equal(features.edges('floor'), cv2.Canny(cv2.cvtColor(floor, cv2.COLOR_BGR2GRAY), 50, 150))
+    print("   ✓ Gray, HSV and edges match per-region computation")
+
+def test_statistics_match_numpy():
+    """cv2.meanStdDev statistics agree with float64 NumPy"""
+    print("\n2. Testing region statistics...")
+    frame = create_test_frame()
+    features = ImageFeatures(frame)
+    
+    _, std = features.mean_std('wall', 'lab')
+    assert np.isclose(std[0], np.std(features.lab('wall')[:, :, 0]))
+    assert np.isclose(pooled_variance(*mean_std(frame)), np.var(frame))
+    print("   ✓ Per-channel and pooled statistics correct")
+
+def test_memoization():
+    """Each conversion runs once per frame"""
+    print("\n3. Testing memoization...")
+    features = ImageFeatures(create_test_frame())
+    
+    assert features.hsv('wall').base is features.hsv('floor').base
+    assert features.edges('wall') is features.edges('wall')
+    assert as_features(features) is features
+    
+    # Plain crops are treated as the requested region
+    crop = create_test_frame()[:100]
+    assert as_features(crop, 'floor').region('floor').shape == crop.shape
+    print("   ✓ Conversions cached and shared between regions")
+
+def test_contour_areas_match_contour_area():
+    """Vectorized areas equal cv2.contourArea per outer contour"""
+    print("\n4. Testing blob areas...")
+    mask = np.zeros((100, 100), dtype=np.uint8)
+    mask[10:20, 10:30] = 255  # 20x10 rectangle
+    mask[50, 5:95] = 255  # One-pixel grout line
+    mask[70:75, 70:73] = 255  # Small speck
+    mask[80, 80] = 255  # Single pixel
+    cv2.circle(mask, (30, 75), 12, 255, -1)
+    cv2.circle(mask, (30, 75), 6, 0, -1)  # Hole...
+    mask[74:77, 29:32] = 255  # ...with a blob inside it (not an outer contour)
+    
+    rng = np.random.RandomState(1)
+    noise = ((rng.random_sample((120, 160)) < 0.3) * 255).astype(np.uint8)
+    
+    for binary in (mask, noise):
+        contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        expected = [cv2.contourArea(c) for c in contours]
+        assert contour_areas(binary).tolist() == expected
+    assert len(contour_areas(np.zeros((10, 10), dtype=np.uint8))) == 0
+    print(f"   ✓ {len(expected)} noise blob areas match contourArea")
+
+def baseline_counts(features):
+    """Debris and wall patch counts as the original scorers computed them"""
+    gray = cv2.cvtColor(features.region('floor'), cv2.COLOR_BGR2GRAY)
+    _, thresh = cv2.threshold(gray, 100, 255, cv2.THRESH_BINARY_INV)
+    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    debris = sum(1 for c in contours if 10 < cv2.contourArea(c) < 500)
+    
+    hsv = cv2.cvtColor(features.region('wall'), cv2.COLOR_BGR2HSV)
+    _, thresh = cv2.threshold(hsv[:, :, 1], 30, 255, cv2.THRESH_BINARY)
+    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    patches = sum(1 for c in contours if 500 < cv2.contourArea(c) < 5000)
+    return debris, patches
+
+def test_blob_counts_match_baseline():
+    """Floor debris and wall patch counts are unchanged on the sample images"""
+    print("\n5. Testing blob counts on the sample images...")
+    checked = 0
+    for path in SAMPLE_IMAGES:
+        image = cv2.imread(path) if os.path.exists(path) else None
+        if image is None:
+            continue
+        features = ImageFeatures(cv2.resize(image, config.IMAGE_SIZE))
+        counts = (FloorScorer()._count_debris(features), WallScorer()._count_patches(features))
+        assert counts == baseline_counts(features), (path, counts, baseline_counts(features))
+        print(f"   {os.path.basename(path)}: {counts[0]} debris, {counts[1]} wall patches")
+        checked += 1
+    
+    assert checked, "no sample image could be read"
+    print(f"   ✓ {checked} sample images match the contour-based counts")
+
+if __name__ == "__main__":
+    test_region_views_match_direct_conversion()
+    test_statistics_match_numpy()
+    test_memoization()
+    test_contour_areas_match_contour_area()
+    test_blob_counts_match_baseline()
+    print("\n✓ All ImageFeatures tests passed!")
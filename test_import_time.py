@@ -0,0 +1,53 @@
+"""
+Import-time regression check for the CLI entry point
+Runs `python -X importtime -c "import main"` and makes sure heavy
+dependencies are not pulled in at module load
+"""
+
+import os
+import subprocess
+import sys
+
+# Packages that must only load on the code path that needs them
+HEAVY_MODULES = ['ultralytics', 'torch', 'transformers', 'pandas', 'onnxruntime', 'PIL']
+
+def measure_imports(statement):
+    """Return {module: cumulative microseconds} for a Python statement"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode == 0, result.stderr
+    
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        imports[module.strip()] = int(cumulative_us)
+    
+    return imports
+
+def test_main_import_is_light():
+    """Importing main.py must not load ML frameworks or pandas"""
+    print("\n1. Measuring `import main`...")
+    imports = measure_imports('import main')
+    
+    loaded = sorted(
+        name for name in imports
+        if name.split('.')[0] in HEAVY_MODULES
+    )
+    assert not loaded, f"Heavy modules imported at load time: {loaded}"
+    
+    # Report the slowest imports to make regressions easy to spot
+    slowest = sorted(imports.items(), key=lambda item: item[1], reverse=True)[:10]
+    print(f"   Total: {imports.get('main', 0) / 1000:.1f} ms")
+    for name, cumulative_us in slowest:
+        print(f"   {cumulative_us / 1000:8.1f} ms  {name}")
+    print("   ✓ No heavy dependencies imported")
+
+
+if __name__ == "__main__":
+    test_main_import_is_light()
@@ -0,0 +1,96 @@
+"""
+Test script for the ONNX Runtime YOLO backend (parity with the torch backend)
+Skipped when onnxruntime or ultralytics is not installed
+"""
+
+import cv2
+import numpy as np
+import pytest
+from utils.geometry import pairwise_iou
+
+SAMPLE_IMAGES = ['data/classroom1.jfif', 'data/classroom3.avif', 'data/classroom7.jfif']
+
+def require_backends():
+    """Skip unless both backends can be imported"""
+    pytest.importorskip('onnxruntime')
+    pytest.importorskip('ultralytics')
+
+def load_samples():
+    images = [cv2.imread(path) for path in SAMPLE_IMAGES]
+    images = [image for image in images if image is not None]
+    if not images:
+        pytest.skip("no sample image could be read")
+    return images
+
+def test_letterbox_matches_ultralytics():
+    """Model input geometry equals ultralytics' LetterBox for any frame shape"""
+    require_backends()
+    from ultralytics.data.augment import LetterBox
+    from models.onnx_detector import ONNXObjectDetector, DEFAULT_STRIDE
+    print("\n1. Testing letterbox geometry...")
+    
+    detector = ONNXObjectDetector.__new__(ONNXObjectDetector)
+    detector.imgsz, detector.stride = 640, DEFAULT_STRIDE
+    
+    rng = np.random.RandomState(0)
+    frames = load_samples() + [rng.randint(0, 255, (480, 640, 3), dtype=np.uint8),
+                               rng.randint(0, 255, (640, 640, 3), dtype=np.uint8)]
+    for frame in frames:
+        for auto in (True, False):
+            blob, _, _ = detector._letterbox(frame, auto=auto)
+            ours = (blob.transpose(1, 2, 0)[:, :, ::-1] * 255).round().astype(np.uint8)
+            expected = LetterBox((640, 640), auto=auto, stride=DEFAULT_STRIDE)(image=frame)
+            assert ours.shape == expected.shape, (frame.shape, auto, ours.shape, expected.shape)
+            assert np.array_equal(ours, expected)
+    print(f"   ✓ {len(frames)} frame shapes padded like ultralytics")
+
+def match_detections(reference, candidate, iou_threshold=0.9):
+    """Greedy one-to-one matching by IoU within the same class"""
+    if len(reference) != len(candidate):
+        return False
+    if not len(reference):
+        return True
+    
+    iou = pairwise_iou(reference.boxes, candidate.boxes)
+    same_class = (np.array(reference.class_names)[reference.class_ids][:, None] ==
+                  np.array(candidate.class_names)[candidate.class_ids][None, :])
+    iou = np.where(same_class, iou, 0)
+    
+    for _ in range(len(reference)):
+        i, j = np.unravel_index(iou.argmax(), iou.shape)
+        if iou[i, j] < iou_threshold or abs(reference.scores[i] - candidate.scores[j]) > 0.05:
+            return False
+        iou[i, :] = -1
+        iou[:, j] = -1
+    return True
+
+def test_detections_match_torch():
+    """ONNX detections equal the torch backend's on the sample images"""
+    require_backends()
+    from models.detector import ObjectDetector
+    from models.onnx_detector import ONNXObjectDetector
+    print("\n2. Testing ONNX vs torch detections...")
+    
+    torch_detector = ObjectDetector()
+    onnx_detector = ONNXObjectDetector()
+    if torch_detector.model is None or onnx_detector.model is None:
+        pytest.skip("YOLO weights or ONNX export unavailable")
+    
+    images = load_samples()
+    for image in images:
+        reference = torch_detector.detect_objects(image)
+        candidate = onnx_detector.detect_objects(image)
+        assert match_detections(reference, candidate), (len(reference), len(candidate))
+    
+    # Tiles of one frame share a shape, so the batch keeps the minimal padding
+    tiles = [images[0][:320, :480], images[0][-320:, -480:]]
+    for reference, candidate in zip(torch_detector.detect_objects_batch(tiles),
+                                    onnx_detector.detect_objects_batch(tiles)):
+        assert match_detections(reference, candidate)
+    print(f"   ✓ {len(images)} images and {len(tiles)} tiles match")
+
+
+if __name__ == "__main__":
+    test_letterbox_matches_ultralytics()
+    test_detections_match_torch()
+    print("\n✓ All ONNX detector tests passed!")
@@ -0,0 +1,74 @@
+"""
+Test script for the DAG scorer pipeline
+"""
+
+import time
+import numpy as np
+from scoring.pipeline import ScoringPipeline
+from utils.image_features import ImageFeatures
+
+class SlowScorer:
+    """Mock scorer that sleeps (releasing the GIL like OpenCV does)"""
+    inputs = ('features',)
+    
+    def evaluate(self, features):
+        time.sleep(0.1)
+        return 10.0, {}
+
+def test_default_scorers():
+    """Configured scorers run and report timings"""
+    print("\n1. Testing default pipeline...")
+    pipeline = ScoringPipeline.from_config()
+    image = np.random.randint(0, 255, (640, 640, 3), dtype=np.uint8)
+    detections = [{'class': 'chair', 'confidence': 0.9, 'bbox': [100, 300, 200, 400]}]
+    
+    outputs, timings = pipeline.run(features=ImageFeatures(image), detections=detections)
+    assert list(outputs) == ['floor', 'furniture', 'trash', 'wall', 'clutter']
+    assert set(timings) == set(outputs)
+    for name, (score, details) in outputs.items():
+        assert 0 <= score <= 10 and isinstance(details, dict)
+        print(f"   {name}: {score:.2f}/10 in {timings[name]:.1f}ms")
+    print("   ✓ All scorers evaluated")
+
+def test_parallel_and_dependencies():
+    """Independent nodes overlap; dependent nodes wait for their inputs"""
+    print("\n2. Testing parallel execution...")
+    pipeline = ScoringPipeline(max_workers=4)
+    for name in ('a', 'b', 'c'):
+        pipeline.add(name, SlowScorer())
+    pipeline.add('total', lambda a, b, c: a[0] + b[0] + c[0], inputs=('a', 'b', 'c'))
+    
+    start = time.perf_counter()
+    outputs, _ = pipeline.run(features=None)
+    elapsed = time.perf_counter() - start
+    
+    assert outputs['total'] == 30.0
+    assert elapsed < 0.25, f"Scorers did not run concurrently ({elapsed:.2f}s)"
+    print(f"   ✓ 3 x 100ms scorers finished in {elapsed * 1000:.0f}ms")
+
+def test_invalid_graphs():
+    """Unknown inputs and cycles are rejected"""
+    print("\n3. Testing graph validation...")
+    pipeline = ScoringPipeline()
+    pipeline.add('x', lambda y: y, inputs=('y',))
+    pipeline.add('y', lambda x: x, inputs=('x',))
+    try:
+        pipeline.run()
+        assert False, "Cycle not detected"
+    except ValueError as e:
+        print(f"   ✓ Rejected: {e}")
+    
+    pipeline = ScoringPipeline()
+    pipeline.add('x', lambda missing: missing, inputs=('missing',))
+    try:
+        pipeline.run()
+        assert False, "Unknown input not detected"
+    except ValueError as e:
+        print(f"   ✓ Rejected: {e}")
+
+
+if __name__ == "__main__":
+    test_default_scorers()
+    test_parallel_and_dependencies()
+    test_invalid_graphs()
+    print("\n✓ All pipeline tests passed!")
@@ -0,0 +1,107 @@
+"""
+Memory regression check for image loading and preprocessing
+Uses tracemalloc to measure the peak allocation of one frame going through
+ImageProcessor.load_image + preprocess
+"""
+
+import os
+import tempfile
+import tracemalloc
+import cv2
+import numpy as np
+from utils.image_processor import ImageProcessor, jpeg_size
+
+FRAME_SHAPE = (1080, 1920, 3)  # Typical classroom camera frame
+
+def create_test_jpeg(directory):
+    """Write a noisy full-HD JPEG and return its path and encoded size"""
+    rng = np.random.RandomState(0)
+    frame = cv2.GaussianBlur(rng.randint(0, 255, FRAME_SHAPE, dtype=np.uint8), (0, 0), 3)
+    path = os.path.join(directory, 'frame.jpg')
+    cv2.imwrite(path, frame)
+    return path, os.path.getsize(path)
+
+def measure_peak(func):
+    """Peak bytes allocated (as seen by tracemalloc) while running func"""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - before
+
+def test_preprocess_peak_allocation():
+    """A frame costs its decoded pixels and nothing else in steady state"""
+    print("\n1. Measuring peak allocation per frame...")
+    processor = ImageProcessor()
+    decoded_bytes = int(np.prod(FRAME_SHAPE))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path, encoded_bytes = create_test_jpeg(tmp)
+        
+        def process_frame():
+            image = processor.load_image(path)
+            processor.preprocess(image, reuse_buffer=True)
+        
+        # First call allocates this thread's resize buffer
+        process_frame()
+        peak = measure_peak(process_frame)
+    
+    print(f"   Decoded frame: {decoded_bytes / 1e6:.1f} MB, encoded file: {encoded_bytes / 1e6:.2f} MB")
+    print(f"   Peak allocation: {peak / 1e6:.2f} MB")
+    
+    # No copy of the file bytes, no new resize output, no float normalization
+    assert peak < decoded_bytes + 256 * 1024, f"Peak {peak} bytes exceeds one decoded frame"
+    print("   ✓ Only the decoded frame is allocated")
+
+def test_reused_buffer_matches_resize():
+    """Buffer reuse gives the same pixels as a fresh cv2.resize"""
+    print("\n2. Testing resize buffer reuse...")
+    processor = ImageProcessor()
+    rng = np.random.RandomState(1)
+    first = rng.randint(0, 255, (720, 1280, 3), dtype=np.uint8)
+    second = rng.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+    
+    out1 = processor.preprocess(first, reuse_buffer=True)
+    assert np.array_equal(out1, cv2.resize(first, (640, 640)))
+    out2 = processor.preprocess(second, reuse_buffer=True)
+    assert out2 is out1
+    assert np.array_equal(out2, cv2.resize(second, (640, 640)))
+    
+    # Without reuse every call returns its own array
+    assert processor.preprocess(first) is not processor.preprocess(first)
+    print("   ✓ Same output, one buffer per thread")
+
+def test_decode_at_target_size():
+    """Large JPEGs decode at a reduced scale that still covers the target"""
+    print("\n3. Testing reduced JPEG decode...")
+    processor = ImageProcessor()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path, _ = create_test_jpeg(tmp)
+        with open(path, 'rb') as f:
+            assert jpeg_size(f.read()) == (FRAME_SHAPE[1], FRAME_SHAPE[0])
+        
+        native = processor.load_image(path)
+        reduced = processor.load_image(path, target_size=(320, 320))
+        assert native.shape == FRAME_SHAPE
+        assert reduced.shape == (FRAME_SHAPE[0] // 2, FRAME_SHAPE[1] // 2, 3)
+        
+        # Source too small for any reduction: full decode
+        small = processor.load_image(path, target_size=(640, 640))
+        assert small.shape == FRAME_SHAPE
+        
+        decoded_bytes = int(np.prod(FRAME_SHAPE))
+        peak = measure_peak(lambda: processor.load_image(path, target_size=(320, 320)))
+        assert peak < decoded_bytes / 2
+    print(f"   ✓ {FRAME_SHAPE[1]}x{FRAME_SHAPE[0]} decoded at {reduced.shape[1]}x{reduced.shape[0]} for a 320x320 target")
+
+
+if __name__ == "__main__":
+    test_preprocess_peak_allocation()
+    test_reused_buffer_matches_resize()
+    test_decode_at_target_size()
+    print("\n✓ All preprocessing memory tests passed!")
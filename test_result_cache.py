@@ -0,0 +1,79 @@
+"""
+Test script for the two-tier analysis result cache
+"""
+
+import os
+import tempfile
+from utils.result_cache import ResultCache, config_fingerprint
+
+def create_mock_result(total_score=42.0):
+    """Create a mock JSON-serializable analysis result"""
+    return {
+        'scores': {'floor': 8.5, 'furniture': 9.0, 'trash': 8.0, 'wall': 8.5, 'clutter': 8.0},
+        'total_score': total_score,
+        'rating': 'Good',
+        'detections': [{'class': 'chair', 'confidence': 0.9, 'bbox': [1, 2, 3, 4], 'center': [2, 3]}]
+    }
+
+def test_key_follows_content():
+    """Identical bytes share a key; changed bytes or config do not"""
+    print("\n1. Testing content-hash keys...")
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, name) for name in ('a.jpg', 'b.jpg', 'c.jpg')]
+        for path, data in zip(paths, (b'frame-1', b'frame-1', b'frame-2')):
+            with open(path, 'wb') as f:
+                f.write(data)
+        
+        keys = [ResultCache.make_key(path, 'cfg') for path in paths]
+        assert keys[0] == keys[1]
+        assert keys[0] != keys[2]
+        assert ResultCache.make_key(paths[0], 'other') != keys[0]
+    
+    class FakeConfig:
+        THRESHOLD = 0.5
+    
+    before = config_fingerprint(FakeConfig, 'yolo')
+    FakeConfig.THRESHOLD = 0.6
+    assert config_fingerprint(FakeConfig, 'yolo') != before
+    print("   ✓ Keys change with image content and configuration")
+
+def test_memory_and_disk_tiers():
+    """Memory misses fall back to disk; counters track both"""
+    print("\n2. Testing memory and disk tiers...")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResultCache(max_entries=1, cache_dir=tmp)
+        cache.put('a', create_mock_result(40.0))
+        cache.put('b', create_mock_result(41.0))  # Pushes 'a' out of memory
+        
+        assert cache.get('b')['total_score'] == 41.0
+        assert cache.get('a')['total_score'] == 40.0
+        assert cache.get('missing') is None
+        
+        info = cache.info()
+        assert (info['memory_hits'], info['disk_hits'], info['misses']) == (1, 1, 1)
+        
+        # A fresh cache (e.g. after a restart) still finds disk entries
+        assert ResultCache(cache_dir=tmp).get('b') == create_mock_result(41.0)
+    print("   ✓ LRU memory tier backed by disk")
+
+def test_disk_eviction():
+    """Disk tier stays under its byte budget"""
+    print("\n3. Testing disk eviction...")
+    with tempfile.TemporaryDirectory() as tmp:
+        entry_size = len(str(create_mock_result()))
+        cache = ResultCache(max_entries=1, cache_dir=tmp, max_bytes=entry_size * 3)
+        for idx in range(10):
+            cache.put(f'key{idx}', create_mock_result(float(idx)))
+        
+        total = sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp))
+        assert total <= entry_size * 3
+        assert cache.info()['evictions'] > 0
+        assert cache.get('key9') is not None
+    print("   ✓ Oldest entries evicted")
+
+
+if __name__ == "__main__":
+    test_key_follows_content()
+    test_memory_and_disk_tiers()
+    test_disk_eviction()
+    print("\n✓ All result cache tests passed!")
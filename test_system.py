@@ -99,5 +99,26 @@ def test_scorers():
     
     print("\n✓ All scorers tested successfully!")
 
+def test_evaluate_matches_calculate_and_details():
+    """Single-pass evaluate() agrees with calculate_score and get_details"""
+    print("\nTesting single-pass evaluate()...")
+    image = create_test_image()
+    detections = create_mock_detections()
+    
+    cases = [
+        (FloorScorer(), (image[384:640, :], detections)),
+        (FurnitureScorer(), (image, detections)),
+        (TrashScorer(), (image, detections)),
+        (WallScorer(), (image[0:256, :], detections)),
+        (ClutterScorer(), (detections,)),
+    ]
+    
+    for scorer, args in cases:
+        score, details = scorer.evaluate(*args)
+        assert score == scorer.calculate_score(*args)
+        assert details == scorer.get_details(*args)
+        print(f"   ✓ {type(scorer).__name__}: {score:.2f}/10")
+
 if __name__ == "__main__":
     test_scorers()
+    test_evaluate_matches_calculate_and_details()
@@ -6,23 +6,280 @@ Protects student privacy by detecting and blurring faces in classroom images
 import cv2
 import numpy as np
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# OpenCV zoo YuNet face detector (needs OpenCV >= 4.8). The model file is
+# deployed with the code; it is never fetched at runtime.
+YUNET_MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'models', 'face_detection_yunet_2023mar.onnx'
+)
+
+def overlap_matrix(faces):
+    """
+    Pairwise overlap of face rectangles, relative to the smaller of each pair
+    
+    Args:
+        faces: array-like (N, 4) of [x, y, w, h]
+    
+    Returns:
+        float64 array (N, N), intersection area / min(area_i, area_j)
+    """
+    boxes = np.asarray(faces, dtype=np.int64).reshape(-1, 4)
+    x1, y1 = boxes[:, 0], boxes[:, 1]
+    x2, y2 = x1 + boxes[:, 2], y1 + boxes[:, 3]
+    areas = boxes[:, 2] * boxes[:, 3]
+    
+    inter_w = np.maximum(0, np.minimum(x2[:, None], x2[None, :]) - np.maximum(x1[:, None], x1[None, :]))
+    inter_h = np.maximum(0, np.minimum(y2[:, None], y2[None, :]) - np.maximum(y1[:, None], y1[None, :]))
+    min_areas = np.minimum(areas[:, None], areas[None, :])
+    
+    return inter_w * inter_h / np.maximum(min_areas, 1)
+
+def suppress_duplicates(faces, overlap_threshold=0.3, keep='first'):
+    """
+    Drop face rectangles that overlap an already kept one
+    
+    Args:
+        faces: sequence of [x, y, w, h] (e.g. raw hits of several cascades)
+        overlap_threshold: Minimum overlap_matrix ratio to consider duplicates
+        keep: 'first' keeps the earliest rectangle of each duplicate group
+            (the original list-order semantics); 'largest' visits rectangles
+            by decreasing area, so the blur covers the biggest box found
+    
+    Returns:
+        List of unique face rectangles (elements of faces, in input order)
+    """
+    faces = list(faces)
+    if not faces:
+        return []
+    
+    duplicates = overlap_matrix(faces) >= overlap_threshold
+    
+    if keep == 'first':
+        order = np.arange(len(faces))
+    elif keep == 'largest':
+        boxes = np.asarray(faces, dtype=np.int64).reshape(-1, 4)
+        order = np.argsort(-(boxes[:, 2] * boxes[:, 3]), kind='stable')
+    else:
+        raise ValueError(f"Unknown keep mode: {keep!r}")
+    
+    # Greedy pass over the precomputed matrix: one row lookup per kept face
+    suppressed = np.zeros(len(faces), dtype=bool)
+    kept = []
+    for idx in order:
+        if suppressed[idx]:
+            continue
+        kept.append(idx)
+        suppressed |= duplicates[idx]
+    
+    return [faces[idx] for idx in sorted(kept)]
+
+# Face anonymization strategies (besides the per-face 'gaussian' blur)
+ANONYMIZATION_MODES = ('gaussian', 'pixelate', 'box', 'fill')
+
+def padded_face_rect(shape, x, y, w, h, padding=0.2):
+    """Face rectangle grown by padding on every side, clipped to the image: (x1, y1, x2, y2)"""
+    pad_w = int(w * padding)
+    pad_h = int(h * padding)
+    return (
+        max(0, x - pad_w),
+        max(0, y - pad_h),
+        min(shape[1], x + w + pad_w),
+        min(shape[0], y + h + pad_h)
+    )
+
+def anonymize_faces(image, faces, mode='pixelate', level=8, padding=0.2, fill_color=(0, 0, 0)):
+    """
+    Anonymize all faces in one pass over their combined mask (in place)
+    
+    The strategy runs once on the bounding region of all faces and is copied
+    through the union of the padded face rectangles, so the cost does not
+    grow with the number of faces.
+    
+    Args:
+        image: OpenCV image (BGR format), modified in place
+        faces: face rectangles [(x, y, w, h), ...]
+        mode: 'pixelate' (block averages), 'box' (three stacked box blurs,
+            close to a Gaussian) or 'fill' (solid color)
+        level: Irreversibility level; the largest padded face keeps about
+            this many blocks (pixelate) or blur widths (box) across its longer
+            side (one more where the grid straddles it), smaller faces fewer
+            (relative to face size, unlike the fixed 99x99 'gaussian' blur: at 8,
+            faces under ~150px keep far more detail than with the Gaussian)
+        padding: Extra padding around each face (0.2 = 20% larger)
+        fill_color: BGR color for 'fill'
+    
+    Returns:
+        image
+    """
+    rects = [padded_face_rect(image.shape, x, y, w, h, padding) for (x, y, w, h) in faces]
+    rects = [(x1, y1, x2, y2) for x1, y1, x2, y2 in rects if x2 > x1 and y2 > y1]
+    if not rects:
+        return image
+    
+    # Work on the bounding region of all faces only
+    bounds = np.array(rects)
+    rx1, ry1 = bounds[:, :2].min(axis=0)
+    rx2, ry2 = bounds[:, 2:].max(axis=0)
+    region = image[ry1:ry2, rx1:rx2]
+    
+    mask = np.zeros(region.shape[:2], dtype=bool)
+    for x1, y1, x2, y2 in rects:
+        mask[y1 - ry1:y2 - ry1, x1 - rx1:x2 - rx1] = True
+    
+    # Detail size that leaves the largest face with `level` units across
+    largest_side = int(max((bounds[:, 2:] - bounds[:, :2]).max(), 1))
+    cell = max(2, -(-largest_side // max(1, level)))
+    
+    if mode == 'pixelate':
+        height, width = region.shape[:2]
+        small = cv2.resize(
+            region,
+            (max(1, -(-width // cell)), max(1, -(-height // cell))),
+            interpolation=cv2.INTER_AREA
+        )
+        anonymized = cv2.resize(small, (width, height), interpolation=cv2.INTER_NEAREST)
+    elif mode == 'box':
+        # Box filter cost does not depend on kernel size
+        anonymized = region
+        for _ in range(3):
+            anonymized = cv2.blur(anonymized, (cell, cell))
+    elif mode == 'fill':
+        anonymized = np.empty_like(region)
+        anonymized[:] = fill_color
+    else:
+        raise ValueError(f"Unknown anonymization mode: {mode!r}")
+    
+    np.copyto(region, anonymized, where=mask[:, :, None])
+    return image
+
+class YuNetFaceDetector:
+    """Single-pass OpenCV DNN face detector run at a fixed small input size"""
+    
+    def __init__(self, model_path=YUNET_MODEL_PATH, input_size=640, confidence=0.6, nms_threshold=0.3):
+        """
+        Args:
+            model_path: YuNet ONNX file (face_detection_yunet_2023mar.onnx
+                from the OpenCV model zoo)
+            input_size: Longer side frames are downscaled to before detection
+            confidence: Minimum face score
+            nms_threshold: IoU above which overlapping faces are merged
+        """
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"YuNet model not found: {model_path}")
+        
+        self.input_size = input_size
+        self.detector = cv2.FaceDetectorYN.create(
+            model_path, '', (input_size, input_size), confidence, nms_threshold, 5000
+        )
+        
+        # The detector keeps its input size as state
+        self._lock = threading.Lock()
+    
+    def detect(self, image):
+        """
+        Detect faces in a BGR image
+        
+        Returns:
+            List of face rectangles [(x, y, w, h), ...] in image coordinates
+        """
+        height, width = image.shape[:2]
+        scale = min(1.0, self.input_size / max(height, width))
+        frame = image
+        if scale < 1.0:
+            size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+            frame = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        
+        with self._lock:
+            self.detector.setInputSize((frame.shape[1], frame.shape[0]))
+            _, faces = self.detector.detect(frame)
+        
+        if faces is None:
+            return []
+        
+        # Back to input coordinates, clipped to the frame
+        boxes = faces[:, :4] / scale
+        x1 = np.clip(boxes[:, 0], 0, width)
+        y1 = np.clip(boxes[:, 1], 0, height)
+        x2 = np.clip(boxes[:, 0] + boxes[:, 2], 0, width)
+        y2 = np.clip(boxes[:, 1] + boxes[:, 3], 0, height)
+        return [
+            (int(round(a)), int(round(b)), int(round(c - a)), int(round(d - b)))
+            for a, b, c, d in zip(x1, y1, x2, y2)
+            if c > a and d > b
+        ]
+
 
 class FaceBlurrer:
     """Detects and blurs faces in images for privacy protection"""
     
-    def __init__(self, blur_amount=99, scale_factor=1.05, min_neighbors=2):
+    # Same grouping tolerance detectMultiScale uses internally
+    GROUP_EPS = 0.2
+    
+    def __init__(self, blur_amount=99, scale_factor=1.05, min_neighbors=2,
+                 shared_pyramid=False, max_dimension=None, workers=3,
+                 backend='cascade', dnn_model=YUNET_MODEL_PATH, dnn_input_size=640,
+                 dnn_confidence=0.6, duplicate_keep='first',
+                 anonymization='gaussian', anonymization_level=8):
         """
         Initialize face blurrer with Haar Cascade detector
         
         Args:
+            backend: 'cascade' (Haar cascades), 'yunet' (OpenCV DNN; raises
+                if the model cannot be loaded, so privacy blurring never runs
+                on a detector other than the configured one) or any object
+                with a detect(image) -> [(x, y, w, h), ...] method
+            dnn_model, dnn_input_size, dnn_confidence: YuNet settings
+            duplicate_keep: Which of several overlapping cascade hits to keep,
+                'first' or 'largest' (see suppress_duplicates)
+            anonymization: 'gaussian' (per-face Gaussian blur of blur_amount),
+                or 'pixelate', 'box' or 'fill' applied to all faces at once
+                (see anonymize_faces)
+            anonymization_level: Irreversibility level for 'pixelate'/'box'
             blur_amount: Gaussian blur kernel size (must be odd, higher = more blur)
             scale_factor: How much image size is reduced at each scale (1.1-1.4)
             min_neighbors: How many neighbors each candidate rectangle should have
+            shared_pyramid: Build the image pyramid once and scan it with all
+                cascades in parallel threads, instead of one detectMultiScale
+                (and one pyramid) per cascade
+            max_dimension: Downscale frames whose longer side exceeds this many
+                pixels before detection (None = full resolution); faces are
+                mapped back to input coordinates
+            workers: Threads scanning the shared pyramid (one cascade each)
         """
         self.blur_amount = blur_amount if blur_amount % 2 == 1 else blur_amount + 1
         self.scale_factor = scale_factor
         self.min_neighbors = min_neighbors
+        self.shared_pyramid = shared_pyramid
+        self.max_dimension = max_dimension
+        self.workers = workers
+        self.duplicate_keep = duplicate_keep
+        if anonymization not in ANONYMIZATION_MODES:
+            raise ValueError(f"Unknown anonymization mode: {anonymization!r}")
+        self.anonymization = anonymization
+        self.anonymization_level = anonymization_level
+        self._pool = None
+        
+        self.detector = None
+        if backend == 'yunet':
+            self.detector = YuNetFaceDetector(dnn_model, dnn_input_size, dnn_confidence)
+        elif backend != 'cascade':
+            self.detector = backend
+        
+        if self.detector is not None:
+            self.backend = type(self.detector).__name__
+            print(f"✓ Face detector initialized ({self.backend}, blur={self.blur_amount})")
+            return
+        
+        self.backend = 'cascade'
+        self._load_cascades()
         
+        print(f"✓ Face detector initialized (blur={blur_amount}, scale={scale_factor}, neighbors={min_neighbors})")
+    
+    def _load_cascades(self):
+        """Load the Haar cascade detectors"""
         # Load Haar Cascade face detectors (frontal and profile)
         cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
         self.face_cascade = cv2.CascadeClassifier(cascade_path)
@@ -38,53 +295,48 @@ class FaceBlurrer:
         if self.face_cascade.empty():
             raise ValueError(f"Failed to load face cascade from {cascade_path}")
         
-        print(f"✓ Face detector initialized (blur={blur_amount}, scale={scale_factor}, neighbors={min_neighbors})")
+        # A CascadeClassifier must not run in two threads at once
+        self.cascades = [self.face_cascade, self.face_cascade_alt, self.profile_cascade]
+        self._cascade_locks = [threading.Lock() for _ in self.cascades]
     
     def detect_faces(self, image):
         """
-        Detect faces in image using multiple cascades for better detection
+        Detect faces with the configured backend (multiple Haar cascades by default)
         
         Args:
             image: OpenCV image (BGR format)
-            
+        
         Returns:
             List of face rectangles [(x, y, w, h), ...]
         """
+        # Single-pass detector backend
+        if self.detector is not None:
+            return self.detector.detect(image)
+        
         # Convert to grayscale for detection
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         
+        # Cap the working resolution (faces smaller than a cascade window at
+        # the reduced size are missed)
+        scale = 1.0
+        if self.max_dimension and max(gray.shape) > self.max_dimension:
+            scale = self.max_dimension / max(gray.shape)
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        
         # Apply histogram equalization to improve detection in varying lighting
         gray = cv2.equalizeHist(gray)
         
-        all_faces = []
+        if self.shared_pyramid:
+            all_faces = self._detect_pyramid(gray)
+        else:
+            all_faces = self._detect_independent(gray)
         
-        # Detect with primary cascade
-        faces1 = self.face_cascade.detectMultiScale(
-            gray,
-            scaleFactor=self.scale_factor,
-            minNeighbors=self.min_neighbors,
-            minSize=(15, 15),  # Smaller minimum face size for better detection
-            flags=cv2.CASCADE_SCALE_IMAGE
-        )
-        all_faces.extend(faces1)
-        
-        # Detect with alternative cascade
-        faces2 = self.face_cascade_alt.detectMultiScale(
-            gray,
-            scaleFactor=self.scale_factor,
-            minNeighbors=self.min_neighbors,
-            minSize=(15, 15)
-        )
-        all_faces.extend(faces2)
-        
-        # Detect profile faces
-        faces3 = self.profile_cascade.detectMultiScale(
-            gray,
-            scaleFactor=self.scale_factor,
-            minNeighbors=self.min_neighbors,
-            minSize=(15, 15)
-        )
-        all_faces.extend(faces3)
+        # Map back to input image coordinates
+        if scale != 1.0:
+            all_faces = [
+                tuple(int(round(v / scale)) for v in face)
+                for face in all_faces
+            ]
         
         # Remove duplicate detections (faces detected by multiple cascades)
         if len(all_faces) > 0:
@@ -92,55 +344,140 @@ class FaceBlurrer:
         
         return all_faces
     
-    def _remove_duplicates(self, faces, overlap_threshold=0.3):
+    def detect_faces_in_regions(self, image, regions):
         """
-        Remove duplicate face detections based on overlap
+        Detect faces only inside the given regions (e.g. around people)
         
         Args:
-            faces: List of face rectangles
-            overlap_threshold: Minimum overlap ratio to consider duplicates
-            
+            image: OpenCV image (BGR format)
+            regions: [(x1, y1, x2, y2), ...] in image coordinates; regions
+                may overlap, faces found twice are merged
+        
         Returns:
-            List of unique face rectangles
+            List of face rectangles [(x, y, w, h), ...] in image coordinates
         """
-        if len(faces) == 0:
-            return []
+        all_faces = []
+        for x1, y1, x2, y2 in regions:
+            crop = image[y1:y2, x1:x2]
+            if crop.size == 0:
+                continue
+            all_faces.extend(
+                (int(x) + x1, int(y) + y1, int(w), int(h))
+                for x, y, w, h in self.detect_faces(crop)
+            )
+        
+        return self._remove_duplicates(all_faces)
+    
+    def _detect_independent(self, gray):
+        """Run every cascade's own detectMultiScale over the frame"""
+        all_faces = []
+        for cascade, lock in zip(self.cascades, self._cascade_locks):
+            with lock:
+                faces = cascade.detectMultiScale(
+                    gray,
+                    scaleFactor=self.scale_factor,
+                    minNeighbors=self.min_neighbors,
+                    minSize=(15, 15)  # Smaller minimum face size for better detection
+                )
+            all_faces.extend(faces)
+        return all_faces
+    
+    def _detect_pyramid(self, gray):
+        """
+        Scan one shared image pyramid with all cascades in parallel
         
-        faces_list = list(faces)
-        unique_faces = []
+        Each cascade runs at its native window size on every level and the raw
+        hits are grouped the way detectMultiScale groups them, so results
+        match the independent mode while the pyramid is resized only once.
+        """
+        levels = self._build_pyramid(gray)
         
-        while len(faces_list) > 0:
-            face = faces_list.pop(0)
-            unique_faces.append(face)
-            
-            # Remove overlapping faces
-            faces_list = [
-                f for f in faces_list 
-                if self._calculate_overlap(face, f) < overlap_threshold
-            ]
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='face')
         
-        return unique_faces
+        futures = [
+            self._pool.submit(self._scan_pyramid, cascade, lock, levels)
+            for cascade, lock in zip(self.cascades, self._cascade_locks)
+        ]
+        
+        all_faces = []
+        for future in futures:
+            all_faces.extend(future.result())
+        return all_faces
     
-    def _calculate_overlap(self, face1, face2):
-        """Calculate overlap ratio between two face rectangles"""
-        x1, y1, w1, h1 = face1
-        x2, y2, w2, h2 = face2
+    def _build_pyramid(self, gray):
+        """
+        Downscaled copies of the frame, one per scale step
         
-        # Calculate intersection
-        x_left = max(x1, x2)
-        y_top = max(y1, y2)
-        x_right = min(x1 + w1, x2 + w2)
-        y_bottom = min(y1 + h1, y2 + h2)
+        Returns:
+            List of (factor, level image); level pixels times factor give
+            frame pixels
+        """
+        height, width = gray.shape[:2]
+        min_window = min(min(c.getOriginalWindowSize()) for c in self.cascades)
+        
+        levels = []
+        factor = 1.0
+        while True:
+            size = (int(round(width / factor)), int(round(height / factor)))
+            if min(size) < min_window:
+                break
+            # Same interpolation detectMultiScale uses for its own pyramid
+            level = gray if factor == 1.0 else cv2.resize(gray, size, interpolation=cv2.INTER_LINEAR_EXACT)
+            levels.append((factor, level))
+            factor *= self.scale_factor
+        
+        return levels
+    
+    def _scan_pyramid(self, cascade, lock, levels):
+        """Detect faces with one cascade on every pyramid level"""
+        window = cascade.getOriginalWindowSize()
+        candidates = []
+        
+        with lock:
+            for factor, level in levels:
+                if level.shape[1] < window[0] or level.shape[0] < window[1]:
+                    break
+                
+                # detectMultiScale slides its window 2px per step, or 1px
+                # beyond 2x downscaling; 1px steps are emulated with shifted views
+                shifts = [(0, 0), (1, 0), (0, 1), (1, 1)] if factor > 2 else [(0, 0)]
+                for dx, dy in shifts:
+                    # Only the cascade's native window size: one scale per call
+                    rects = cascade.detectMultiScale(
+                        level[dy:, dx:],
+                        scaleFactor=self.scale_factor,
+                        minNeighbors=0,
+                        minSize=window,
+                        maxSize=window
+                    )
+                    candidates.extend(
+                        [int(round((x + dx) * factor)), int(round((y + dy) * factor)),
+                         int(round(w * factor)), int(round(h * factor))]
+                        for x, y, w, h in rects
+                    )
+        
+        if not candidates:
+            return []
         
-        if x_right < x_left or y_bottom < y_top:
-            return 0.0
+        # Candidate clusters with min_neighbors or fewer members are rejected
+        faces, _ = cv2.groupRectangles(candidates, self.min_neighbors, self.GROUP_EPS)
+        return [tuple(face) for face in faces]
+    
+    def _remove_duplicates(self, faces, overlap_threshold=0.3, keep=None):
+        """
+        Remove duplicate face detections based on overlap
         
-        intersection_area = (x_right - x_left) * (y_bottom - y_top)
-        face1_area = w1 * h1
-        face2_area = w2 * h2
+        Args:
+            faces: List of face rectangles
+            overlap_threshold: Minimum overlap ratio to consider duplicates
+            keep: 'first' or 'largest' (see suppress_duplicates); defaults to
+                the blurrer's duplicate_keep setting
         
-        # Return overlap ratio relative to smaller face
-        return intersection_area / min(face1_area, face2_area)
+        Returns:
+            List of unique face rectangles
+        """
+        return suppress_duplicates(faces, overlap_threshold, keep or self.duplicate_keep)
     
     def blur_face_region(self, image, x, y, w, h, padding=0.2):
         """
@@ -150,19 +487,12 @@ class FaceBlurrer:
             image: OpenCV image
             x, y, w, h: Face rectangle coordinates
             padding: Extra padding around face (0.2 = 20% larger)
-            
+        
         Returns:
             Image with blurred face region
         """
-        # Add padding to cover more area
-        pad_w = int(w * padding)
-        pad_h = int(h * padding)
-        
-        # Calculate padded coordinates (ensure within image bounds)
-        x1 = max(0, x - pad_w)
-        y1 = max(0, y - pad_h)
-        x2 = min(image.shape[1], x + w + pad_w)
-        y2 = min(image.shape[0], y + h + pad_h)
+        # Add padding to cover more area (within image bounds)
+        x1, y1, x2, y2 = padded_face_rect(image.shape, x, y, w, h, padding)
         
         # Extract face region
         face_region = image[y1:y2, x1:x2]
@@ -182,6 +512,23 @@ class FaceBlurrer:
         
         return image
     
+    def anonymize(self, image, faces):
+        """
+        Anonymize the given faces with the configured strategy (in place)
+        
+        Args:
+            image: OpenCV image (BGR format)
+            faces: face rectangles [(x, y, w, h), ...] in image coordinates
+        
+        Returns:
+            image
+        """
+        if self.anonymization == 'gaussian':
+            for (x, y, w, h) in faces:
+                image = self.blur_face_region(image, x, y, w, h)
+            return image
+        return anonymize_faces(image, faces, self.anonymization, self.anonymization_level)
+    
     def blur_faces(self, image, draw_boxes=False):
         """
         Detect and blur all faces in image
@@ -189,7 +536,7 @@ class FaceBlurrer:
         Args:
             image: OpenCV image (BGR format)
             draw_boxes: If True, draw rectangles around detected faces
-            
+        
         Returns:
             Tuple of (blurred_image, face_count, face_locations)
         """
@@ -202,12 +549,12 @@ class FaceBlurrer:
         
         print(f"Detected {face_count} face(s)")
         
-        # Blur each detected face
-        for (x, y, w, h) in faces:
-            result = self.blur_face_region(result, x, y, w, h)
-            
-            # Optionally draw rectangle (for debugging)
-            if draw_boxes:
+        # Anonymize the detected faces
+        result = self.anonymize(result, faces)
+        
+        # Optionally draw rectangles (for debugging)
+        if draw_boxes:
+            for (x, y, w, h) in faces:
                 cv2.rectangle(result, (x, y), (x+w, y+h), (0, 255, 0), 2)
         
         # Convert face locations to list of dicts for JSON serialization
@@ -226,7 +573,7 @@ class FaceBlurrer:
             input_path: Path to input image
             output_path: Path to save blurred image (optional)
             draw_boxes: Draw rectangles around faces
-            
+        
         Returns:
             Tuple of (success, face_count, output_path, face_locations)
         """
@@ -256,7 +603,7 @@ class FaceBlurrer:
                 print(f"✗ Failed to save: {output_path}")
             
             return success, face_count, output_path, face_locations
-            
+        
         except Exception as e:
             print(f"Error processing image: {e}")
             return False, 0, None, []
@@ -271,7 +618,7 @@ def blur_faces_in_image(image_path, output_path=None, blur_amount=99):
         image_path: Path to input image
         output_path: Path to save blurred image (optional)
         blur_amount: Blur intensity (higher = more blur)
-        
+    
     Returns:
         Tuple of (success, face_count, output_path)
     """
@@ -0,0 +1,129 @@
+"""
+Vectorized bounding-box geometry
+Boxes are NumPy arrays of [x1, y1, x2, y2] rows
+"""
+
+import numpy as np
+
+def box_areas(boxes):
+    """Area of every box, array (N,)"""
+    boxes = np.asarray(boxes, dtype=np.float32)
+    return (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+
+def pairwise_iou(boxes1, boxes2):
+    """
+    Intersection over union of every pair of boxes
+    
+    Returns:
+        float32 array (N, M), entry [i, j] is IoU(boxes1[i], boxes2[j])
+    """
+    boxes1 = np.asarray(boxes1, dtype=np.float32).reshape(-1, 4)
+    boxes2 = np.asarray(boxes2, dtype=np.float32).reshape(-1, 4)
+    
+    top_left = np.maximum(boxes1[:, None, :2], boxes2[None, :, :2])
+    bottom_right = np.minimum(boxes1[:, None, 2:], boxes2[None, :, 2:])
+    wh = np.clip(bottom_right - top_left, 0, None)
+    intersection = wh[..., 0] * wh[..., 1]
+    
+    union = box_areas(boxes1)[:, None] + box_areas(boxes2)[None, :] - intersection
+    return intersection / np.maximum(union, 1e-7)
+
+def points_in_boxes(points, boxes, margin=0):
+    """
+    Which points lie inside which boxes, each box grown by margin on every side
+    
+    Args:
+        points: array (N, 2) of [x, y]
+        boxes: array (M, 4)
+        margin: pixels added around each box (edges count as inside)
+    
+    Returns:
+        bool array (N, M), entry [i, j] is True if points[i] is in boxes[j]
+    """
+    points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    
+    px = points[:, 0, None]
+    py = points[:, 1, None]
+    return (
+        (boxes[None, :, 0] - margin <= px) & (px <= boxes[None, :, 2] + margin) &
+        (boxes[None, :, 1] - margin <= py) & (py <= boxes[None, :, 3] + margin)
+    )
+
+def point_box_distances(points, boxes):
+    """
+    Euclidean distance from every point to every box (0 inside the box)
+    
+    Returns:
+        float32 array (N, M)
+    """
+    points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    
+    dx = np.maximum(boxes[None, :, 0] - points[:, 0, None], 0) + np.maximum(points[:, 0, None] - boxes[None, :, 2], 0)
+    dy = np.maximum(boxes[None, :, 1] - points[:, 1, None], 0) + np.maximum(points[:, 1, None] - boxes[None, :, 3], 0)
+    return np.hypot(dx, dy)
+
+def nearest_box(points, boxes):
+    """
+    Closest box to each point
+    
+    Returns:
+        (int64 array (N,) of box indices, float32 array (N,) of distances);
+        indices are -1 and distances inf when there are no boxes
+    """
+    distances = point_box_distances(points, boxes)
+    if distances.shape[1] == 0:
+        return (
+            np.full(len(distances), -1, dtype=np.int64),
+            np.full(len(distances), np.inf, dtype=np.float32)
+        )
+    
+    index = distances.argmin(axis=1)
+    return index, distances[np.arange(len(distances)), index]
+
+def nms(boxes, scores, iou_threshold):
+    """
+    Greedy non-maximum suppression
+    
+    Args:
+        boxes: array (N, 4)
+        scores: array (N,)
+        iou_threshold: boxes overlapping a kept box by more than this are dropped
+    
+    Returns:
+        int64 array of kept indices, highest score first
+    """
+    boxes = np.asarray(boxes, dtype=np.float32)
+    scores = np.asarray(scores)
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+    
+    order = np.argsort(-scores, kind='stable')
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        
+        xx1 = np.maximum(x1[i], x1[order[1:]])
+        yy1 = np.maximum(y1[i], y1[order[1:]])
+        xx2 = np.minimum(x2[i], x2[order[1:]])
+        yy2 = np.minimum(y2[i], y2[order[1:]])
+        
+        inter = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+        iou = inter / (areas[i] + areas[order[1:]] - inter + 1e-7)
+        
+        order = order[1:][iou <= iou_threshold]
+    
+    return np.array(keep, dtype=np.int64)
+
+def batched_nms(boxes, scores, class_ids, iou_threshold):
+    """Per-class NMS in a single pass (boxes of different classes never suppress each other)"""
+    boxes = np.asarray(boxes, dtype=np.float32)
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.int64)
+    
+    # Shift every class into its own coordinate range
+    offset = float(boxes.max() - boxes.min()) + 1
+    offset_boxes = boxes + np.asarray(class_ids)[:, None] * offset
+    return nms(offset_boxes, scores, iou_threshold)
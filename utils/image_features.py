@@ -0,0 +1,146 @@
+"""
+Per-frame image features shared by all scorers
+Color conversions, edge maps and statistics are computed on first use and
+memoized, so each is done at most once per frame however many scorers ask
+"""
+
+import threading
+import cv2
+import numpy as np
+from utils.image_processor import ImageProcessor
+
+def mean_std(array):
+    """Per-channel (mean, std) of an image as float64 arrays, via cv2.meanStdDev"""
+    array = np.ascontiguousarray(array)
+    mean, std = cv2.meanStdDev(array)
+    return mean.ravel(), std.ravel()
+
+def pooled_variance(mean, std):
+    """Variance over all channels together from per-channel mean/std (equals np.var(image))"""
+    return float(np.mean(std ** 2 + mean ** 2) - np.mean(mean) ** 2)
+
+def contour_areas(binary):
+    """
+    cv2.contourArea of every outer contour in a binary mask
+    
+    Same contours (cv2.findContours, RETR_EXTERNAL) and the same areas as
+    calling cv2.contourArea on each, but the shoelace sums of all contours
+    are computed in one vectorized pass instead of a Python-level call per
+    contour, so counting blobs in an area range is a single NumPy expression.
+    
+    Returns:
+        float64 array (number of contours,)
+    """
+    contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return np.zeros(0)
+    
+    lengths = np.fromiter(map(len, contours), dtype=np.int64, count=len(contours))
+    starts = np.cumsum(lengths) - lengths
+    points = np.concatenate(contours).reshape(-1, 2).astype(np.int64)
+    
+    # Index of the next vertex, wrapping around within each contour
+    following = np.arange(1, len(points) + 1)
+    following[starts + lengths - 1] = starts
+    
+    x, y = points[:, 0], points[:, 1]
+    cross = x * y[following] - x[following] * y
+    return np.abs(np.add.reduceat(cross, starts)) / 2.0
+
+class ImageFeatures:
+    """Lazily computed views of one frame (BGR) and its named regions"""
+    
+    # Color spaces computed once on the full frame; regions are row slices of them
+    COLOR_CONVERSIONS = {
+        'gray': cv2.COLOR_BGR2GRAY,
+        'hsv': cv2.COLOR_BGR2HSV,
+        'lab': cv2.COLOR_BGR2LAB,
+    }
+    
+    def __init__(self, image, region_bounds=None):
+        """
+        Args:
+            image: frame (BGR) the features describe
+            region_bounds: optional {region: (y_start, y_end)}; defaults to
+                ImageProcessor.REGION_BANDS applied to the frame height
+        """
+        self.image = image
+        
+        if region_bounds is None:
+            processor = ImageProcessor()
+            region_bounds = {
+                name: processor.region_bounds(image.shape[0], name)
+                for name in processor.REGION_BANDS
+            }
+        self.region_bounds = dict(region_bounds)
+        self.region_bounds.setdefault('full', (0, image.shape[0]))
+        
+        self._cache = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+    
+    def _memoize(self, key, compute):
+        if key in self._cache:
+            return self._cache[key]
+        
+        # Scorers run on several threads; a per-key lock makes the others wait
+        # for the first computation instead of repeating it
+        with self._locks_guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            if key not in self._cache:
+                self._cache[key] = compute()
+        return self._cache[key]
+    
+    def _rows(self, array, region):
+        y_start, y_end = self.region_bounds[region]
+        return array[y_start:y_end]
+    
+    def region(self, name='full'):
+        """BGR pixels of a region (a view, no copy)"""
+        return self._rows(self.image, name)
+    
+    def color(self, space, region='full'):
+        """Region in 'bgr', 'gray', 'hsv' or 'lab'"""
+        if space == 'bgr':
+            return self.region(region)
+        
+        # Conversions are per pixel, so slicing the full-frame result is exact
+        full = self._memoize(space, lambda: cv2.cvtColor(self.image, self.COLOR_CONVERSIONS[space]))
+        return self._rows(full, region)
+    
+    def gray(self, region='full'):
+        return self.color('gray', region)
+    
+    def hsv(self, region='full'):
+        return self.color('hsv', region)
+    
+    def lab(self, region='full'):
+        return self.color('lab', region)
+    
+    def edges(self, region='full', low=50, high=150):
+        """Canny edge map of a region (computed per region, as borders affect the result)"""
+        return self._memoize(
+            ('edges', region, low, high),
+            lambda: cv2.Canny(self.gray(region), low, high)
+        )
+    
+    def mean_std(self, region='full', space='bgr'):
+        """Per-channel (mean, std) of a region in a color space"""
+        return self._memoize(
+            ('mean_std', region, space),
+            lambda: mean_std(self.color(space, region))
+        )
+
+def as_features(image, region=None):
+    """
+    Accept ImageFeatures or a plain image array
+    
+    A plain array is treated as the named region itself, so legacy callers
+    passing e.g. the floor crop keep working.
+    """
+    if isinstance(image, ImageFeatures):
+        return image
+    
+    bounds = {region: (0, image.shape[0])} if region else None
+    return ImageFeatures(image, bounds)
@@ -1,18 +1,75 @@
+import mmap
+import os
+import threading
 import cv2
 import numpy as np
-from PIL import Image
+
+# JPEG start-of-frame markers (they carry the image size); C4, C8 and CC are not SOF
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Reduced decode flags, largest reduction first
+REDUCED_DECODE_FLAGS = [
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+]
+
+def jpeg_size(data):
+    """
+    (width, height) from a JPEG header without decoding, or None
+    
+    Args:
+        data: encoded bytes (bytes, memoryview or uint8 array)
+    """
+    data = memoryview(data).cast('B')
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+    
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            pos += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            # Markers without a length field
+            pos += 2
+            continue
+        
+        length = (data[pos + 2] << 8) | data[pos + 3]
+        if marker in JPEG_SOF_MARKERS and pos + 9 <= len(data):
+            height = (data[pos + 5] << 8) | data[pos + 6]
+            width = (data[pos + 7] << 8) | data[pos + 8]
+            return width, height
+        pos += 2 + length
+    
+    return None
 
 class ImageProcessor:
     """Handles image loading and preprocessing"""
     
     def __init__(self, target_size=(640, 640)):
         self.target_size = target_size
+        
+        # Resize output buffers, one per thread (see preprocess)
+        self._buffers = threading.local()
     
-    def load_image(self, image_path):
-        """Load image from file path"""
+    def load_image(self, image_path, target_size=None):
+        """
+        Load image from file path
+        
+        Args:
+            image_path: image file
+            target_size: optional (width, height) the image will be resized
+                to. Large JPEGs are then decoded at 1/2, 1/4 or 1/8 scale
+                (never below target_size), which is much cheaper than a
+                full decode. None decodes at native resolution.
+        """
         try:
             # Normalize path for Windows compatibility
-            import os
             normalized_path = os.path.normpath(image_path)
             
             # Check if file exists
@@ -20,10 +77,7 @@ class ImageProcessor:
                 raise ValueError(f"Image file not found: {normalized_path}")
             
             # Use cv2.imdecode with numpy for better path handling
-            import numpy as np
-            with open(normalized_path, 'rb') as f:
-                file_bytes = np.asarray(bytearray(f.read()), dtype=np.uint8)
-                image = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
+            image = self._decode_file(normalized_path, target_size)
             
             if image is None:
                 raise ValueError(f"Could not decode image from {normalized_path}")
@@ -34,26 +88,90 @@ class ImageProcessor:
             traceback.print_exc()
             return None
     
-    def preprocess(self, image):
-        """Preprocess image for analysis"""
-        # Resize image
-        resized = cv2.resize(image, self.target_size)
+    def _decode_file(self, path, target_size=None):
+        """Decode straight from a memory-mapped file (no copy of the encoded bytes)"""
+        with open(path, 'rb') as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                return None
+            
+            with mapped:
+                file_bytes = np.frombuffer(mapped, dtype=np.uint8)
+                image = cv2.imdecode(file_bytes, self._decode_flags(file_bytes, target_size))
+                # Release the buffer export so the map can close
+                del file_bytes
         
-        # Normalize
-        normalized = resized / 255.0
+        return image
+    
+    def _decode_flags(self, file_bytes, target_size):
+        """Cheapest imdecode flags that still give at least target_size pixels"""
+        if target_size is None:
+            return cv2.IMREAD_COLOR
+        
+        # Only JPEG decoders scale during decoding; other formats decode fully
+        size = jpeg_size(file_bytes)
+        if size is None:
+            return cv2.IMREAD_COLOR
+        
+        # EXIF orientation may swap width and height, so compare the short side
+        # against the larger target dimension
+        short_side = min(size)
+        needed = max(target_size)
+        for factor, flags in REDUCED_DECODE_FLAGS:
+            if short_side // factor >= needed:
+                return flags
+        
+        return cv2.IMREAD_COLOR
+    
+    def preprocess(self, image, reuse_buffer=False):
+        """
+        Resize image to the analysis size
         
-        return resized, normalized
+        Args:
+            image: BGR image
+            reuse_buffer: resize into this thread's buffer instead of a new
+                array. The result is overwritten by the next reuse_buffer call
+                on the same thread, so only use it for one frame at a time.
+        
+        Returns:
+            resized image (uint8; no normalized copy is made)
+        """
+        if not reuse_buffer:
+            return cv2.resize(image, self.target_size)
+        
+        width, height = self.target_size
+        shape = (height, width) + image.shape[2:]
+        buffer = getattr(self._buffers, 'resize', None)
+        if buffer is None or buffer.shape != shape or buffer.dtype != image.dtype:
+            buffer = np.empty(shape, dtype=image.dtype)
+            self._buffers.resize = buffer
+        
+        cv2.resize(image, self.target_size, dst=buffer)
+        return buffer
+    
+    # Vertical extent of each classroom region as fractions of frame height
+    REGION_BANDS = {
+        'floor': (0.6, 1.0),  # Bottom 40%
+        'furniture': (0.3, 0.8),  # Middle section
+        'wall': (0.0, 0.4),  # Top 40%
+    }
+    
+    def region_bounds(self, height, region):
+        """Pixel rows (y_start, y_end) of a named region in a frame of this height"""
+        top, bottom = self.REGION_BANDS[region]
+        return int(height*top), int(height*bottom)
     
     def extract_regions(self, image):
         """Extract different regions of the classroom"""
         height, width = image.shape[:2]
         
         regions = {
-            'floor': image[int(height*0.6):height, :],  # Bottom 40%
-            'furniture': image[int(height*0.3):int(height*0.8), :],  # Middle section
-            'wall': image[0:int(height*0.4), :],  # Top 40%
-            'full': image
+            name: image[slice(*self.region_bounds(height, name)), :]
+            for name in self.REGION_BANDS
         }
+        regions['full'] = image
         
         return regions
     
@@ -65,11 +183,10 @@ class ImageProcessor:
     
     def calculate_cleanliness_metric(self, region):
         """Calculate basic cleanliness metric based on color variance"""
-        # Convert to HSV
-        hsv = cv2.cvtColor(region, cv2.COLOR_BGR2HSV)
+        from utils.image_features import as_features, pooled_variance
         
-        # Calculate standard deviation (lower = more uniform = cleaner)
-        std_dev = np.std(hsv)
+        # Standard deviation over all HSV channels (lower = more uniform = cleaner)
+        std_dev = np.sqrt(pooled_variance(*as_features(region).mean_std('full', 'hsv')))
         
         # Normalize to 0-1 scale (inverse relationship)
         cleanliness = max(0, 1 - (std_dev / 100))
@@ -1,13 +1,23 @@
 import json
 import os
+import uuid
 from datetime import datetime
-import pandas as pd
 
 class Leaderboard:
     """Manages classroom scores and rankings"""
     
-    def __init__(self, data_file='data/scores.json'):
+    def __init__(self, data_file='data/scores.json', frames_dir=None, max_frames=None):
+        """
+        Args:
+            data_file: JSON list of score entries
+            frames_dir: directory for the per-entry re-scoring inputs
+                (default: 'frames' next to data_file)
+            max_frames: keep the re-scoring inputs of only this many newest
+                entries (None = all); older score rows stay in data_file
+        """
         self.data_file = data_file
+        self.frames_dir = frames_dir or os.path.join(os.path.dirname(data_file), 'frames')
+        self.max_frames = max_frames
         self.ensure_data_file()
     
     def ensure_data_file(self):
@@ -17,15 +27,29 @@ class Leaderboard:
             with open(self.data_file, 'w') as f:
                 json.dump([], f)
     
-    def add_score(self, classroom_id, scores, total_score, rating):
-        """Add a new score entry"""
+    def add_score(self, classroom_id, scores, total_score, rating, detections=None, statistics=None):
+        """
+        Add a new score entry
+        
+        Args:
+            detections: optional list of detection dicts of the frame
+            statistics: optional scoring.batch.frame_statistics of the frame;
+                stored together with detections in frames_dir/<entry id>.json
+                so the entry can be re-scored later (rescore_history.py)
+                while data_file only holds the score rows
+        """
         entry = {
+            'id': uuid.uuid4().hex,
             'classroom_id': classroom_id,
             'timestamp': datetime.now().isoformat(),
             'scores': scores,
             'total_score': total_score,
             'rating': rating
         }
+        if detections is not None and statistics is not None:
+            os.makedirs(self.frames_dir, exist_ok=True)
+            with open(self._frame_file(entry['id']), 'w') as f:
+                json.dump({'detections': detections, 'statistics': statistics}, f)
         
         # Load existing data
         with open(self.data_file, 'r') as f:
@@ -38,8 +62,49 @@ class Leaderboard:
         with open(self.data_file, 'w') as f:
             json.dump(data, f, indent=2)
         
+        self._prune_frames(data)
+        
         return entry
     
+    def get_frame(self, entry):
+        """
+        Re-scoring inputs of an entry
+        
+        Returns:
+            {'detections': [...], 'statistics': {...}}, or None if the entry
+            was saved without them
+        """
+        # Older entries kept them inline
+        if 'detections' in entry and 'statistics' in entry:
+            return {'detections': entry['detections'], 'statistics': entry['statistics']}
+        
+        path = self._frame_file(entry['id']) if 'id' in entry else None
+        if path is None or not os.path.exists(path):
+            return None
+        
+        with open(path, 'r') as f:
+            return json.load(f)
+    
+    def _frame_file(self, entry_id):
+        return os.path.join(self.frames_dir, f"{entry_id}.json")
+    
+    def _prune_frames(self, data):
+        """Delete the re-scoring inputs of all but the newest max_frames entries"""
+        if not self.max_frames or not os.path.isdir(self.frames_dir):
+            return
+        
+        stored = {name[:-len('.json')] for name in os.listdir(self.frames_dir) if name.endswith('.json')}
+        if len(stored) <= self.max_frames:
+            return
+        
+        # data_file is in insertion order, oldest first
+        with_frames = [entry['id'] for entry in data if entry.get('id') in stored]
+        for entry_id in with_frames[:-self.max_frames]:
+            try:
+                os.remove(self._frame_file(entry_id))
+            except OSError:
+                continue
+    
     def get_latest_scores(self):
         """Get the most recent score for each classroom"""
         with open(self.data_file, 'r') as f:
@@ -48,6 +113,9 @@ class Leaderboard:
         if not data:
             return []
         
+        # pandas is slow to import, so load it only for this query
+        import pandas as pd
+        
         # Convert to DataFrame for easier processing
         df = pd.DataFrame(data)
         
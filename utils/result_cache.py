@@ -0,0 +1,174 @@
+"""
+Two-tier cache for analysis results
+Results are keyed by a hash of the image bytes plus a fingerprint of the
+models and configuration, so re-analyzing an unchanged image skips inference
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def config_fingerprint(config_module, *extra):
+    """
+    Short hash of every public setting in a config module
+    
+    Args:
+        config_module: module whose UPPER_CASE attributes affect results
+        extra: additional values that change results (model names, flags)
+    """
+    settings = sorted(
+        (name, repr(getattr(config_module, name)))
+        for name in dir(config_module)
+        if name.isupper()
+    )
+    payload = repr((settings, extra)).encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+class ResultCache:
+    """In-memory LRU in front of a size-bounded directory of JSON results"""
+    
+    def __init__(self, max_entries=128, cache_dir=None, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+        
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+    
+    @staticmethod
+    def make_key(image_path, fingerprint):
+        """Cache key for an image file under a model/config fingerprint"""
+        return f"{file_digest(image_path)}-{fingerprint}"
+    
+    def get(self, key):
+        """Stored result for key, or None"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return self._memory[key]
+        
+        result = self._read_disk(key)
+        
+        with self._lock:
+            if result is None:
+                self.stats['misses'] += 1
+                return None
+            
+            self.stats['disk_hits'] += 1
+            self._remember(key, result)
+        
+        return result
+    
+    def put(self, key, result):
+        """Store a JSON-serializable result in both tiers"""
+        with self._lock:
+            self._remember(key, result)
+        
+        if self.cache_dir:
+            self._write_disk(key, result)
+    
+    def discard(self, key):
+        """Drop an entry whose outputs are no longer valid"""
+        with self._lock:
+            self._memory.pop(key, None)
+        
+        if self.cache_dir:
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                pass
+    
+    def info(self):
+        """Counters and sizes for health reporting"""
+        with self._lock:
+            info = dict(self.stats)
+            info['memory_entries'] = len(self._memory)
+        
+        lookups = info['memory_hits'] + info['disk_hits'] + info['misses']
+        info['hit_rate'] = round((info['memory_hits'] + info['disk_hits']) / lookups, 3) if lookups else 0.0
+        return info
+    
+    def _remember(self, key, result):
+        """Insert into the memory tier (caller holds the lock)"""
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+    
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        # Touch the file so eviction treats it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        
+        return result
+    
+    def _write_disk(self, key, result):
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(result, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Warning: Could not write result cache entry: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        
+        self._evict_disk()
+    
+    def _evict_disk(self):
+        """Delete least recently used files until the directory fits max_bytes"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.json'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self.stats['evictions'] += 1
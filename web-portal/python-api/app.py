@@ -8,6 +8,9 @@ from flask_cors import CORS
 import sys
 import os
 import cv2
+import threading
+import time
+import numpy as np
 from datetime import datetime
 
 # Add parent directory (CLEANLENESS) to path to import main
@@ -16,6 +19,8 @@ sys.path.insert(0, parent_dir)
 
 try:
     from main import ClassroomCleanliness
+    from utils.result_cache import ResultCache, config_fingerprint
+    import config
     MAIN_IMPORTED = True
 except ImportError as e:
     print(f"Warning: Could not import main.py: {e}")
@@ -39,33 +44,149 @@ except ImportError as e:
 app = Flask(__name__)
 CORS(app)  # Enable CORS for Next.js
 
-# Initialize AI system
+# Models load and warm up in background threads so the server can start
+# accepting requests immediately; /api/ready reports their progress.
 ai_system = None
-if MAIN_IMPORTED and ClassroomCleanliness:
+face_blurrer = None
+
+# Repeat requests for an unchanged image are answered from this cache
+result_cache = ResultCache(
+    max_entries=config.RESULT_CACHE_ENTRIES,
+    cache_dir=config.RESULT_CACHE_DIR,
+    max_bytes=config.RESULT_CACHE_MAX_BYTES
+) if MAIN_IMPORTED else None
+
+_component_lock = threading.Lock()
+
+model_status = {
+    'ai_system': {'state': 'pending', 'load_seconds': None, 'warmup_ms': None, 'error': None},
+    'face_blurrer': {'state': 'pending', 'load_seconds': None, 'warmup_ms': None, 'error': None}
+}
+
+def _load_component(name, build, warm_up):
+    """Build a model component, run one dummy inference and record its status"""
+    global ai_system, face_blurrer
+    status = model_status[name]
+    
     try:
-        print("Initializing AI system...")
-        ai_system = ClassroomCleanliness(use_owlvit=True)
-        print("✓ AI system ready!")
+        status['state'] = 'loading'
+        start = time.perf_counter()
+        component = build()
+        status['load_seconds'] = round(time.perf_counter() - start, 2)
+        
+        # The first inference pays for lazy allocations; do it before real requests
+        status['state'] = 'warming_up'
+        start = time.perf_counter()
+        warm_up(component)
+        status['warmup_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        
+        # The analysis anonymizes faces itself; attach the blurrer before
+        # either component is published so no request sees one without it
+        with _component_lock:
+            if name == 'ai_system':
+                component.face_blurrer = face_blurrer
+                ai_system = component
+            else:
+                face_blurrer = component
+                if ai_system is not None:
+                    ai_system.face_blurrer = component
+            status['state'] = 'ready'
+        print(f"✓ {name} ready (load {status['load_seconds']}s, warm-up {status['warmup_ms']}ms)")
     except Exception as e:
-        print(f"Warning: Could not initialize AI system: {e}")
-        print("The API will run but analysis will not work.")
+        status['state'] = 'failed'
+        status['error'] = str(e)
+        print(f"Warning: Could not initialize {name}: {e}")
+
+def _create_face_blurrer():
+    """Face blurrer with the config.py detection settings (defaults without config)"""
+    if not MAIN_IMPORTED:
+        return FaceBlurrer(blur_amount=99)
+    return FaceBlurrer(
+        blur_amount=99,
+        shared_pyramid=config.FACE_SHARED_PYRAMID,
+        max_dimension=config.FACE_MAX_DIMENSION,
+        workers=config.FACE_DETECTION_WORKERS,
+        backend=config.FACE_DETECTOR_BACKEND,
+        dnn_model=config.FACE_DNN_MODEL,
+        dnn_input_size=config.FACE_DNN_INPUT_SIZE,
+        dnn_confidence=config.FACE_DNN_CONFIDENCE,
+        duplicate_keep=config.FACE_DUPLICATE_KEEP,
+        anonymization=config.FACE_ANONYMIZATION,
+        anonymization_level=config.FACE_ANONYMIZATION_LEVEL
+    )
+
+def _warm_up_face_blurrer(blurrer):
+    blurrer.detect_faces(np.zeros((640, 640, 3), dtype=np.uint8))
+
+if MAIN_IMPORTED and ClassroomCleanliness:
+    print("Initializing AI system in background...")
+    threading.Thread(
+        target=_load_component,
+        args=('ai_system', lambda: ClassroomCleanliness(use_owlvit=True), lambda system: system.warm_up()),
+        daemon=True
+    ).start()
 else:
+    model_status['ai_system']['state'] = 'unavailable'
     print("⚠️  AI system not initialized - main.py not found")
     print("The API will run in demo mode.")
 
-# Initialize face blurrer
-face_blurrer = None
 if FACE_BLUR_AVAILABLE and FaceBlurrer:
-    try:
-        print("Initializing face blurrer...")
-        face_blurrer = FaceBlurrer(blur_amount=99)
-        print("✓ Face blurrer ready!")
-    except Exception as e:
-        print(f"Warning: Could not initialize face blurrer: {e}")
-        print("Face blurring will be disabled.")
+    print("Initializing face blurrer in background...")
+    threading.Thread(
+        target=_load_component,
+        args=('face_blurrer', _create_face_blurrer, _warm_up_face_blurrer),
+        daemon=True
+    ).start()
 else:
+    model_status['face_blurrer']['state'] = 'unavailable'
     print("⚠️  Face blurrer not initialized")
 
+def _analysis_fingerprint():
+    """Fingerprint of everything besides the image that changes analysis output"""
+    return config_fingerprint(
+        config,
+        type(ai_system.detector).__name__,
+        ai_system.use_owlvit,
+        face_blurrer is not None
+    )
+
+def _cached_outputs_exist(cached):
+    """True if the image files a cached result points to are still on disk"""
+    uploads_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'public', 'uploads')
+    return all(
+        os.path.exists(os.path.join(uploads_dir, cached[key]))
+        for key in ('annotated_image_path', 'blurred_image_path')
+        if cached.get(key)
+    )
+
+def _analysis_ready():
+    """
+    True once the AI system is loaded and face blurring is settled
+    
+    Analysis waits for the face blurrer too, so frames are never published
+    unblurred while it is still loading.
+    """
+    return (ai_system is not None and
+            model_status['face_blurrer']['state'] in ('ready', 'unavailable'))
+
+def _ai_system_unavailable_response():
+    """503 response explaining why the AI system cannot serve requests yet"""
+    state = model_status['ai_system']['state']
+    blur_state = model_status['face_blurrer']['state']
+    if state in ('pending', 'loading', 'warming_up'):
+        error = 'AI system is still loading. Check /api/ready and retry shortly.'
+    elif ai_system is None:
+        error = 'AI system not initialized. Please ensure main.py is accessible.'
+    elif blur_state == 'failed':
+        error = 'Face blurrer failed to initialize; analysis is disabled to protect privacy.'
+    else:
+        error = 'Face blurrer is still loading. Check /api/ready and retry shortly.'
+    
+    return jsonify({
+        'success': False,
+        'error': error
+    }), 503
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -73,9 +194,21 @@ def health_check():
         'status': 'healthy' if ai_system else 'limited',
         'message': 'Python AI API is running',
         'ai_system_ready': ai_system is not None,
-        'owlvit_enabled': ai_system.use_owlvit if ai_system else False
+        'owlvit_enabled': ai_system.use_owlvit if ai_system else False,
+        'result_cache': result_cache.info() if result_cache else None
     })
 
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """Readiness endpoint: per-component load state and warm-up latency"""
+    # Face blurring is optional, but must be settled before analysis
+    ready = _analysis_ready()
+    
+    return jsonify({
+        'ready': ready,
+        'components': model_status
+    }), 200 if ready else 503
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze_image():
     """
@@ -90,11 +223,8 @@ def analyze_image():
     """
     try:
         # Check if AI system is available
-        if not ai_system:
-            return jsonify({
-                'success': False,
-                'error': 'AI system not initialized. Please ensure main.py is accessible.'
-            }), 503
+        if not _analysis_ready():
+            return _ai_system_unavailable_response()
         
         data = request.json
         image_path = data.get('image_path')
@@ -114,15 +244,40 @@ def analyze_image():
                 'error': f'Image file not found: {image_path}'
             }), 404
         
-        # Step 1: Blur faces for privacy (if available)
+        # Same image bytes under the same models/config give the same result
+        cache_key = ResultCache.make_key(image_path, _analysis_fingerprint())
+        cached = result_cache.get(cache_key)
+        if cached is not None and not _cached_outputs_exist(cached):
+            result_cache.discard(cache_key)
+            cached = None
+        
+        if cached is not None:
+            print(f"✓ Cache hit for {classroom_id}: {cached['total_score']}/50 ({cached['rating']})")
+            ai_system.leaderboard.add_score(
+                classroom_id, cached['scores'], cached['total_score'], cached['rating'],
+                detections=cached['detections'],
+                statistics=cached.get('statistics')
+            )
+            return jsonify({'success': True, **cached, 'classroom_id': classroom_id, 'cached': True})
+        
+        # Step 1: Analyze classroom on the original image; with a face blurrer
+        # attached the analysis also anonymizes faces found around people
+        print(f"Analyzing {classroom_id}: {image_path}")
+        result = ai_system.analyze_classroom(image_path, classroom_id)
+        
+        if result is None:
+            return jsonify({
+                'success': False,
+                'error': 'Analysis failed'
+            }), 500
+        
+        # Step 2: Save the face-blurred image for privacy (if available)
         blurred_image_path = None
-        face_count = 0
-        face_locations = []
+        face_count = len(result['face_locations'])
+        face_locations = result['face_locations']
         
-        if face_blurrer:
+        if result['blurred_image'] is not None:
             try:
-                print(f"🔒 Blurring faces in image...")
-                
                 # Parse original image path to extract Grade/Section structure
                 path_parts = image_path.replace('\\', '/').split('/')
                 
@@ -136,10 +291,6 @@ def analyze_image():
                             section_folder = path_parts[i + 1]
                         break
                 
-                # Get original filename
-                original_filename = os.path.basename(image_path)
-                name_without_ext = os.path.splitext(original_filename)[0]
-                
                 # Create date folder (YYYY-MM-DD format)
                 date_folder = datetime.now().strftime('%Y-%m-%d')
                 
@@ -162,43 +313,21 @@ def analyze_image():
                 # Ensure directory exists
                 os.makedirs(os.path.dirname(web_portal_path), exist_ok=True)
                 
-                # Blur faces
-                success, face_count, _, face_locations = face_blurrer.process_image_file(
-                    image_path,
-                    web_portal_path,
-                    draw_boxes=False
-                )
-                
-                if success:
+                if cv2.imwrite(web_portal_path, result['blurred_image']):
                     blurred_image_path = relative_path.replace('\\', '/')
-                    print(f"✓ Faces blurred: {face_count} face(s) detected")
+                    print(f"✓ Faces blurred: {face_count} face(s) detected ({result['face_search']})")
                     print(f"✓ Blurred image saved: {blurred_image_path}")
                 else:
-                    print(f"⚠️  Face blurring failed, continuing with original image")
-                    
+                    print(f"⚠️  Could not save the blurred image")
+            
             except Exception as e:
-                print(f"⚠️  Error during face blurring: {e}")
+                print(f"⚠️  Error saving blurred image: {e}")
                 import traceback
                 traceback.print_exc()
-                # Continue without face blurring
+                # Continue without the blurred image
         else:
             print("⚠️  Face blurrer not available, skipping face detection")
         
-        # Step 2: Analyze classroom (use blurred image if available, otherwise original)
-        analysis_image_path = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-            'public', 'uploads', blurred_image_path
-        ) if blurred_image_path else image_path
-        
-        print(f"Analyzing {classroom_id}: {analysis_image_path}")
-        result = ai_system.analyze_classroom(analysis_image_path, classroom_id)
-        
-        if result is None:
-            return jsonify({
-                'success': False,
-                'error': 'Analysis failed'
-            }), 500
-        
         # Debug: Check what's in result
         print(f"DEBUG: Result keys: {result.keys()}")
         print(f"DEBUG: Has annotated_image: {'annotated_image' in result}")
@@ -264,7 +393,7 @@ def analyze_image():
                     print(f"✓ Saved annotated image: {annotated_image_path}")
                 else:
                     print(f"✗ Failed to save annotated image with cv2.imwrite")
-                
+            
             except Exception as e:
                 print(f"Warning: Could not save annotated image: {e}")
                 import traceback
@@ -279,21 +408,32 @@ def analyze_image():
             'scores': result['scores'],
             'total_score': result['total_score'],
             'rating': result['rating'],
-            'detections': result.get('detections', []),
+            'detections': result['detections'].to_dicts(),
+            'details': result['details'],                  # Per-scorer breakdown
+            'detection_path': result['detection_path'],   # 'yolo' or 'yolo+owlvit'
+            'cascade_reasons': result['cascade_reasons'],
+            'statistics': result['statistics'],           # Inputs for re-scoring history
             'annotated_image_path': annotated_image_path,  # Annotated with detections
             'blurred_image_path': blurred_image_path,      # NEW: Blurred for privacy
             'faces_detected': face_count,                   # NEW: Number of faces
             'face_locations': face_locations,               # NEW: Face coordinates
+            'face_search': result['face_search'],          # 'person regions', 'full frame' or 'skipped'
             'classroom_id': classroom_id
         }
         
+        result_cache.put(cache_key, {
+            key: value for key, value in response.items()
+            if key not in ('success', 'classroom_id')
+        })
+        response['cached'] = False
+        
         print(f"✓ Analysis complete: {result['total_score']}/50 ({result['rating']})")
         print(f"DEBUG: Returning annotated_image_path: {annotated_image_path}")
         print(f"DEBUG: Returning blurred_image_path: {blurred_image_path}")
         print(f"DEBUG: Faces detected: {face_count}")
         
         return jsonify(response)
-        
+    
     except Exception as e:
         print(f"Error analyzing image: {e}")
         return jsonify({
@@ -316,11 +456,8 @@ def batch_analyze():
     """
     try:
         # Check if AI system is available
-        if not ai_system:
-            return jsonify({
-                'success': False,
-                'error': 'AI system not initialized. Please ensure main.py is accessible.'
-            }), 503
+        if not _analysis_ready():
+            return _ai_system_unavailable_response()
         
         data = request.json
         images = data.get('images', [])
@@ -331,36 +468,51 @@ def batch_analyze():
                 'error': 'images array is required'
             }), 400
         
-        results = []
+        results = [None] * len(images)
+        pending = []
         
-        for img in images:
+        for idx, img in enumerate(images):
             image_path = img.get('image_path')
             classroom_id = img.get('classroom_id')
             
             if not image_path or not classroom_id:
-                results.append({
+                results[idx] = {
                     'success': False,
                     'error': 'Missing image_path or classroom_id',
                     'classroom_id': classroom_id
-                })
+                }
                 continue
             
-            try:
-                result = ai_system.analyze_classroom(image_path, classroom_id)
-                
-                results.append({
+            pending.append((idx, image_path, classroom_id))
+        
+        # Run all valid images through the batched YOLO path in one call;
+        # failures come back per image
+        batch_results = ai_system.analyze_classrooms(
+            [(image_path, classroom_id) for _, image_path, classroom_id in pending]
+        )
+        
+        for (idx, image_path, classroom_id), result in zip(pending, batch_results):
+            if isinstance(result, Exception):
+                results[idx] = {
+                    'success': False,
+                    'error': str(result),
+                    'classroom_id': classroom_id
+                }
+            elif result is None:
+                results[idx] = {
+                    'success': False,
+                    'error': 'Analysis failed',
+                    'classroom_id': classroom_id
+                }
+            else:
+                results[idx] = {
                     'success': True,
                     'scores': result['scores'],
                     'total_score': result['total_score'],
                     'rating': result['rating'],
+                    'detection_path': result['detection_path'],
                     'classroom_id': classroom_id
-                })
-            except Exception as e:
-                results.append({
-                    'success': False,
-                    'error': str(e),
-                    'classroom_id': classroom_id
-                })
+                }
         
         return jsonify({
             'success': True,
@@ -368,7 +520,7 @@ def batch_analyze():
             'total': len(results),
             'successful': sum(1 for r in results if r['success'])
         })
-        
+    
     except Exception as e:
         return jsonify({
             'success': False,
@@ -480,7 +632,7 @@ def detect_faces():
             'blurred_image_path': blurred_relative_path if face_count > 0 else None,
             'face_locations': face_locations
         })
-        
+    
     except Exception as e:
         print(f"Error in face detection: {e}")
         import traceback
@@ -599,6 +751,7 @@ if __name__ == '__main__':
     print("Starting server on http://localhost:5000")
     print("Endpoints:")
     print("  GET  /api/health")
+    print("  GET  /api/ready")
     print("  POST /api/analyze")
     print("  POST /api/batch-analyze")
     print("  POST /detect-faces")